@@ -0,0 +1,353 @@
+"""
+This module contains a local stand-in Appium server used by the benchmarks.
+
+It speaks enough of the W3C WebDriver/ Appium http protocol for the framework helpers & page objects,
+models the app as a set of screens from a scenario json & adds a configurable latency to every command.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import quoteattr
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# 1x1 transparent png returned for screenshots
+SCREENSHOT_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+
+
+class NoSuchElement(Exception):
+    pass
+
+
+class StaleElement(Exception):
+    pass
+
+
+class AppSession:
+    """
+    This class holds the screen state of one fake app session.
+    """
+
+    def __init__(self, scenario, capabilities, appear_scale=1.0):
+        self.scenario = scenario
+        self.capabilities = capabilities
+        self.appear_scale = appear_scale
+        self.values = {}
+        self.epoch = 0
+        self.elements = {}
+        self.history = []
+        self.screen = None
+        self.entered_at = 0.0
+        self.lock = threading.Lock()
+        self.go_to(scenario["start"], remember=False)
+
+    def go_to(self, screen, remember=True):
+        if remember and self.screen is not None:
+            self.history.append(self.screen)
+        self.screen = screen
+        self.entered_at = time.time()
+        self.epoch += 1
+        self.elements = {}
+
+    def back(self):
+        self.go_to(self.history.pop() if self.history else self.scenario["start"], remember=False)
+
+    def relaunch(self):
+        self.history = []
+        self.go_to(self.scenario["start"], remember=False)
+
+    def clear_data(self):
+        self.values = {}
+        self.relaunch()
+
+    def _screen_elements(self):
+        return self.scenario["screens"][self.screen].get("elements", {})
+
+    def _is_shown(self, element):
+        return time.time() - self.entered_at >= element.get("appear_after", 0) * self.appear_scale
+
+    def _matches(self, key, using, value):
+        if using in ("id", "accessibility id"):
+            return key == value or key.endswith(":id/" + value)
+        if using == "css selector":
+            match = re.fullmatch(r'\[id="(.+)"\]', value)
+            return match is not None and self._matches(key, "id", match.group(1))
+        if using == "xpath":
+            match = re.search(r"@(?:resource-id|content-desc|name)=['\"]([^'\"]+)['\"]", value)
+            return match is not None and self._matches(key, "id", match.group(1))
+        return False
+
+    def find(self, using, value):
+        """
+        This method finds the shown elements of the current screen
+        :param using: it takes the locator strategy
+        :param value: it takes the locator value
+        :return: it returns list of element ids
+        """
+        found = []
+        for index, (key, element) in enumerate(self._screen_elements().items()):
+            if self._is_shown(element) and self._matches(key, using, value):
+                element_id = str(self.epoch) + "-" + str(index)
+                self.elements[element_id] = key
+                found.append(element_id)
+        return found
+
+    def element(self, element_id):
+        key = self.elements.get(element_id)
+        if key is None or not element_id.startswith(str(self.epoch) + "-"):
+            raise StaleElement(element_id)
+        return key, self._screen_elements()[key]
+
+    def click(self, element_id):
+        key, element = self.element(element_id)
+        if "on_click" in element:
+            self.go_to(element["on_click"])
+
+    def page_source(self):
+        nodes = []
+        for key, element in self._screen_elements().items():
+            if self._is_shown(element):
+                nodes.append("<android.view.View resource-id=" + quoteattr(key) + " text=" +
+                             quoteattr(self.values.get(key, "")) + ' displayed="true" enabled="true"/>')
+        return ('<?xml version="1.0" encoding="UTF-8"?><hierarchy screen=' + quoteattr(self.screen) + ">" +
+                "".join(nodes) + "</hierarchy>")
+
+
+class FakeAppiumServer(ThreadingHTTPServer):
+    """
+    This class is the http server holding the scenario, sessions & command counters.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, scenario, latency=0.0, appear_scale=1.0):
+        super().__init__(address, FakeAppiumHandler)
+        self.scenario = scenario
+        self.latency = latency
+        self.appear_scale = appear_scale
+        self.sessions = {}
+        self.command_counts = {}
+        self.counts_lock = threading.Lock()
+
+    def count(self, command):
+        with self.counts_lock:
+            self.command_counts[command] = self.command_counts.get(command, 0) + 1
+
+    def stats(self, reset=False):
+        with self.counts_lock:
+            counts = dict(self.command_counts)
+            if reset:
+                self.command_counts = {}
+        return {"commands": sum(counts.values()), "by_command": counts}
+
+
+class FakeAppiumHandler(BaseHTTPRequestHandler):
+    """
+    This class routes the webdriver requests to the fake app session.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    routes = [
+        ("POST", r"/session", "new_session"),
+        ("DELETE", r"/session/(?P<sid>[^/]+)", "delete_session"),
+        ("POST", r"/session/(?P<sid>[^/]+)/element", "find_element"),
+        ("POST", r"/session/(?P<sid>[^/]+)/elements", "find_elements"),
+        ("POST", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/click", "click"),
+        ("POST", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/clear", "clear"),
+        ("POST", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/value", "send_keys"),
+        ("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/text", "text"),
+        ("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/attribute/(?P<name>[^/]+)", "attribute"),
+        ("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/(?P<state>displayed|enabled|selected)",
+         "element_state"),
+        ("GET", r"/session/(?P<sid>[^/]+)/source", "source"),
+        ("GET", r"/session/(?P<sid>[^/]+)/screenshot", "screenshot"),
+        ("POST", r"/session/(?P<sid>[^/]+)/back", "back"),
+        ("POST", r"/session/(?P<sid>[^/]+)/execute/sync", "execute"),
+        ("POST", r"/session/(?P<sid>[^/]+)/appium/app/reset", "reset"),
+        ("POST", r"/session/(?P<sid>[^/]+)/appium/device/terminate_app", "terminate_app"),
+        ("POST", r"/session/(?P<sid>[^/]+)/appium/device/activate_app", "activate_app"),
+        ("GET", r"/status", "status"),
+        ("GET", r"/benchmark/stats", "benchmark_stats"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, value):
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, error, message):
+        self._send(status, {"error": error, "message": message, "stacktrace": ""})
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        path = self.path.split("?")[0]
+        path = path[len("/wd/hub"):] if path.startswith("/wd/hub") else path
+        query = self.path.split("?")[1] if "?" in self.path else ""
+
+        for route_method, pattern, handler_name in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method != method or match is None:
+                continue
+            params = match.groupdict()
+            if handler_name not in ("status", "benchmark_stats"):
+                self.server.count(handler_name)
+                if self.server.latency:
+                    time.sleep(self.server.latency)
+            session = None
+            if "sid" in params:
+                session = self.server.sessions.get(params["sid"])
+                if session is None:
+                    return self._error(404, "invalid session id", "Unknown session " + params["sid"])
+            try:
+                if session is None:
+                    return getattr(self, handler_name)(body, params, query)
+                with session.lock:
+                    return getattr(self, handler_name)(session, body, params)
+            except NoSuchElement as ex:
+                return self._error(404, "no such element", "No element found for " + str(ex))
+            except StaleElement as ex:
+                return self._error(404, "stale element reference", "Element " + str(ex) + " is not attached")
+        return self._error(404, "unknown command", method + " " + path)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # session less commands
+    def status(self, body, params, query):
+        self._send(200, {"ready": True, "message": "fake appium server"})
+
+    def benchmark_stats(self, body, params, query):
+        self._send(200, self.server.stats(reset="reset=1" in query))
+
+    def new_session(self, body, params, query):
+        always_match = body.get("capabilities", {}).get("alwaysMatch") or body.get("desiredCapabilities", {})
+        capabilities = {key.split(":", 1)[-1]: value for key, value in always_match.items()}
+        session_id = uuid.uuid4().hex
+        self.server.sessions[session_id] = AppSession(self.server.scenario, capabilities, self.server.appear_scale)
+        self._send(200, {"sessionId": session_id, "capabilities": capabilities})
+
+    # session commands
+    def delete_session(self, session, body, params):
+        self.server.sessions.pop(params["sid"], None)
+        self._send(200, None)
+
+    def find_element(self, session, body, params):
+        found = session.find(body.get("using"), body.get("value"))
+        if not found:
+            raise NoSuchElement(str(body.get("using")) + "=" + str(body.get("value")))
+        self._send(200, {ELEMENT_KEY: found[0]})
+
+    def find_elements(self, session, body, params):
+        self._send(200, [{ELEMENT_KEY: element_id}
+                         for element_id in session.find(body.get("using"), body.get("value"))])
+
+    def click(self, session, body, params):
+        session.click(params["eid"])
+        self._send(200, None)
+
+    def clear(self, session, body, params):
+        key, _ = session.element(params["eid"])
+        session.values[key] = ""
+        self._send(200, None)
+
+    def send_keys(self, session, body, params):
+        key, _ = session.element(params["eid"])
+        session.values[key] = session.values.get(key, "") + body.get("text", "".join(body.get("value", [])))
+        self._send(200, None)
+
+    def text(self, session, body, params):
+        key, element = session.element(params["eid"])
+        self._send(200, session.values.get(key, element.get("text", "")))
+
+    def attribute(self, session, body, params):
+        key, element = session.element(params["eid"])
+        attributes = {"resource-id": key, "text": session.values.get(key, element.get("text", "")),
+                      "checked": "false", "displayed": "true", "enabled": "true"}
+        attributes.update(element.get("attributes", {}))
+        self._send(200, attributes.get(params["name"]))
+
+    def element_state(self, session, body, params):
+        session.element(params["eid"])
+        self._send(200, params["state"] != "selected")
+
+    def source(self, session, body, params):
+        self._send(200, session.page_source())
+
+    def screenshot(self, session, body, params):
+        self._send(200, SCREENSHOT_PNG)
+
+    def back(self, session, body, params):
+        session.back()
+        self._send(200, None)
+
+    def execute(self, session, body, params):
+        if body.get("script") == "mobile: clearApp":
+            session.clear_data()
+        self._send(200, None)
+
+    def reset(self, session, body, params):
+        session.clear_data()
+        self._send(200, None)
+
+    def terminate_app(self, session, body, params):
+        self._send(200, True)
+
+    def activate_app(self, session, body, params):
+        session.relaunch()
+        self._send(200, None)
+
+
+def load_scenario(scenario_file=None):
+    """
+    This method loads the screen model of the fake app
+    :param scenario_file: it takes the scenario json path, Benchmarks/scenario.json by default
+    :return: it returns the scenario dictionary
+    """
+    if scenario_file is None:
+        scenario_file = os.path.join(os.path.abspath(os.path.dirname(__file__)), "scenario.json")
+    with open(scenario_file, "r") as read_file:
+        return json.load(read_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in Appium server for the benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4799)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every command")
+    parser.add_argument("--appear-scale", type=float, default=1.0,
+                        help="multiplier for the element appearance delays of the scenario")
+    parser.add_argument("--scenario", default=None, help="scenario json with the screen model")
+    args = parser.parse_args()
+
+    server = FakeAppiumServer((args.host, args.port), load_scenario(args.scenario), args.latency, args.appear_scale)
+    print("Fake appium server listening on http://" + args.host + ":" + str(server.server_address[1]), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+This module runs the framework helpers & page object flows against the local stand-in Appium server
+& compares commands per action, wall time & framework cpu time against the stored baseline.
+
+Usage: python -m Benchmarks.run_benchmarks [--iterations 5] [--latency 0.02] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from appium import webdriver
+
+from PageObjects.po_login import LoginPageObjects
+from PageObjects.po_registration import RegistrationPageObjects
+from ResourceFiles.constants import Identifiers, ResetLevel
+from SupportLibraries.app_reset import AppResetter
+from SupportLibraries.ui_helpers import UIHelpers
+
+BENCHMARK_DIR = os.path.abspath(os.path.dirname(__file__))
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+SIGNUP_BUTTON = "com.fampay.in.debug:id/sign_up_button"
+USER = {"first_name": "Bench", "last_name": "Mark", "dob": "01012000"}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(latency, appear_scale, scenario=None):
+    """
+    This method starts the fake appium server in its own process, so its cpu time is not measured
+    :param latency: it takes the seconds added to every command
+    :param appear_scale: it takes the multiplier for the element appearance delays
+    :param scenario: it takes the scenario json path
+    :return: it returns tuple of server process & server url
+    """
+    port = _free_port()
+    command = [sys.executable, "-m", "Benchmarks.fake_appium_server", "--port", str(port),
+               "--latency", str(latency), "--appear-scale", str(appear_scale)]
+    if scenario:
+        command += ["--scenario", scenario]
+    process = subprocess.Popen(command, cwd=os.path.join(BENCHMARK_DIR, ".."), stdout=subprocess.DEVNULL)
+
+    url = "http://127.0.0.1:" + str(port) + "/wd/hub"
+    end_time = time.time() + 10
+    while time.time() < end_time:
+        try:
+            with urllib.request.urlopen(url + "/status", timeout=1):
+                return process, url
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Fake appium server did not start on " + url)
+
+
+def server_stats(url, reset=False):
+    with urllib.request.urlopen(url + "/benchmark/stats" + ("?reset=1" if reset else ""), timeout=5) as response:
+        return json.loads(response.read())["value"]
+
+
+def click_action(driver):
+    helper = UIHelpers(driver)
+    helper.mouse_click_action(SIGNUP_BUTTON, Identifiers.ID.value)
+    return [helper]
+
+
+def element_displayed(driver):
+    helper = UIHelpers(driver)
+    helper.is_element_displayed(SIGNUP_BUTTON, Identifiers.ID.value)
+    return [helper]
+
+
+def login_flow(driver):
+    login_page = LoginPageObjects.instance(driver)
+    assert login_page.navigate_to_login_screen(), "login screen is not displayed"
+    login_page.enter_phone_number("9999999999")
+    assert login_page.verify_successful_login(), "login is not successful"
+    return [login_page]
+
+
+def registration_flow(driver):
+    reg_page = RegistrationPageObjects.instance(driver)
+    assert reg_page.navigate_to_registration_form_page("9999999999"), "registration form is not displayed"
+    reg_page.enter_form_details(USER)
+    assert reg_page.verify_successful_registration(), "registration is not successful"
+    return [reg_page]
+
+
+FLOWS = {
+    "click_action": click_action,
+    "element_displayed": element_displayed,
+    "login_flow": login_flow,
+    "registration_flow": registration_flow,
+}
+
+
+def run_flow(driver, url, flow):
+    """
+    This method runs one flow from a freshly reset app
+    :param driver: it takes the driver instance
+    :param url: it takes the fake server url
+    :param flow: it takes the flow function
+    :return: it returns dictionary of the flow measurements
+    """
+    AppResetter(driver).reset(ResetLevel.CLEAR_DATA)
+    server_stats(url, reset=True)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    helpers = flow(driver)
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+
+    commands = server_stats(url)["commands"]
+    actions = sum(stats["calls"] for helper in helpers for stats in helper.command_stats.values())
+    return {"commands": commands, "actions": actions, "commands_per_action": commands / max(actions, 1),
+            "wall_time": wall_time, "cpu_time": cpu_time}
+
+
+def run_benchmarks(url, iterations, flows):
+    """
+    This method runs every flow for the given iterations & keeps the median of each measurement
+    :param url: it takes the fake server url
+    :param iterations: it takes the number of runs per flow
+    :param flows: it takes the flow names to run
+    :return: it returns dictionary of flow name & median measurements
+    """
+    driver = webdriver.Remote(command_executor=url, desired_capabilities={
+        "platformName": "Android", "automationName": "UiAutomator2", "deviceName": "benchmark",
+        "appPackage": "com.fampay.in.debug"})
+    driver._platform = "android"
+
+    results = {}
+    try:
+        for name in flows:
+            runs = [run_flow(driver, url, FLOWS[name]) for _ in range(iterations)]
+            results[name] = {key: round(statistics.median(run[key] for run in runs), 4) for key in runs[0]}
+    finally:
+        driver.quit()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    This method compares the results against the baseline
+    :param results: it takes the current measurements
+    :param baseline: it takes the baseline measurements
+    :param tolerance: it takes the allowed relative slowdown of wall & cpu time ex- 0.2
+    :return: it returns list of regression messages
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["commands"] > expected["commands"]:
+            regressions.append(name + ": commands " + str(expected["commands"]) + " -> " + str(result["commands"]))
+        for key in ("wall_time", "cpu_time"):
+            if result[key] > expected[key] * (1 + tolerance):
+                regressions.append(name + ": " + key + " " + str(expected[key]) + "s -> " + str(result[key]) + "s")
+    return regressions
+
+
+def print_report(results, baseline):
+    print("{:<20} {:>9} {:>8} {:>9} {:>10} {:>10} {:>10}".format(
+        "flow", "commands", "actions", "cmd/act", "wall (s)", "cpu (s)", "wall diff"))
+    for name, result in results.items():
+        expected = baseline.get(name)
+        diff = "-"
+        if expected and expected["wall_time"]:
+            diff = "{:+.1%}".format(result["wall_time"] / expected["wall_time"] - 1)
+        print("{:<20} {:>9} {:>8} {:>9.2f} {:>10.3f} {:>10.3f} {:>10}".format(
+            name, result["commands"], result["actions"], result["commands_per_action"], result["wall_time"],
+            result["cpu_time"], diff))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the framework helper layer")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every command")
+    parser.add_argument("--appear-scale", type=float, default=1.0,
+                        help="multiplier for the element appearance delays of the scenario")
+    parser.add_argument("--scenario", default=None, help="scenario json with the screen model")
+    parser.add_argument("--flow", action="append", choices=sorted(FLOWS), help="flow to run, all by default")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown against baseline")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    settings = {"latency": args.latency, "appear_scale": args.appear_scale, "scenario": args.scenario}
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as read_file:
+            stored = json.load(read_file)
+        if stored.get("settings") != settings:
+            print("Baseline was recorded with different settings " + str(stored.get("settings")) +
+                  ", not comparing.")
+        else:
+            baseline = stored.get("results", {})
+
+    process, url = start_server(args.latency, args.appear_scale, args.scenario)
+    try:
+        results = run_benchmarks(url, args.iterations, args.flow or list(FLOWS))
+    finally:
+        process.terminate()
+        process.wait()
+
+    print_report(results, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as write_file:
+            json.dump({"settings": settings, "results": results}, write_file, indent=2)
+        print("Baseline updated: " + args.baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+""" This module is used for keeping the historical element appearance times per device. """
+
+import json
+import math
+import os
+import threading
+
+from FrameworkUtilities.file_lock_utility import FileLock
+
+
+class AppearanceTimes:
+    """
+    This class keeps how long each locator took to reach a state, per platform & device, & derives the wait
+    timeouts from the observed p99 plus a margin when adaptive timeouts are enabled. A wait which timed out is
+    kept as a censored sample, the element would have taken longer than the wait.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    # samples kept per locator & the minimum samples needed before a timeout is adapted
+    max_samples = 50
+    min_samples = 10
+    margin_factor = 1.5
+    margin_seconds = 1.0
+    min_timeout = 2.0
+    max_timeout = 60.0
+    # an adapted timeout is never below this fraction of the timeout in the code
+    min_timeout_fraction = 0.5
+
+    def __init__(self, store_file=None, enabled=False):
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.store_file = os.path.abspath(store_file or os.path.join(cur_path, r"../TestData/appearance_times.json"))
+        self.enabled = enabled
+        self.devices = self.load(self.store_file)
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        This method returns the process wide store of TestData/appearance_times.json, it is read on first use
+        :return: it returns the appearance times store
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, enabled):
+        cls.get_instance().enabled = enabled
+
+    @staticmethod
+    def load(store_file):
+        if not os.path.exists(store_file):
+            return {}
+        with open(store_file, "r") as read_file:
+            return json.load(read_file)
+
+    @staticmethod
+    def device_key(driver):
+        """
+        This method builds the store key of the driver's device
+        :param driver: it takes the driver instance
+        :return: it returns string of platform, device & os version
+        """
+        capabilities = getattr(driver, "capabilities", None) or {}
+        return "|".join([str(getattr(driver, "_platform", capabilities.get("platformName", ""))),
+                         str(capabilities.get("deviceName") or capabilities.get("udid") or ""),
+                         str(capabilities.get("platformVersion", ""))])
+
+    @staticmethod
+    def locator_key(locator_properties, locator_type, state):
+        return str(locator_type) + "=" + str(locator_properties) + "|" + str(state)
+
+    def record(self, driver, locator_properties, locator_type, state, seconds, appeared=True):
+        """
+        This method records how long a locator took to reach the state, only when adaptive timeouts are enabled
+        :param driver: it takes the driver instance
+        :param locator_properties: it takes locator string
+        :param locator_type: it takes locator type
+        :param state: it takes the waited element state ex- present, visible, clickable
+        :param seconds: it takes the appearance time in seconds, the time waited for a timeout
+        :param appeared: it takes boolean value, False records the timeout as a censored sample
+        :return: it returns nothing
+        """
+        if not self.enabled:
+            return
+        device, locator = self.device_key(driver), self.locator_key(locator_properties, locator_type, state)
+        with self._lock:
+            self.pending.setdefault(device, {}).setdefault(locator, []).append([round(seconds, 2), appeared])
+
+    def samples(self, device, locator):
+        return (self.devices.get(device, {}).get(locator, []) + self.pending.get(device, {}).get(locator, [])
+                )[-self.max_samples:]
+
+    def p99(self, device, locator):
+        """
+        This method returns the p99 appearance time of the locator, a censored sample counts as longer than any
+        appearance as the element did not appear within the wait
+        :param device: it takes the device key
+        :param locator: it takes the locator key
+        :return: it returns the p99 in seconds, None with too few samples or when the p99 is a timeout
+        """
+        with self._lock:
+            samples = self.samples(device, locator)
+        if len(samples) < self.min_samples:
+            return None
+        samples = sorted(samples, key=lambda sample: (not sample[1], sample[0]))
+        seconds, appeared = samples[max(0, math.ceil(0.99 * len(samples)) - 1)]
+        return seconds if appeared else None
+
+    def _adapted_timeout(self, device, locator, default):
+        p99 = self.p99(device, locator)
+        if p99 is None:
+            return None
+        timeout = min(max(p99 * self.margin_factor + self.margin_seconds, self.min_timeout), self.max_timeout)
+        return max(timeout, default * self.min_timeout_fraction)
+
+    def timeout_for(self, driver, locators, default, state="present"):
+        """
+        This method returns the wait timeout of the locators, for several alternative locators the
+        largest adapted timeout is used as any of them ends the wait
+        :param driver: it takes the driver instance
+        :param locators: it takes list of (locator_properties, locator_type) tuples
+        :param default: it takes the timeout given by the caller
+        :param state: it takes the waited element state ex- present, visible, clickable
+        :return: it returns p99 * margin factor + margin seconds, not below min_timeout_fraction of the default, when
+                 enabled & enough samples exist, else the default
+        """
+        if not self.enabled:
+            return default
+        device = self.device_key(driver)
+        timeouts = [self._adapted_timeout(device, self.locator_key(locator_properties, locator_type, state), default)
+                    for locator_properties, locator_type in locators]
+        if not timeouts or None in timeouts:
+            # a locator without a reliable p99 may need the full timeout
+            return default
+        return max(timeouts)
+
+    def save(self):
+        """
+        This method merges the samples of this process into the store file with an atomic write, the file is not
+        written when nothing was recorded ex- adaptive timeouts off
+        :return: it returns nothing
+        """
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+
+        with FileLock(self.store_file + ".lock"):
+            devices = self.load(self.store_file)
+            for device, locators in pending.items():
+                for locator, samples in locators.items():
+                    stored = devices.setdefault(device, {}).get(locator, [])
+                    devices[device][locator] = (stored + samples)[-self.max_samples:]
+            temp_file = self.store_file + "." + str(os.getpid()) + ".tmp"
+            with open(temp_file, "w") as write_file:
+                json.dump(devices, write_file, separators=(",", ":"), sort_keys=True)
+            os.replace(temp_file, self.store_file)
+        self.devices = devices
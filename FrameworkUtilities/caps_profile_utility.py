@@ -0,0 +1,168 @@
+""" This module contains the desired capabilities profile registry. """
+
+import copy
+import json
+import logging
+import os
+import threading
+
+from FrameworkUtilities.logger_utility import custom_logger
+
+
+class CapabilityProfileError(ValueError):
+    """
+    This error is raised for an invalid desired capabilities profile.
+    """
+
+
+class CapabilityProfiles:
+    """
+    This class loads the desired capabilities profiles lazily, merges the layered overrides
+    (base, platform, device, environment variables, cli) once, validates & caches the result.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    profile_files = {
+        "android": "android-local.json",
+        "ios": "ios-local.json",
+        "bs_android": "browserstack-android.json",
+        "bs_ios": "browserstack-ios.json"
+    }
+    base_file = "base.json"
+    env_prefix = "APPIUM_CAP_"
+    required_keys = ["platformName", "deviceName", "automationName", "app"]
+    cloud_required_keys = ["browserstack.user", "browserstack.key"]
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, caps_dir=None, cli_overrides=None):
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.caps_dir = caps_dir or os.path.join(cur_path, r"../DesiredCaps/")
+        self.app_dir = os.path.join(cur_path, r"../MobileApp/")
+        self.cli_overrides = cli_overrides or {}
+        self._profiles = {}
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        This method returns the process wide registry
+        :return: it returns the capability profiles registry
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, cli_overrides):
+        """
+        This method sets the cli overrides of the process wide registry
+        :param cli_overrides: it takes list of key=value strings
+        :return: it returns nothing
+        """
+        with cls._instance_lock:
+            cls._instance = cls(cli_overrides=cls.parse_overrides(cli_overrides))
+
+    @staticmethod
+    def parse_value(value):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+
+    @classmethod
+    def parse_overrides(cls, overrides):
+        """
+        This method parses key=value override strings, values are json decoded when possible
+        :param overrides: it takes list of key=value strings
+        :return: it returns dictionary of capabilities
+        """
+        parsed = {}
+        for override in overrides or []:
+            if "=" not in override:
+                raise CapabilityProfileError("Capability override must be key=value: " + override)
+            key, value = override.split("=", 1)
+            parsed[key.strip()] = cls.parse_value(value)
+        return parsed
+
+    def get_env_overrides(self):
+        return {key[len(self.env_prefix):]: self.parse_value(value)
+                for key, value in os.environ.items() if key.startswith(self.env_prefix)}
+
+    def _load_file(self, file_name):
+        path = os.path.join(self.caps_dir, file_name)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as read_file:
+            return json.load(read_file)
+
+    def load_profile(self, platform):
+        """
+        This method loads only the requested platform profile file, once
+        :param platform: it takes the platform name ex- android, bs_android
+        :return: it returns the raw profile capabilities
+        """
+        if platform not in self.profile_files:
+            raise CapabilityProfileError("Unknown capabilities profile: " + str(platform))
+        with self._lock:
+            if platform not in self._profiles:
+                self._profiles[platform] = self._load_file(self.profile_files[platform])
+            return copy.deepcopy(self._profiles[platform])
+
+    def is_cloud(self, platform):
+        return platform.startswith("bs_")
+
+    def _apply_platform_defaults(self, platform, capabilities):
+        if self.is_cloud(platform):
+            capabilities["browserstack.user"] = capabilities.get("browserstack.user") or os.getenv('BS_USERNAME')
+            capabilities["browserstack.key"] = capabilities.get("browserstack.key") or os.getenv('BS_KEY')
+        # an app binary, not an uploaded app id ex- bs://..., is looked up in MobileApp/
+        for key in ("app", "appBinary"):
+            app = capabilities.get(key)
+            if app and "://" not in app and not os.path.isabs(app):
+                capabilities[key] = os.path.abspath(os.path.join(self.app_dir, app))
+
+    def validate(self, platform, capabilities):
+        """
+        This method validates the merged capabilities before a session is requested
+        :param platform: it takes the platform name
+        :param capabilities: it takes the merged capabilities
+        :return: it returns nothing, raises CapabilityProfileError for invalid capabilities
+        """
+        required_keys = list(self.required_keys)
+        if self.is_cloud(platform):
+            required_keys += self.cloud_required_keys
+
+        missing = [key for key in required_keys if not capabilities.get(key)]
+        if missing:
+            raise CapabilityProfileError("Capabilities profile '" + platform + "' is missing: " + ", ".join(missing))
+
+        if "://" not in capabilities["app"] and not os.path.exists(capabilities["app"]):
+            raise CapabilityProfileError("App binary not found for profile '" + platform + "': " + capabilities["app"])
+
+    def get(self, platform, device_capabilities=None):
+        """
+        This method returns the merged & validated capabilities, cached per platform & device overrides
+        :param platform: it takes the platform name ex- android, bs_android
+        :param device_capabilities: it takes the device specific overrides ex- from the device pool
+        :return: it returns a copy of the desired capabilities
+        """
+        device_capabilities = device_capabilities or {}
+        cache_key = (platform, json.dumps(device_capabilities, sort_keys=True))
+
+        if cache_key not in self._resolved:
+            capabilities = self._load_file(self.base_file)
+            capabilities.update(self.load_profile(platform))
+            capabilities.update(device_capabilities)
+            capabilities.update(self.get_env_overrides())
+            capabilities.update(self.cli_overrides)
+            self._apply_platform_defaults(platform, capabilities)
+            self.validate(platform, capabilities)
+            self._resolved[cache_key] = capabilities
+            self.log.info("Resolved capabilities profile '%s'", platform)
+
+        return copy.deepcopy(self._resolved[cache_key])
@@ -0,0 +1,108 @@
+""" This module contains the pool of generated test users & phone numbers. """
+
+import logging
+import math
+import os
+import random
+import threading
+from collections import deque
+
+from faker import Faker
+
+import FrameworkUtilities.logger_utility as log_utils
+
+PHONE_PREFIX = "987"
+PHONE_RANGE = (1234567, 9999999)
+
+
+class DataPool:
+    """
+    This class generates test users in bulk with one seeded Faker instance & hands out phone numbers
+    which are unique within the run, every pytest-xdist worker draws from its own disjoint range.
+    """
+
+    log = log_utils.custom_logger(logging.INFO)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, seed=None, batch_size=20, worker_index=None, worker_count=None, locale="en_US"):
+        self.seed = seed if seed is not None else int(os.getenv("RAFT_DATA_SEED") or random.randrange(2 ** 32))
+        self.batch_size = batch_size
+        self.worker_index = self.get_worker_index() if worker_index is None else worker_index
+        self.worker_count = int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1")) if worker_count is None else worker_count
+        self.locale = locale
+        self._faker = None
+        self._users = deque()
+        self._lock = threading.Lock()
+
+        # disjoint block of the phone number range for this worker
+        block_size = (PHONE_RANGE[1] - PHONE_RANGE[0] + 1) // self.worker_count
+        self.block_start = PHONE_RANGE[0] + self.worker_index * block_size
+        self.block_size = block_size
+        rng = random.Random(self.seed + self.worker_index)
+        self._phone_offset = rng.randrange(block_size)
+        # a stride co-prime to the block size visits every number of the block once, in a scattered order
+        first_stride = rng.randrange(block_size // 3, block_size // 2 + 1)
+        self._phone_stride = next((stride for stride in range(first_stride, 0, -1)
+                                   if math.gcd(stride, block_size) == 1), 1)
+        self._phones_issued = 0
+        self.log.info("Data pool seed %s, worker %s of %s", self.seed, self.worker_index, self.worker_count)
+
+    @staticmethod
+    def get_worker_index():
+        """
+        This method returns the index of the current pytest-xdist worker ex- gw3 -> 3
+        :return: it returns worker index, 0 when not running under xdist
+        """
+        worker = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+        return int(worker[2:]) if worker.startswith("gw") and worker[2:].isdigit() else 0
+
+    @classmethod
+    def get_instance(cls):
+        """
+        This method returns the process wide data pool, it is created on first use
+        :return: it returns the data pool
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @property
+    def faker(self):
+        # the locale providers are loaded once, on the first user requested
+        if self._faker is None:
+            self._faker = Faker(self.locale)
+            self._faker.seed_instance(self.seed + self.worker_index)
+        return self._faker
+
+    def _generate_users(self):
+        for _ in range(self.batch_size):
+            self._users.append({
+                "first_name": self.faker.first_name(),
+                "last_name": self.faker.last_name(),
+                "dob": self.faker.date_of_birth(minimum_age=11, maximum_age=20).strftime("%d/%m/%Y")
+            })
+
+    def next_user(self):
+        """
+        This method hands out the next generated user, users are generated in batches
+        :return: it returns user dictionary with first_name, last_name & dob
+        """
+        with self._lock:
+            if not self._users:
+                self._generate_users()
+            return self._users.popleft()
+
+    def next_phone_number(self):
+        """
+        This method hands out a phone number not handed out before in this run by any worker
+        :return: it returns the phone number string
+        """
+        with self._lock:
+            if self._phones_issued >= self.block_size:
+                raise RuntimeError("Phone number range of worker " + str(self.worker_index) + " is exhausted")
+            position = (self._phone_offset + self._phones_issued * self._phone_stride) % self.block_size
+            self._phones_issued += 1
+        return PHONE_PREFIX + str(self.block_start + position)
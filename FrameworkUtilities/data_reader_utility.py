@@ -1,9 +1,13 @@
 """ This module is used for developing/ accessing data reader utility. """
 
+import atexit
 import json
 import os
+import threading
 import traceback
 
+from FrameworkUtilities.caps_profile_utility import CapabilityProfiles
+from FrameworkUtilities.file_lock_utility import FileLock
 from ResourceFiles.constants import Identifiers
 
 
@@ -12,13 +16,16 @@ class DataReader:
     This class includes basic reusable data helpers.
     """
 
+    # process wide cache of parsed data files: path -> {"mtime": ..., "index": {tc_id: record}}
+    _cache = {}
+    # set_data changes not yet persisted: path -> list of (tc_id, key, value)
+    _pending_writes = {}
+    _lock = threading.RLock()
+    write_batch_size = 10
+
     def __init__(self):
         self.cur_path = os.path.abspath(os.path.dirname(__file__))
         self.stage_test_data = os.path.join(self.cur_path, r"../TestData/stage_data.json")
-        self.android_caps = os.path.join(self.cur_path, r"../DesiredCaps/android-local.json")
-        self.ios_caps = os.path.join(self.cur_path, r"../DesiredCaps/ios-local.json")
-        self.bs_android_caps = os.path.join(self.cur_path, r"../DesiredCaps/browserstack-android.json")
-        self.bs_ios_caps = os.path.join(self.cur_path, r"../DesiredCaps/browserstack-ios.json")
 
     @staticmethod
     def load_json_data(json_file):
@@ -33,11 +40,46 @@ class DataReader:
         try:
             with open(json_file, "r") as read_file:
                 records = json.load(read_file)
-        except Exception as ex:
-            traceback.print_exc(ex)
+        except Exception:
+            traceback.print_exc()
 
         return records
 
+    @staticmethod
+    def _build_index(json_records):
+        if isinstance(json_records, list):
+            return {record.get("tc_id"): record for record in json_records}
+        return json_records
+
+    @classmethod
+    def _apply_pending(cls, json_file, index):
+        for tc_id, key, value in cls._pending_writes.get(json_file, []):
+            if index is not None and index.get(tc_id) is not None:
+                index[tc_id].setdefault('test_data', {})[key] = value
+
+    @classmethod
+    def get_records(cls, json_file):
+        """
+        This method returns the parsed records indexed by test case id, the file is parsed again
+        only when its modification time changes
+        :param json_file: it takes the json file path
+        :return: it returns dictionary of test case id & record
+        """
+        json_file = os.path.abspath(json_file)
+        with cls._lock:
+            try:
+                mtime = os.stat(json_file).st_mtime_ns
+            except OSError:
+                return None
+
+            cached = cls._cache.get(json_file)
+            if cached is None or cached["mtime"] != mtime:
+                index = cls._build_index(cls.load_json_data(json_file))
+                cls._apply_pending(json_file, index)
+                cached = {"mtime": mtime, "index": index}
+                cls._cache[json_file] = cached
+            return cached["index"]
+
     def get_data(self, tc_id, data_key):
         """
         This method is used for returning column data specific to test case id/ name
@@ -46,7 +88,7 @@ class DataReader:
         :return:
         """
         value = None
-        json_records = self.load_json_data(self.stage_test_data)
+        json_records = self.get_records(self.stage_test_data)
 
         try:
             if json_records is not None and json_records[tc_id] is not None:
@@ -54,11 +96,21 @@ class DataReader:
                     value = json_records[tc_id][Identifiers.RUNMODE.value]
                 else:
                     value = json_records[tc_id]['test_data'][data_key]
-        except Exception as ex:
-            traceback.print_exc(ex)
+        except Exception:
+            traceback.print_exc()
 
         return value
 
+    def get_run_mode(self, tc_id):
+        """
+        This method returns the run mode of the test case, read at collection time
+        :param tc_id: it takes test case id/ name as input parameter
+        :return: it returns the run_mode value ex- Y, N or None when the test case has no run_mode
+        """
+        json_records = self.get_records(self.stage_test_data) or {}
+        record = json_records.get(tc_id) or {}
+        return record.get(Identifiers.RUNMODE.value)
+
     def set_data(self, tc_id, key, value):
         """
         This method is used to set the data.
@@ -67,19 +119,55 @@ class DataReader:
         :param value: value of the data key
         :return:
         """
-        json_records = self.load_json_data(self.stage_test_data)
-        try:
-            if json_records is not None and json_records[tc_id] is not None:
-                json_records[tc_id]['test_data'][key] = value
-
-        except Exception as ex:
-            traceback.print_exc(ex)
-
-    def get_desired_caps(self, platform):
-        desired_caps = {
-            "android": self.load_json_data(self.android_caps),
-            "ios": self.load_json_data(self.ios_caps),
-            "bs_android": self.load_json_data(self.bs_android_caps),
-            "bs_ios": self.load_json_data(self.bs_ios_caps)
-        }
-        return desired_caps.get(platform, self.load_json_data(self.android_caps))
+        json_file = os.path.abspath(self.stage_test_data)
+        with self._lock:
+            json_records = self.get_records(json_file) or {}
+            if json_records.get(tc_id) is not None:
+                json_records[tc_id].setdefault('test_data', {})[key] = value
+                self._pending_writes.setdefault(json_file, []).append((tc_id, key, value))
+
+            if len(self._pending_writes.get(json_file, [])) >= self.write_batch_size:
+                self.flush(json_file)
+
+    @classmethod
+    def flush(cls, json_file=None):
+        """
+        This method persists the pending set_data changes with an atomic write, the latest file content
+        is re-read under a file lock so changes from parallel workers are kept, a file which can not be
+        read is not overwritten & its changes stay pending
+        :param json_file: it takes the json file path, all files with pending changes when None
+        :return: it returns nothing
+        """
+        with cls._lock:
+            json_files = [os.path.abspath(json_file)] if json_file else list(cls._pending_writes)
+            for path in json_files:
+                if not cls._pending_writes.get(path):
+                    continue
+
+                with FileLock(path + ".lock"):
+                    json_records = cls.load_json_data(path)
+                    if json_records is None:
+                        continue
+                    cls._apply_pending(path, cls._build_index(json_records))
+                    temp_file = path + "." + str(os.getpid()) + ".tmp"
+                    with open(temp_file, "w") as write_file:
+                        json.dump(json_records, write_file, indent=2)
+                    os.replace(temp_file, path)
+
+                cls._pending_writes[path] = []
+                cls._cache.pop(path, None)
+
+    @staticmethod
+    def get_desired_caps(platform):
+        """
+        This method returns the raw desired capabilities profile, only the requested profile file is loaded
+        :param platform: it takes the platform name ex- android, bs_android
+        :return: it returns the desired capabilities
+        """
+        profiles = CapabilityProfiles.get_instance()
+        if platform not in profiles.profile_files:
+            platform = "android"
+        return profiles.load_profile(platform)
+
+
+atexit.register(DataReader.flush)
@@ -1,11 +1,13 @@
 """ This module contains the methods to conclude the execution status. """
 
 import logging
+import time
 from traceback import print_stack
 
 import allure
 
 import FrameworkUtilities.logger_utility as log_utils
+from FrameworkUtilities.screenshot_utility import get_attachment_options
 from SupportLibraries.ui_helpers import UIHelpers
 
 
@@ -17,6 +19,33 @@ class ExecutionStatus(UIHelpers):
     def __init__(self, driver):
         super().__init__(driver)
         self.result_list = []
+        self.pending_screenshots = []
+
+    def capture_screenshot(self, test_name):
+        """
+        This method takes a failure screenshot, it is written by the background pipeline.
+        :param test_name: it takes the initials for file name
+        :return: this method returns nothing.
+        """
+        job = self.take_screenshots(test_name)
+        if job is not None:
+            self.pending_screenshots.append(job)
+
+    def attach_screenshots(self, timeout=30):
+        """
+        This method waits for the queued screenshots & attaches them to the allure report of the current test,
+        it is called once from the test teardown.
+        :param timeout: it takes the maximum time to wait for all the screenshots
+        :return: this method returns nothing.
+        """
+        end_time = time.time() + timeout
+        for job in self.pending_screenshots:
+            path = job.wait(max(0.0, end_time - time.time()))
+            if path is not None:
+                allure.attach.file(path, **get_attachment_options(path))
+            elif not job.done.is_set():
+                self.log.error("### Screenshot %s is not written yet, it is not attached", job.file_name_initials)
+        self.pending_screenshots.clear()
 
     def set_result(self, result, test_name):
 
@@ -33,16 +62,16 @@ class ExecutionStatus(UIHelpers):
                     self.result_list.append("PASS")
                 else:
                     self.result_list.append("FAIL")
-                    self.log.error("### VERIFICATION FAILED:: " + test_name)
-                    allure.attach.file(self.take_screenshots(test_name), attachment_type=allure.attachment_type.PNG)
+                    self.log.error("### VERIFICATION FAILED:: %s", test_name)
+                    self.capture_screenshot(test_name)
             else:
                 self.result_list.append("FAIL")
-                self.log.error("### VERIFICATION FAILED:: " + test_name)
-                allure.attach.file(self.take_screenshots(test_name), attachment_type=allure.attachment_type.PNG)
+                self.log.error("### VERIFICATION FAILED:: %s", test_name)
+                self.capture_screenshot(test_name)
         except Exception as ex:
             self.result_list.append("FAIL")
-            self.log.error("### EXCEPTION OCCURRED:: ", ex)
-            allure.attach.file(self.take_screenshots(test_name), attachment_type=allure.attachment_type.PNG)
+            self.log.error("### EXCEPTION OCCURRED:: %s", ex)
+            self.capture_screenshot(test_name)
             print_stack()
 
     def mark(self, test_step, result):
@@ -68,11 +97,11 @@ class ExecutionStatus(UIHelpers):
         self.set_result(result, test_step)
 
         if "FAIL" in self.result_list:
-            self.log.error("### TEST FAILED:: " + test_step)
+            self.log.error("### TEST FAILED:: %s", test_step)
             self.result_list.clear()
             assert True is False, "### TEST FAILED:: " + test_step
 
         else:
-            self.log.info("### TEST SUCCESSFUL:: " + test_step)
+            self.log.info("### TEST SUCCESSFUL:: %s", test_step)
             self.result_list.clear()
             assert True is True, "### TEST SUCCESSFUL:: " + test_step
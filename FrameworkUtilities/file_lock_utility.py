@@ -0,0 +1,116 @@
+""" This module contains a lock file helper shared by parallel workers. """
+
+import os
+import threading
+import time
+
+
+def process_start_time(pid):
+    """
+    This function returns the start time of a process, with the pid it still identifies the process after the pid
+    is reused by another one
+    :param pid: it takes the process id
+    :return: it returns the start time in clock ticks since boot, None when the platform does not expose it
+    """
+    try:
+        with open("/proc/" + str(pid) + "/stat", "r") as read_file:
+            stat = read_file.read()
+    except OSError:
+        return None
+    # the process name can contain spaces & brackets, the fields after it are plain numbers
+    return int(stat[stat.rindex(")") + 2:].split()[19])
+
+
+def is_process_alive(pid, start_time=None):
+    """
+    This function checks if the process is still running
+    :param pid: it takes the process id
+    :param start_time: it takes the start time recorded with the pid, a process with another start time reuses the pid
+    :return: it returns boolean value
+    """
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return start_time is None or process_start_time(pid) in (None, start_time)
+
+
+class FileLock:
+    """
+    This class implements an exclusive lock on top of a lock file, it works across processes & platforms.
+    """
+
+    def __init__(self, lock_file, timeout=30, stale_after=120, poll_interval=0.05):
+        self.lock_file = lock_file
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _break_if_stale(self):
+        """
+        This method removes the lock file of a holder which did not release it in time. The lock file is renamed
+        first & removed only when it is still the stale one, so a waiter never removes a fresh lock taken by
+        another waiter which broke the same stale lock first
+        :return: it returns nothing
+        """
+        try:
+            stale = os.stat(self.lock_file)
+            if time.time() - stale.st_mtime <= self.stale_after:
+                return
+            broken_file = self.lock_file + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".stale"
+            os.rename(self.lock_file, broken_file)
+        except OSError:
+            return
+        try:
+            broken = os.stat(broken_file)
+            if (broken.st_ino, broken.st_mtime_ns) != (stale.st_ino, stale.st_mtime_ns):
+                # a fresh lock was taken in between, it is handed back unless the lock is taken again already
+                os.link(broken_file, self.lock_file)
+        except OSError:
+            pass
+        finally:
+            try:
+                os.remove(broken_file)
+            except OSError:
+                pass
+
+    def acquire(self):
+        """
+        This method blocks until the lock file is created by this process
+        :return: it returns nothing, raises TimeoutError when the lock is not acquired in time
+        """
+        end_time = time.time() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return
+            except FileExistsError:
+                self._break_if_stale()
+                if time.time() > end_time:
+                    raise TimeoutError("Unable to acquire lock: " + self.lock_file)
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """
+        This method releases the lock
+        :return: it returns nothing
+        """
+        if self._fd is not None:
+            try:
+                # a lock broken as stale may be held by another process by now, only the own lock file is removed
+                if os.stat(self.lock_file).st_ino == os.fstat(self._fd).st_ino:
+                    os.remove(self.lock_file)
+            except OSError:
+                pass
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -1,41 +1,115 @@
 """ This module contains the methods for logging. """
 
-import inspect
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
 from datetime import datetime
 
+_setup_lock = threading.Lock()
+_log_queue = None
+_listener = None
+_log_handlers = []
 
-def custom_logger(log_level=logging.INFO):
+
+class JsonLinesFormatter(logging.Formatter):
     """
-    This is logging method.
-    :param log_level: Log levels
-    :return: logger
+    This class formats the log records as json lines for structured log processing.
     """
 
-    log_filename = None
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
 
+def _get_log_file_name(extension):
     cur_path = os.path.abspath(os.path.dirname(__file__))
-    log_dir = os.path.join(cur_path, r"../Logs/")
+    date_dir = os.path.join(cur_path, r"../Logs/", str(datetime.strftime(datetime.now(), '%d%m%Y')))
+    os.makedirs(date_dir, exist_ok=True)
 
-    if not os.path.exists(log_dir):
-        os.mkdir(log_dir)
+    current_time = datetime.strftime(datetime.now(), '%d%m%Y-%H%M%S')  # Time
+    return os.path.join(date_dir, "DEMO_" + current_time + extension)
 
-    date_dir = os.path.join(log_dir, str(datetime.strftime(datetime.now(), '%d%m%Y')))
 
-    if not os.path.exists(date_dir):
-        os.mkdir(date_dir)
+def _start_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+    _listener.start()
 
-    current_time = datetime.strftime(datetime.now(), '%d%m%Y-%H%M%S')  # Time
 
-    if log_filename is None:
-        temp_file = "DEMO_" + current_time + ".log"
-        log_filename = os.path.join(date_dir, temp_file)
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging():
+    """
+    This method sets up the log handlers once per process, the file i/o happens on the queue listener thread
+    :return: it returns nothing
+    """
+    global _log_queue
+    with _setup_lock:
+        if _log_queue is not None:
+            return
+
+        _log_queue = queue.Queue(-1)
+        file_handler = logging.FileHandler(_get_log_file_name(".log"))
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        _log_handlers.append(file_handler)
+
+        if os.getenv("RAFT_LOG_JSON", "").lower() in ("1", "true", "yes"):
+            _add_json_handler()
+
+        logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+        _start_listener()
+        atexit.register(_stop_listener)
+
+
+def _add_json_handler():
+    json_handler = logging.FileHandler(_get_log_file_name(".jsonl"))
+    json_handler.setFormatter(JsonLinesFormatter())
+    _log_handlers.append(json_handler)
+
+
+def enable_json_output():
+    """
+    This method adds the structured json lines log output, if it is not enabled already
+    :return: it returns nothing
+    """
+    setup_logging()
+    with _setup_lock:
+        if any(isinstance(handler.formatter, JsonLinesFormatter) for handler in _log_handlers):
+            return
+        _add_json_handler()
+        _start_listener()
+
+
+def custom_logger(log_level=logging.INFO):
+    """
+    This is logging method.
+    :param log_level: Log levels
+    :return: logger
+    """
+
+    setup_logging()
 
-    caller_name = inspect.stack()[1][1] + " - \tLN:" + str(inspect.stack()[1][2])  # Caller Method
-    caller_name = str(caller_name)
+    caller = sys._getframe(1)  # Caller Method
+    caller_name = caller.f_code.co_filename + " - \tLN:" + str(caller.f_lineno)
 
-    logging.basicConfig(filename=log_filename, format='%(asctime)s - %(levelname)s - %(message)s')
     logger = logging.getLogger(caller_name)
 
     # Set logging level for logger
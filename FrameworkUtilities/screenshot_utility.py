@@ -0,0 +1,222 @@
+""" This module contains the background screenshot capture pipeline. """
+
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+import time
+
+import allure
+
+import FrameworkUtilities.logger_utility as log_utils
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ScreenshotEncoder:
+    """
+    This class optionally downscales & re-encodes the png screenshots, it needs Pillow for anything but png.
+    """
+
+    log = log_utils.custom_logger(logging.INFO)
+
+    extensions = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+    def __init__(self, image_format="png", quality=75, scale=1.0):
+        if image_format not in self.extensions:
+            raise ValueError("screenshot format must be in " + str(list(self.extensions)))
+        if image_format != "png" or scale != 1.0:
+            if Image is None:
+                self.log.error("Pillow is not installed, screenshots are stored as full resolution png")
+                image_format, scale = "png", 1.0
+        self.image_format = image_format
+        self.quality = quality
+        self.scale = scale
+
+    @property
+    def extension(self):
+        return self.extensions[self.image_format]
+
+    def encode(self, png_data):
+        """
+        This method encodes the png screenshot with the configured format, quality & scale
+        :param png_data: it takes the png bytes
+        :return: it returns the encoded bytes
+        """
+        if self.image_format == "png" and self.scale == 1.0:
+            return png_data
+
+        image = Image.open(io.BytesIO(png_data))
+        if self.scale != 1.0:
+            image = image.resize((max(1, int(image.width * self.scale)), max(1, int(image.height * self.scale))))
+        if self.image_format == "jpeg":
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        image.save(output, format=self.image_format.upper(), quality=self.quality)
+        return output.getvalue()
+
+
+class ScreenshotJob:
+    """
+    This class holds a captured screenshot waiting to be encoded & written by the pipeline.
+    """
+
+    def __init__(self, png_data, file_name_initials):
+        self.png_data = png_data
+        self.file_name_initials = file_name_initials
+        self.path = None
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        This method waits for the screenshot to be written
+        :param timeout: it takes the maximum time to wait
+        :return: it returns the screenshot path or None
+        """
+        self.done.wait(timeout)
+        return self.path
+
+
+class ScreenshotPipeline:
+    """
+    This class encodes & writes the captured screenshots on a background thread through a bounded queue,
+    so failed verifications do not block the test on the encoding & the disk writes. The screenshot itself is
+    taken by the test thread, so it shows the screen of the failure.
+    """
+
+    log = log_utils.custom_logger(logging.INFO)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    # encoder used by the process wide pipeline, set from the command line options
+    default_encoder = None
+
+    def __init__(self, screenshot_directory=None, max_pending=16, encoder=None):
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.screenshot_directory = screenshot_directory or os.path.join(cur_path, r"../Logs/Screenshots/")
+        self.encoder = encoder or self.default_encoder or ScreenshotEncoder()
+        # content hash of the captured frame -> stored file, identical frames are stored once
+        self.stored_frames = {}
+        self.store_lock = threading.Lock()
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.worker = threading.Thread(target=self._run, name="screenshot-pipeline", daemon=True)
+        self.worker.start()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        This method returns the process wide pipeline, it is started on first use
+        :return: it returns the screenshot pipeline
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, image_format="png", quality=75, scale=1.0):
+        """
+        This method sets the encoding of the process wide pipeline
+        :param image_format: it takes the image format ex- png, jpeg, webp
+        :param quality: it takes the jpeg/ webp quality
+        :param scale: it takes the downscale factor ex- 0.5
+        :return: it returns nothing
+        """
+        cls.default_encoder = ScreenshotEncoder(image_format, quality, scale)
+
+    @classmethod
+    def flush_instance(cls, timeout=60):
+        """
+        This method waits for the pending screenshots of the process wide pipeline, if it was started
+        :param timeout: it takes the maximum time to wait
+        :return: it returns nothing
+        """
+        if cls._instance is not None:
+            cls._instance.flush(timeout)
+
+    def submit(self, png_data, file_name_initials):
+        """
+        This method queues a captured screenshot, it blocks only when the queue is full
+        :param png_data: it takes the png bytes of the screenshot
+        :param file_name_initials: it takes the initials for file name
+        :return: it returns the screenshot job
+        """
+        job = ScreenshotJob(png_data, file_name_initials)
+        self.jobs.put(job)
+        return job
+
+    def store(self, png_data, file_name_initials):
+        """
+        This method encodes & writes the screenshot, a frame identical to an earlier one is not written again
+        :param png_data: it takes the screenshot bytes
+        :param file_name_initials: it takes the initials for file name
+        :return: it returns the destination path
+        """
+        frame_hash = hashlib.sha1(png_data).hexdigest()
+        with self.store_lock:
+            if frame_hash in self.stored_frames:
+                self.log.info("Identical screenshot already stored: %s", self.stored_frames[frame_hash])
+                return self.stored_frames[frame_hash]
+
+            file_name = file_name_initials + "_" + str(round(time.time() * 1000)) + "." + self.encoder.extension
+            destination = os.path.join(self.screenshot_directory, file_name)
+            os.makedirs(self.screenshot_directory, exist_ok=True)
+            with open(destination, "wb") as write_file:
+                write_file.write(self.encoder.encode(png_data))
+            self.stored_frames[frame_hash] = destination
+            return destination
+
+    def _process(self, job):
+        try:
+            job.path = self.store(job.png_data, job.file_name_initials)
+            self.log.info("Screenshot saved to directory: %s", job.path)
+        except Exception as ex:
+            job.error = ex
+            self.log.error("### Exception occurred while writing screenshot:: %s", ex)
+        finally:
+            job.png_data = None
+            job.done.set()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                self._process(job)
+            finally:
+                self.jobs.task_done()
+
+    def flush(self, timeout=60):
+        """
+        This method waits until all the queued screenshots are written
+        :param timeout: it takes the maximum time to wait
+        :return: it returns boolean value according to the queue drained or not
+        """
+        end_time = time.time() + timeout
+        while self.jobs.unfinished_tasks:
+            if time.time() > end_time:
+                self.log.error("Screenshot pipeline flush timed out with pending screenshots")
+                return False
+            time.sleep(0.05)
+        return True
+
+
+def get_attachment_options(path):
+    """
+    This function returns the allure attachment options for the screenshot file
+    :param path: it takes the screenshot path
+    :return: it returns dictionary of allure.attach.file keyword arguments
+    """
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension == "png":
+        return {"attachment_type": allure.attachment_type.PNG}
+    if extension == "jpg":
+        return {"attachment_type": allure.attachment_type.JPG}
+    return {"extension": extension}
@@ -0,0 +1,165 @@
+""" This module is used for keeping the historical per test durations & app states. """
+
+import argparse
+import json
+import os
+import re
+import statistics
+import threading
+
+from FrameworkUtilities.file_lock_utility import FileLock
+
+
+class TimingHistory:
+    """
+    This class keeps the last durations & the starting app state of each test, it is merged into the
+    history file under a file lock so parallel workers & CI shards do not overwrite each other.
+    """
+
+    # durations kept per test, the prediction is their median
+    max_samples = 5
+    default_duration = 60.0
+    # xdist --dist loadgroup appends @<xdist_group> to the node ids, it is not part of the test identity
+    group_suffix = re.compile(r"@[^\[\]/:]*$")
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, history_file=None):
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.history_file = os.path.abspath(history_file or os.path.join(cur_path, r"../TestData/timing_history.json"))
+        self.tests = self.load(self.history_file)
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        This method returns the process wide history of TestData/timing_history.json, it is read on first use
+        :return: it returns the timing history
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def test_id(cls, node_id):
+        """
+        This method returns the node id without the xdist group suffix ex- test_a.py::test_b@schedule_slot_1
+        :param node_id: it takes the pytest node id
+        :return: it returns the node id stored in the history
+        """
+        return cls.group_suffix.sub("", node_id)
+
+    @staticmethod
+    def load(history_file):
+        """
+        This method reads a history/ timing file
+        :param history_file: it takes the json file path
+        :return: it returns dictionary of test node id & history entry, empty when the file does not exist
+        """
+        if not os.path.exists(history_file):
+            return {}
+        with open(history_file, "r") as read_file:
+            return json.load(read_file).get("tests", {})
+
+    def predict(self, node_id):
+        """
+        This method predicts the test duration, unknown tests get the median of the known ones
+        :param node_id: it takes the pytest node id
+        :return: it returns the predicted duration in seconds
+        """
+        entry = self.tests.get(self.test_id(node_id))
+        if entry and entry.get("durations"):
+            return statistics.median(entry["durations"])
+        known = [statistics.median(entry["durations"]) for entry in self.tests.values() if entry.get("durations")]
+        return statistics.median(known) if known else self.default_duration
+
+    def has_history(self):
+        return any(entry.get("durations") for entry in self.tests.values())
+
+    def record(self, node_id, duration, app_state=None):
+        """
+        This method records a test duration of the current run
+        :param node_id: it takes the pytest node id
+        :param duration: it takes the duration in seconds
+        :param app_state: it takes the starting app state of the test
+        :return: it returns nothing
+        """
+        with self._lock:
+            self.pending[self.test_id(node_id)] = {"duration": round(duration, 3), "app_state": app_state}
+
+    @classmethod
+    def merge_entries(cls, tests, results):
+        """
+        This method merges the durations of a run into the history entries
+        :param tests: it takes dictionary of node id & history entry, updated in place
+        :param results: it takes dictionary of node id & {"duration": ..., "app_state": ...}
+        :return: it returns the updated history entries
+        """
+        for node_id, result in results.items():
+            entry = tests.setdefault(node_id, {"durations": []})
+            entry["durations"] = (entry.get("durations", []) + [result["duration"]])[-cls.max_samples:]
+            entry["app_state"] = result.get("app_state")
+        return tests
+
+    def save(self, history_file=None):
+        """
+        This method merges the durations of the current run into the history file with an atomic write
+        :param history_file: it takes the json file path, the history file by default
+        :return: it returns the written file path
+        """
+        history_file = os.path.abspath(history_file or self.history_file)
+        with self._lock:
+            results, self.pending = self.pending, {}
+        if not results:
+            return history_file
+
+        with FileLock(history_file + ".lock"):
+            tests = self.merge_entries(self.load(history_file), results)
+            self.write(history_file, tests)
+        if history_file == self.history_file:
+            self.tests = tests
+        return history_file
+
+    def write_results(self, results_file):
+        """
+        This method writes the durations of the current run only, ex- the timing file of one CI shard
+        :param results_file: it takes the json file path
+        :return: it returns the written file path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(results_file)), exist_ok=True)
+        with self._lock:
+            results = dict(sorted(self.pending.items()))
+        with open(results_file, "w") as write_file:
+            json.dump({"results": results}, write_file, indent=2)
+        return results_file
+
+    def merge_results_files(self, results_files):
+        """
+        This method merges the timing files of the shards into the history file
+        :param results_files: it takes list of json file paths written by write_results
+        :return: it returns the history file path
+        """
+        for results_file in results_files:
+            with open(results_file, "r") as read_file:
+                results = json.load(read_file).get("results", {})
+            with self._lock:
+                self.pending.update(results)
+        return self.save()
+
+    @staticmethod
+    def write(history_file, tests):
+        temp_file = history_file + "." + str(os.getpid()) + ".tmp"
+        with open(temp_file, "w") as write_file:
+            json.dump({"tests": dict(sorted(tests.items()))}, write_file, indent=2)
+        os.replace(temp_file, history_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the shard timing files into the timing history")
+    parser.add_argument("results_files", nargs="+", help="shard timing files ex- Logs/shard_timings_*.json")
+    parser.add_argument("--history", default=None, help="history file, TestData/timing_history.json by default")
+    args = parser.parse_args()
+    print("Merged into " + TimingHistory(args.history).merge_results_files(args.results_files))
@@ -7,8 +7,23 @@ from SupportLibraries.ui_helpers import UIHelpers
 
 class BasePageObjects(UIHelpers):
 
+    use_element_cache = True
+
     def navigate_back(self):
         self.driver.back()
+        self.invalidate_driver_caches(self.driver)
+
+    def navigate_with_click(self, locator_properties, locator_type="id", max_time_out=10):
+        """
+        This method clicks an element opening another screen & drops the cached element references of the
+        screen left behind
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :param max_time_out: this is the maximum time to wait for particular element
+        :return: it returns nothing
+        """
+        self.mouse_click_action(locator_properties, locator_type, max_time_out)
+        self.invalidate_driver_caches(self.driver)
 
     @classmethod
     def instance(cls, driver):
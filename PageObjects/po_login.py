@@ -22,7 +22,7 @@ class LoginPageObjects(BasePageObjects):
         This test verifies the navigation to login screen
         :return: boolean value for navigation to login screen
         """
-        self.mouse_click_action(self.get_locator(self.signup_button)[0])
+        self.navigate_with_click(self.get_locator(self.signup_button)[0])
         return self.is_element_displayed(
             self.get_locator(self.phone_number_input)[0])
 
@@ -34,7 +34,7 @@ class LoginPageObjects(BasePageObjects):
         """
         self.enter_text_action(phone_number,
                                self.get_locator(self.phone_number_input)[0])
-        self.mouse_click_action(self.get_locator(self.continue_button)[0])
+        self.navigate_with_click(self.get_locator(self.continue_button)[0])
 
     def verify_successful_login(self):
         """
@@ -35,12 +35,12 @@ class RegistrationPageObjects(BasePageObjects):
         continue_button_prop = self.get_locator(self.continue_button)
         card_link_prop = self.get_locator(self.card_link)
 
-        self.mouse_click_action(signup_button_prop[0])
+        self.navigate_with_click(signup_button_prop[0])
         if self.is_element_displayed(phone_number_prop[0]):
             self.enter_text_action(phone_number, phone_number_prop[0])
-            self.mouse_click_action(continue_button_prop[0])
+            self.navigate_with_click(continue_button_prop[0])
             if self.is_element_displayed(card_link_prop[0], max_time_out=20):
-                self.mouse_click_action(card_link_prop[0])
+                self.navigate_with_click(card_link_prop[0])
                 return True
             else:
                 self.log.error("Main registration screen is not visible.")
@@ -60,11 +60,11 @@ class RegistrationPageObjects(BasePageObjects):
             self.enter_text_action(user["last_name"], self.get_locator(self.last_name_input)[0])
             self.enter_text_action(user["dob"], self.get_locator(self.dob_input)[0])
             if self.is_element_displayed(self.get_locator(self.next_button)[0], max_time_out=3):
-                self.mouse_click_action(self.get_locator(self.next_button)[0])
-            self.mouse_click_action(self.get_locator(self.submit_button)[0])
+                self.navigate_with_click(self.get_locator(self.next_button)[0])
+            self.navigate_with_click(self.get_locator(self.submit_button)[0])
 
         except Exception as ex:
-            self.log.error("Failed to fill the form details:\n", ex)
+            self.log.error("Failed to fill the form details:\n%s", ex)
 
     def verify_successful_registration(self):
         """
@@ -14,3 +14,23 @@ class Identifiers(Enum):
     ID = "id"
     RUNMODE = "run_mode"
     ACCESSIBILITY_ID = "accessibility_id"
+
+
+class ResetLevel(Enum):
+    """
+    App state reset levels, ordered from the cheapest to the most expensive.
+    """
+
+    NONE = "none"
+    RELAUNCH = "relaunch"
+    CLEAR_DATA = "clear_data"
+    REINSTALL = "reinstall"
+
+    @classmethod
+    def ordered(cls):
+        return [cls.NONE, cls.RELAUNCH, cls.CLEAR_DATA, cls.REINSTALL]
+
+    @classmethod
+    def highest(cls, *levels):
+        ordered = cls.ordered()
+        return max((cls(level) for level in levels if level is not None), key=ordered.index, default=cls.NONE)
@@ -0,0 +1,323 @@
+""" This module contains the app binary cache, it skips the uploads & installs of an unchanged app binary. """
+
+import abc
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import urllib3
+
+from FrameworkUtilities.file_lock_utility import FileLock
+from FrameworkUtilities.logger_utility import custom_logger
+
+
+class AppUploadError(RuntimeError):
+    """
+    This error is raised when the app binary can not be uploaded.
+    """
+
+
+class AppUploader(abc.ABC):
+    """
+    This class is the base of the app binary uploaders, an uploader stores the binary & returns the app id
+    used as the app capability.
+    """
+
+    name = None
+
+    def find(self, app_hash, capabilities):
+        """
+        This method looks up an app binary uploaded earlier, ex- from another machine
+        :param app_hash: it takes the sha256 of the app binary
+        :param capabilities: it takes the desired capabilities ex- for the cloud credentials
+        :return: it returns the app id or None when the binary was not uploaded
+        """
+        return None
+
+    @abc.abstractmethod
+    def upload(self, app_path, app_hash, capabilities):
+        """
+        This method uploads the app binary
+        :param app_path: it takes the app binary path
+        :param app_hash: it takes the sha256 of the app binary
+        :param capabilities: it takes the desired capabilities ex- for the cloud credentials
+        :return: it returns the app id
+        """
+
+
+class BrowserStackUploader(AppUploader):
+    """
+    This class uploads the app binary to BrowserStack App Automate.
+    """
+
+    name = "browserstack"
+    upload_url = "https://api-cloud.browserstack.com/app-automate/upload"
+    # the apps uploaded with a custom id in the last 30 days, newest first
+    recent_apps_url = "https://api-cloud.browserstack.com/app-automate/recent_apps/"
+
+    def __init__(self, upload_url=None, recent_apps_url=None, timeout=600):
+        self.upload_url = upload_url or self.upload_url
+        self.recent_apps_url = recent_apps_url or self.recent_apps_url
+        self.timeout = timeout
+
+    @staticmethod
+    def custom_id(app_hash):
+        return "raft-" + app_hash[:32]
+
+    def _request(self, method, url, capabilities, **kwargs):
+        user = capabilities.get("browserstack.user") or os.getenv("BS_USERNAME") or ""
+        key = capabilities.get("browserstack.key") or os.getenv("BS_KEY") or ""
+        http = urllib3.PoolManager(timeout=urllib3.Timeout(connect=10, read=self.timeout), retries=False)
+        return http.request(method, url, headers=urllib3.make_headers(basic_auth=user + ":" + key), **kwargs)
+
+    def find(self, app_hash, capabilities):
+        response = self._request("GET", self.recent_apps_url + self.custom_id(app_hash), capabilities)
+        if response.status != 200:
+            return None
+        apps = json.loads(response.data.decode("utf-8"))
+        # an unknown custom id returns {"message": "No results found"}
+        return apps[0]["app_url"] if isinstance(apps, list) and apps else None
+
+    def upload(self, app_path, app_hash, capabilities):
+        with open(app_path, "rb") as read_file:
+            fields = {"file": (os.path.basename(app_path), read_file.read()), "custom_id": self.custom_id(app_hash)}
+        response = self._request("POST", self.upload_url, capabilities, fields=fields)
+        if response.status != 200:
+            raise AppUploadError("Upload of " + app_path + " failed with status " + str(response.status) + ": "
+                                 + response.data.decode("utf-8", "replace"))
+        return json.loads(response.data.decode("utf-8"))["app_url"]
+
+
+class LocalUploader(AppUploader):
+    """
+    This class stands in for the cloud upload, it copies the app binary to a local directory ex- in tests.
+    """
+
+    name = "local"
+
+    def __init__(self, upload_dir=None):
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.upload_dir = upload_dir or os.path.join(cur_path, r"../Logs/AppUploads/")
+
+    def upload(self, app_path, app_hash, capabilities):
+        os.makedirs(self.upload_dir, exist_ok=True)
+        destination = os.path.abspath(os.path.join(self.upload_dir, app_hash + os.path.splitext(app_path)[1]))
+        shutil.copyfile(app_path, destination)
+        return destination
+
+
+UPLOADERS = {
+    BrowserStackUploader.name: BrowserStackUploader,
+    LocalUploader.name: LocalUploader
+}
+
+
+class AppInstall:
+    """
+    This class holds the app binary planned for a session on a local device.
+    """
+
+    def __init__(self, device, app_id, app_path, app_hash, installed):
+        self.device = device
+        self.app_id = app_id
+        self.app_path = app_path
+        self.app_hash = app_hash
+        self.installed = installed
+
+
+class AppArtifacts:
+    """
+    This class keeps an index of the app binary hashes, the cloud app id uploaded for each hash & the
+    hash installed on each local device, so an unchanged binary is neither uploaded nor installed again.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    # BrowserStack deletes the uploaded apps after 30 days
+    upload_ttl = 29 * 24 * 3600
+    upload_timeout = 900
+
+    def __init__(self, index_file=None, enabled=False, uploader=None):
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.index_file = os.path.abspath(index_file or os.path.join(cur_path, r"../TestData/app_artifacts.json"))
+        self.enabled = enabled
+        self.uploader = uploader or BrowserStackUploader()
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        This method returns the process wide app binary cache
+        :return: it returns the app artifacts manager
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, enabled, uploader=None):
+        """
+        This method sets the process wide app binary cache
+        :param enabled: it takes boolean value to skip the installs of an unchanged binary on the local devices
+        :param uploader: it takes the uploader name ex- browserstack, local or an AppUploader instance
+        :return: it returns nothing
+        """
+        if isinstance(uploader, str):
+            uploader = UPLOADERS[uploader]()
+        with cls._instance_lock:
+            cls._instance = cls(enabled=enabled, uploader=uploader)
+
+    @staticmethod
+    def load(index_file):
+        if not os.path.exists(index_file):
+            return {"uploads": {}, "installs": {}}
+        with open(index_file, "r") as read_file:
+            return json.load(read_file)
+
+    def update(self, update_index):
+        """
+        This method applies a change to the index file under the file lock with an atomic write
+        :param update_index: it takes the callable changing the index dictionary in place
+        :return: it returns nothing
+        """
+        with FileLock(self.index_file + ".lock"):
+            index = self.load(self.index_file)
+            update_index(index)
+            temp_file = self.index_file + "." + str(os.getpid()) + ".tmp"
+            with open(temp_file, "w") as write_file:
+                json.dump(index, write_file, indent=2, sort_keys=True)
+            os.replace(temp_file, self.index_file)
+
+    def file_hash(self, app_path):
+        """
+        This method returns the sha256 of the app binary, cached while the file size & mtime are unchanged
+        :param app_path: it takes the app binary path
+        :return: it returns the hex digest
+        """
+        stat = os.stat(app_path)
+        cache_key = (os.path.abspath(app_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if cache_key in self._hashes:
+                return self._hashes[cache_key]
+        digest = hashlib.sha256()
+        with open(app_path, "rb") as read_file:
+            for chunk in iter(lambda: read_file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        with self._lock:
+            self._hashes[cache_key] = digest.hexdigest()
+        return self._hashes[cache_key]
+
+    @staticmethod
+    def is_binary(app):
+        return isinstance(app, str) and "://" not in app and os.path.isfile(app)
+
+    @staticmethod
+    def device_key(server, capabilities):
+        return str(server) + "|" + str(capabilities.get("udid") or capabilities.get("deviceName") or "")
+
+    def _cached_upload(self, app_hash):
+        entry = self.load(self.index_file)["uploads"].get(self.uploader.name, {}).get(app_hash)
+        if entry and time.time() - entry["uploaded_at"] < self.upload_ttl:
+            return entry["app_id"]
+        return None
+
+    def remote_app_id(self, app_path, capabilities):
+        """
+        This method returns the cloud app id of the binary, it is uploaded only when its hash is neither in the
+        index nor found by the uploader, parallel workers wait for the same upload instead of repeating it
+        :param app_path: it takes the app binary path
+        :param capabilities: it takes the desired capabilities
+        :return: it returns the app id ex- bs://...
+        """
+        app_hash = self.file_hash(app_path)
+        with FileLock(self.index_file + "." + app_hash[:12] + ".upload.lock", timeout=self.upload_timeout,
+                      stale_after=self.upload_timeout):
+            app_id = self._cached_upload(app_hash)
+            if app_id is not None:
+                self.log.info("App binary %s is unchanged, using the uploaded app %s", app_path, app_id)
+                return app_id
+
+            app_id = self.uploader.find(app_hash, capabilities)
+            if app_id is not None:
+                self.log.info("App binary %s was uploaded earlier as %s", app_path, app_id)
+            else:
+                started_at = time.time()
+                app_id = self.uploader.upload(app_path, app_hash, capabilities)
+                self.log.info("Uploaded app binary %s as %s in %.1fs", app_path, app_id, time.time() - started_at)
+
+            def add_upload(index):
+                index["uploads"].setdefault(self.uploader.name, {})[app_hash] = {
+                    "app_id": app_id, "file": os.path.basename(app_path), "uploaded_at": time.time()}
+            self.update(add_upload)
+        return app_id
+
+    def prepare(self, platform, server, capabilities):
+        """
+        This method replaces the app binary of the capabilities, by the uploaded app id for the cloud & for a
+        local device already having the binary installed by the app package, so the session skips the install
+        :param platform: it takes the platform name ex- android, bs_android
+        :param server: it takes the appium server url
+        :param capabilities: it takes the desired capabilities, changed in place
+        :return: it returns the planned install for session_started, None when the install is not tracked
+        """
+        # the binary of a cloud profile, its app id is the fallback when the binary is not on this machine
+        app_binary = capabilities.pop("appBinary", None)
+        if platform.startswith("bs_"):
+            app = app_binary if self.is_binary(app_binary) else capabilities.get("app")
+            if self.is_binary(app):
+                capabilities["app"] = self.remote_app_id(app, capabilities)
+            elif app_binary:
+                self.log.info("App binary %s not found, using the app %s of the profile", app_binary,
+                              capabilities.get("app"))
+            return None
+        app = capabilities.get("app")
+        if not self.is_binary(app):
+            return None
+        app_id = capabilities.get("appPackage") or capabilities.get("bundleId")
+        if not self.enabled or not app_id:
+            return None
+
+        app_hash = self.file_hash(app)
+        device = self.device_key(server, capabilities)
+        installed = self.load(self.index_file)["installs"].get(device, {}).get(app_id) == app_hash
+        # the startup reset cleans the app state, a full reset would uninstall the app at the end of the session
+        capabilities["fullReset"] = False
+        if installed:
+            self.log.info("App %s is unchanged on %s, skipping the install", app_id, device)
+            del capabilities["app"]
+            capabilities.update({"noReset": True, "autoLaunch": False})
+        else:
+            capabilities["enforceAppInstall"] = True
+        return AppInstall(device, app_id, app, app_hash, installed)
+
+    def session_started(self, driver, install):
+        """
+        This method completes the planned install once the session is created, an app removed from the device
+        since the last run is installed again
+        :param driver: it takes the driver instance
+        :param install: it takes the planned install returned by prepare
+        :return: it returns nothing
+        """
+        if install is None:
+            return
+        if install.installed:
+            is_installed = driver.is_app_installed(install.app_id)
+            if not is_installed:
+                self.log.info("App %s is missing on %s, installing it", install.app_id, install.device)
+                driver.install_app(install.app_path)
+            driver.activate_app(install.app_id)
+            if is_installed:
+                return
+
+        def add_install(index):
+            index["installs"].setdefault(install.device, {})[install.app_id] = install.app_hash
+        self.update(add_install)
@@ -0,0 +1,104 @@
+""" This module contains the app state reset strategies. """
+
+import logging
+import time
+
+from FrameworkUtilities.logger_utility import custom_logger
+from ResourceFiles.constants import ResetLevel
+from SupportLibraries.ui_helpers import UIHelpers
+
+
+class AppResetter:
+    """
+    This class resets the app state with the cheapest strategy satisfying the requested level.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    # (level, seconds) of every reset performed in this process
+    reset_timings = []
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def get_app_id(self):
+        """
+        This method returns the app package/ bundle id of the session
+        :return: it returns the app id string or None
+        """
+        capabilities = self.driver.capabilities or {}
+        return capabilities.get("appPackage") or capabilities.get("bundleId")
+
+    def is_android(self):
+        return str((self.driver.capabilities or {}).get("platformName", "")).lower() == "android"
+
+    def relaunch(self):
+        """
+        This method terminates & relaunches the app, it keeps the app data
+        :return: it returns nothing
+        """
+        app_id = self.get_app_id()
+        self.driver.terminate_app(app_id)
+        self.driver.activate_app(app_id)
+
+    def clear_data(self):
+        """
+        This method clears the app data & relaunches the app, on ios the app is reinstalled instead
+        :return: it returns nothing
+        """
+        if not self.is_android():
+            self.reinstall()
+            return
+
+        app_id = self.get_app_id()
+        self.driver.terminate_app(app_id)
+        try:
+            self.driver.execute_script("mobile: clearApp", {"appId": app_id})
+        except Exception as ex:
+            self.log.error("mobile: clearApp is not supported, falling back to reinstall: %s", ex)
+            self.reinstall()
+            return
+        self.driver.activate_app(app_id)
+
+    def reinstall(self):
+        """
+        This method resets the app according to the session capabilities, reinstalls it with fullReset
+        :return: it returns nothing
+        """
+        self.driver.reset()
+
+    def reset(self, level):
+        """
+        This method resets the app state with the given level & records the time it took
+        :param level: it takes the reset level ex- none, relaunch, clear_data, reinstall
+        :return: it returns the seconds spent on the reset
+        """
+        level = ResetLevel(level)
+        strategies = {
+            ResetLevel.RELAUNCH: self.relaunch,
+            ResetLevel.CLEAR_DATA: self.clear_data,
+            ResetLevel.REINSTALL: self.reinstall
+        }
+
+        start_time = time.time()
+        if level in strategies:
+            strategies[level]()
+            UIHelpers.invalidate_driver_caches(self.driver)
+        elapsed = time.time() - start_time
+
+        self.reset_timings.append((level.value, elapsed))
+        self.log.info("App reset with level '%s' took %s second(s)", level.value, round(elapsed, 2))
+        return elapsed
+
+    @classmethod
+    def get_timing_summary(cls):
+        """
+        This method summarizes the reset timings per level
+        :return: it returns dictionary of level & count, total seconds
+        """
+        summary = {}
+        for level, elapsed in cls.reset_timings:
+            entry = summary.setdefault(level, {"count": 0, "total": 0.0})
+            entry["count"] += 1
+            entry["total"] += elapsed
+        return summary
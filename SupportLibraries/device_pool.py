@@ -0,0 +1,201 @@
+""" This module contains the device pool used for leasing devices to parallel workers. """
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+from FrameworkUtilities.file_lock_utility import FileLock, is_process_alive, process_start_time
+from FrameworkUtilities.logger_utility import custom_logger
+
+
+class DeviceLease:
+    """
+    This class holds a device leased from the pool.
+    """
+
+    def __init__(self, name, server, platform, capabilities):
+        self.name = name
+        self.server = server
+        self.platform = platform
+        self.capabilities = capabilities
+
+    def __repr__(self):
+        return "DeviceLease(" + self.name + " @ " + self.server + ")"
+
+
+class DevicePool:
+    """
+    This class leases one device per pytest-xdist worker/ thread from a list of appium endpoints,
+    health checks the endpoints & quarantines the bad devices.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    def __init__(self, config_file, state_dir=None, quarantine_seconds=600, lease_timeout=300, health_check=True):
+        self.config_file = config_file
+        with open(config_file, "r") as read_file:
+            self.config = json.load(read_file)
+
+        cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.state_dir = state_dir or os.path.join(cur_path, r"../Logs/DevicePool/")
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.state_file = os.path.join(self.state_dir, "pool_state.json")
+        self.lock = FileLock(os.path.join(self.state_dir, "pool_state.lock"))
+        self.quarantine_seconds = quarantine_seconds
+        self.lease_timeout = lease_timeout
+        self.health_check = health_check
+
+    @staticmethod
+    def worker_id():
+        """
+        This method returns the id of the current xdist worker/ thread
+        :return: it returns worker id string
+        """
+        worker = os.getenv("PYTEST_XDIST_WORKER", "master")
+        return worker + ":" + str(os.getpid()) + ":" + str(threading.get_ident())
+
+    def _load_state(self):
+        if not os.path.exists(self.state_file):
+            return {"leases": {}, "quarantine": {}}
+        with open(self.state_file, "r") as read_file:
+            return json.load(read_file)
+
+    def _save_state(self, state):
+        temp_file = self.state_file + ".tmp"
+        with open(temp_file, "w") as write_file:
+            json.dump(state, write_file, indent=2)
+        os.replace(temp_file, self.state_file)
+
+    def devices(self, platform):
+        """
+        This method returns the configured devices for the platform
+        :param platform: it takes the platform name ex- android, bs_android
+        :return: it returns list of device configurations
+        """
+        return [device for device in self.config.get("devices", []) if device.get("platform", platform) == platform]
+
+    def available(self, platform):
+        """
+        This method returns the number of devices of the platform which are not quarantined, leased or not
+        :param platform: it takes the platform name ex- android, bs_android
+        :return: it returns the device count
+        """
+        with self.lock:
+            quarantine = self._load_state()["quarantine"]
+        now = time.time()
+        return len([device for device in self.devices(platform)
+                    if device["name"] not in quarantine or self._quarantine_ended(quarantine[device["name"]], now)])
+
+    def _quarantine_ended(self, quarantine, now):
+        # the quarantine period of this run applies to the quarantines persisted by the earlier runs too
+        return min(quarantine["until"], quarantine.get("since", now) + self.quarantine_seconds) <= now
+
+    def reset_quarantine(self, names=None):
+        """
+        This method takes the devices out of the quarantine, it is persisted in the pool state across runs
+        :param names: it takes the device names, all the quarantined devices when not given
+        :return: it returns list of the device names taken out of the quarantine
+        """
+        with self.lock:
+            state = self._load_state()
+            released = [name for name in list(state["quarantine"]) if names is None or name in names]
+            for name in released:
+                del state["quarantine"][name]
+            self._save_state(state)
+        if released:
+            self.log.info("Reset the quarantine of device(s): %s", ", ".join(released))
+        return released
+
+    def is_healthy(self, device):
+        """
+        This method checks the appium endpoint status of the device
+        :param device: it takes the device configuration
+        :return: it returns boolean value according to the endpoint health
+        """
+        if not self.health_check:
+            return True
+        try:
+            with urllib.request.urlopen(device["server"].rstrip("/") + "/status", timeout=5) as response:
+                return response.status == 200
+        except Exception as ex:
+            self.log.error("Health check failed for device %s: %s", device["name"], ex)
+            return False
+
+    def _next_free_device(self, platform, state):
+        now = time.time()
+        for name, lease in list(state["leases"].items()):
+            if not is_process_alive(lease["pid"], lease.get("started")):
+                self.log.info("Reclaiming the lease of dead worker on device: %s", name)
+                del state["leases"][name]
+        for name, quarantine in list(state["quarantine"].items()):
+            if self._quarantine_ended(quarantine, now):
+                del state["quarantine"][name]
+
+        candidates = [device for device in self.devices(platform)
+                      if device["name"] not in state["leases"] and device["name"] not in state["quarantine"]]
+        return candidates[0] if candidates else None
+
+    def acquire(self, platform, timeout=None):
+        """
+        This method leases a healthy device for the current worker, it waits until one is free
+        :param platform: it takes the platform name ex- android, bs_android
+        :param timeout: it takes the maximum time to wait for a free device, the lease timeout by default
+        :return: it returns the device lease
+        """
+        if not self.devices(platform):
+            raise ValueError("No devices configured for platform '" + platform + "' in " + self.config_file)
+
+        end_time = time.time() + (self.lease_timeout if timeout is None else timeout)
+        while True:
+            with self.lock:
+                state = self._load_state()
+                device = self._next_free_device(platform, state)
+                if device is not None:
+                    # the start time tells the worker apart from a later process reusing its pid
+                    state["leases"][device["name"]] = {"owner": self.worker_id(), "pid": os.getpid(),
+                                                       "started": process_start_time(os.getpid()),
+                                                       "leased_at": time.time()}
+                self._save_state(state)
+
+            if device is not None:
+                lease = DeviceLease(device["name"], device["server"], platform, device.get("capabilities", {}))
+                if self.is_healthy(device):
+                    self.log.info("Leased device %s to worker %s", lease.name, self.worker_id())
+                    return lease
+                self.quarantine(lease, "health check failed")
+                continue
+
+            if time.time() > end_time:
+                raise TimeoutError("No free device available for platform: " + platform)
+            time.sleep(1)
+
+    def release(self, lease):
+        """
+        This method returns the device lease to the pool
+        :param lease: it takes the device lease
+        :return: it returns nothing
+        """
+        with self.lock:
+            state = self._load_state()
+            state["leases"].pop(lease.name, None)
+            self._save_state(state)
+        self.log.info("Released device %s", lease.name)
+
+    def quarantine(self, lease, reason):
+        """
+        This method releases the device & keeps it out of the pool for the quarantine period
+        :param lease: it takes the device lease
+        :param reason: it takes the reason of the quarantine
+        :return: it returns nothing
+        """
+        with self.lock:
+            state = self._load_state()
+            state["leases"].pop(lease.name, None)
+            now = time.time()
+            state["quarantine"][lease.name] = {"since": now, "until": now + self.quarantine_seconds,
+                                               "reason": reason}
+            self._save_state(state)
+        self.log.error("Quarantined device %s: %s", lease.name, reason)
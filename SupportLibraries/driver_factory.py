@@ -1,12 +1,14 @@
 """ This module contains the singleton driver instance implementation"""
 
 import logging
-import os
 
 from appium import webdriver
 
-from FrameworkUtilities.data_reader_utility import DataReader
+from FrameworkUtilities.caps_profile_utility import CapabilityProfiles
 from FrameworkUtilities.logger_utility import custom_logger
+from SupportLibraries.app_artifacts import AppArtifacts
+from SupportLibraries.driver_instrumentation import command_timings
+from SupportLibraries.driver_recording import driver_recording
 
 
 class DriverFactory:
@@ -14,16 +16,18 @@ class DriverFactory:
     This class contains the reusable methods for getting the driver instances
     """
     log = custom_logger(logging.INFO)
-    data_reader = DataReader()
 
-    def __init__(self, platform):
+    def __init__(self, platform, server=None, capabilities=None):
         self.platform = platform
-        self.cur_path = os.path.abspath(os.path.dirname(__file__))
+        self.server = server
+        self.capabilities = capabilities or {}
         self.local_appium_server = "http://127.0.0.1:4723/wd/hub"
         self.browser_stack_server = "http://hub-cloud.browserstack.com/wd/hub"
 
     def get_driver_instance(self):
-        desired_caps = self.data_reader.get_desired_caps(self.platform)
+        # a replayed session is served from the recording, the capabilities are not needed
+        desired_caps = {} if driver_recording.replaying else \
+            CapabilityProfiles.get_instance().get(self.platform, self.capabilities)
         server = {
             "android": self.local_appium_server,
             "ios": self.local_appium_server,
@@ -31,13 +35,15 @@ class DriverFactory:
             "bs_ios": self.browser_stack_server
         }
 
-        if self.platform not in ["android", "ios"]:
-            desired_caps['browserstack.user'] = os.getenv('BS_USERNAME')
-            desired_caps['browserstack.key'] = os.getenv('BS_KEY')
-        else:
-            app_location = os.path.join(self.cur_path, r"../MobileApp/", desired_caps['app'])
-            desired_caps['app'] = app_location
+        server_url = self.server or server.get(self.platform, self.local_appium_server)
+        app_install = None if driver_recording.replaying else \
+            AppArtifacts.get_instance().prepare(self.platform, server_url, desired_caps)
 
-        return webdriver.Remote(
-            command_executor=server.get(self.platform, self.local_appium_server),
+        driver = webdriver.Remote(
+            command_executor=driver_recording.connection(server_url),
             desired_capabilities=desired_caps)
+        AppArtifacts.get_instance().session_started(driver, app_install)
+
+        if command_timings.enabled:
+            command_timings.instrument(driver)
+        return driver
@@ -0,0 +1,193 @@
+""" This module contains the per command WebDriver instrumentation & timing report. """
+
+import json
+import os
+import sys
+import threading
+import time
+
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class CommandTimings:
+    """
+    This class records every WebDriver command issued through an instrumented driver & attributes it
+    to the current test, the UIHelpers method & the page object method which issued it.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.current_test = None
+        self.tests = {}
+        self._element_locators = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _test_entry(self, test_name=None):
+        test_name = test_name or self.current_test or "<session>"
+        return self.tests.setdefault(test_name, {"commands": [], "wait_time": 0.0, "waits": {},
+                                                 "duration": 0.0})
+
+    def start_test(self, test_name):
+        self.current_test = test_name
+        self._test_entry(test_name)["started_at"] = time.time()
+
+    def end_test(self):
+        entry = self._test_entry()
+        entry["duration"] = time.time() - entry.pop("started_at", time.time())
+        self.current_test = None
+
+    def push_helper(self, helper_name):
+        """
+        This method marks the UIHelpers method issuing the next commands, along with its page object caller
+        :param helper_name: it takes the helper method name
+        :return: it returns nothing
+        """
+        if not self.enabled:
+            return
+        frame = sys._getframe(1)
+        helpers_file = frame.f_code.co_filename
+        while frame is not None and (frame.f_code.co_filename == helpers_file
+                                     or "contextlib" in frame.f_code.co_filename):
+            frame = frame.f_back
+        caller = None
+        if frame is not None:
+            caller = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0] + "." + frame.f_code.co_name
+        self._local.helper = (helper_name, caller)
+
+    def pop_helper(self):
+        self._local.helper = None
+
+    def record_wait(self, helper_name, seconds):
+        """
+        This method records the time spent in a UIHelpers wait
+        :param helper_name: it takes the helper method name
+        :param seconds: it takes the time spent waiting
+        :return: it returns nothing
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._test_entry()
+            entry["wait_time"] += seconds
+            entry["waits"][helper_name] = entry["waits"].get(helper_name, 0.0) + seconds
+
+    def _remember_elements(self, locator, response):
+        # driver.execute has unwrapped the element references into WebElement objects already
+        value = response.get("value") if isinstance(response, dict) else None
+        elements = value if isinstance(value, list) else [value]
+        for element in elements:
+            if isinstance(element, WebElement):
+                self._element_locators[element.id] = locator
+
+    def record(self, command, params, duration, outcome, response=None):
+        """
+        This method records one WebDriver command
+        :param command: it takes the command name
+        :param params: it takes the command parameters
+        :param duration: it takes the command duration in seconds
+        :param outcome: it takes ok or the exception name
+        :param response: it takes the command response
+        :return: it returns nothing
+        """
+        params = params or {}
+        locator = None
+        if "using" in params and "value" in params:
+            locator = str(params["using"]) + "=" + str(params["value"])
+            if response is not None:
+                self._remember_elements(locator, response)
+        elif "id" in params:
+            locator = self._element_locators.get(params["id"])
+
+        helper, caller = getattr(self._local, "helper", None) or (None, None)
+        with self._lock:
+            self._test_entry()["commands"].append({
+                "command": command, "locator": locator, "duration": round(duration, 4),
+                "outcome": outcome, "helper": helper, "caller": caller
+            })
+
+    def instrument(self, driver):
+        """
+        This method wraps the driver command execution, element commands go through it as well
+        :param driver: it takes the driver instance
+        :return: it returns the same driver instance
+        """
+        original_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            start_time = time.perf_counter()
+            try:
+                response = original_execute(driver_command, params)
+            except Exception as ex:
+                self.record(driver_command, params, time.perf_counter() - start_time, type(ex).__name__)
+                raise
+            self.record(driver_command, params, time.perf_counter() - start_time, "ok", response)
+            return response
+
+        driver.execute = execute
+        return driver
+
+    def export(self):
+        """
+        This method returns the recorded tests, ex- sent by an xdist worker to the controller
+        :return: it returns dictionary of test name & entry
+        """
+        with self._lock:
+            return {test_name: {key: value for key, value in entry.items() if key != "started_at"}
+                    for test_name, entry in self.tests.items()}
+
+    def merge(self, tests):
+        """
+        This method adds the tests recorded by another process, ex- an xdist worker
+        :param tests: it takes dictionary of test name & entry returned by export
+        :return: it returns nothing
+        """
+        with self._lock:
+            for test_name, entry in tests.items():
+                merged = self._test_entry(test_name)
+                merged["commands"].extend(entry["commands"])
+                merged["wait_time"] += entry["wait_time"]
+                merged["duration"] += entry["duration"]
+                for helper, seconds in entry["waits"].items():
+                    merged["waits"][helper] = merged["waits"].get(helper, 0.0) + seconds
+
+    def summarize(self, slowest=5):
+        """
+        This method builds the per test breakdown
+        :param slowest: it takes the number of slowest commands to keep per test
+        :return: it returns dictionary of test name & breakdown
+        """
+        summary = {}
+        for test_name, entry in self.tests.items():
+            commands = entry["commands"]
+            by_caller = {}
+            for command in commands:
+                key = command["caller"] or command["helper"] or "<direct>"
+                by_caller[key] = by_caller.get(key, 0.0) + command["duration"]
+            summary[test_name] = {
+                "duration": round(entry["duration"], 3),
+                "commands": len(commands),
+                "command_time": round(sum(command["duration"] for command in commands), 3),
+                "wait_time": round(entry["wait_time"], 3),
+                "waits": {helper: round(seconds, 3) for helper, seconds in entry["waits"].items()},
+                "command_time_by_caller": dict(sorted(by_caller.items(), key=lambda item: -item[1])),
+                "slowest_commands": sorted(commands, key=lambda command: -command["duration"])[:slowest]
+            }
+        return summary
+
+    def write_report(self, report_file=None):
+        """
+        This method writes the per test breakdown as json
+        :param report_file: it takes the report path, Logs/command_timings.json by default
+        :return: it returns the report path
+        """
+        if report_file is None:
+            cur_path = os.path.abspath(os.path.dirname(__file__))
+            report_file = os.path.join(cur_path, r"../Logs/command_timings.json")
+        os.makedirs(os.path.dirname(report_file), exist_ok=True)
+        with open(report_file, "w") as write_file:
+            json.dump(self.summarize(), write_file, indent=2)
+        return report_file
+
+
+command_timings = CommandTimings()
@@ -0,0 +1,257 @@
+""" This module contains the record & replay of the WebDriver request/ response stream. """
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+from FrameworkUtilities.logger_utility import custom_logger
+from SupportLibraries.pooled_connection import PooledConnection
+
+SESSION_SEGMENT = "session"
+
+# commands issued from background threads, they are matched in any order
+UNORDERED_COMMANDS = ("screenshot",)
+
+# parameters which are expected to change between a recording & its replay
+VOLATILE_PARAMS = {
+    "newSession": None,
+    "sendKeysToElement": ("text", "value"),
+    "setValue": ("text", "value"),
+}
+
+
+class ReplayDivergenceError(AssertionError):
+    """
+    This class is raised when the replayed command sequence differs from the recording.
+    """
+
+
+class SessionRecorder:
+    """
+    This class records the WebDriver request/ response stream per test & serves it back in replay mode.
+    Commands outside of the tests ex- the session creation & quit are kept in a separate session segment.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    def __init__(self):
+        self.mode = None
+        self.directory = None
+        self.current_test = None
+        # the session scope is per thread, a session created in the background must not capture the test commands
+        self._scope = threading.local()
+        self._segments = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def configure(self, mode, directory):
+        """
+        This method sets the recorder mode
+        :param mode: it takes record, replay or None
+        :param directory: it takes the directory of the recording files
+        :return: it returns nothing
+        """
+        self.mode = mode
+        self.directory = directory
+        if self.recording:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def command_key(command, params):
+        """
+        This method builds the comparable form of a command, without the session id & volatile parameters
+        :param command: it takes the command name
+        :param params: it takes the command parameters
+        :return: it returns the json string of the command & its parameters
+        """
+        volatile = VOLATILE_PARAMS.get(command, ())
+        if volatile is None:
+            return json.dumps([command])
+        params = {key: value for key, value in (params or {}).items() if key != "sessionId" and key not in volatile}
+        return json.dumps([command, params], sort_keys=True, default=str)
+
+    def _segment_file(self, segment):
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", segment) + ".json.gz")
+
+    def _segment_name(self):
+        return getattr(self._scope, "segment", None) or self.current_test or SESSION_SEGMENT
+
+    def _load_segment(self, segment):
+        segment_file = self._segment_file(segment)
+        if not os.path.exists(segment_file):
+            raise ReplayDivergenceError("No recording for '" + segment + "' at " + segment_file)
+        with gzip.open(segment_file, "rt", encoding="utf-8") as read_file:
+            commands = json.load(read_file)["commands"]
+        return {"ordered": [entry for entry in commands if entry[0] not in UNORDERED_COMMANDS],
+                "unordered": [entry for entry in commands if entry[0] in UNORDERED_COMMANDS]}
+
+    def _write_segment(self, segment):
+        commands = self._segments.pop(segment, [])
+        if not commands:
+            return
+        # serialized before the file is opened, an error does not leave a corrupt segment behind
+        data = json.dumps({"segment": segment, "commands": commands}, separators=(",", ":")).encode("utf-8")
+        segment_file = self._segment_file(segment)
+        temp_file = segment_file + ".tmp"
+        # mtime is fixed so an unchanged recording gives an identical file
+        with open(temp_file, "wb") as raw_file:
+            with gzip.GzipFile(fileobj=raw_file, mode="wb", mtime=0) as gzip_file:
+                gzip_file.write(data)
+        os.replace(temp_file, segment_file)
+
+    def start_test(self, test_name):
+        self.current_test = test_name
+
+    def end_test(self):
+        test_name, self.current_test = self.current_test, None
+        if self.recording:
+            with self._lock:
+                self._write_segment(test_name)
+        elif self.replaying:
+            self._report_unused(test_name)
+
+    @contextmanager
+    def session_scope(self):
+        """
+        This context manager routes the commands of the calling thread to the session segment
+        ex- session creation, startup reset & quit
+        :return: it returns nothing
+        """
+        previous = getattr(self._scope, "segment", None)
+        self._scope.segment = SESSION_SEGMENT
+        try:
+            yield
+        finally:
+            self._scope.segment = previous
+
+    def finish(self):
+        """
+        This method writes the session segment of the recording & reports the unused session commands
+        :return: it returns nothing
+        """
+        if self.recording:
+            with self._lock:
+                self._write_segment(SESSION_SEGMENT)
+        elif self.replaying:
+            self._report_unused(SESSION_SEGMENT)
+
+    def record(self, command, params, response):
+        """
+        This method appends a command & its raw response to the current segment
+        :param command: it takes the command name
+        :param params: it takes the command parameters
+        :param response: it takes the raw response dictionary
+        :return: it returns nothing
+        """
+        params = {key: value for key, value in (params or {}).items() if key != "sessionId"}
+        with self._lock:
+            self._segments.setdefault(self._segment_name(), []).append([command, params, response])
+
+    def replay(self, command, params):
+        """
+        This method serves the recorded response of the command, a poll repeated more or less often
+        than in the recording is tolerated, any other difference raises ReplayDivergenceError
+        :param command: it takes the command name
+        :param params: it takes the command parameters
+        :return: it returns the recorded raw response dictionary
+        """
+        segment = self._segment_name()
+        key = self.command_key(command, params)
+        with self._lock:
+            if segment not in self._segments:
+                self._segments[segment] = self._load_segment(segment)
+                self._cursors.setdefault(segment, 0)
+
+            if command in UNORDERED_COMMANDS:
+                unordered = self._segments[segment]["unordered"]
+                for index, entry in enumerate(unordered):
+                    if self.command_key(entry[0], entry[1]) == key:
+                        return unordered.pop(index)[2]
+                raise ReplayDivergenceError(segment + ": unexpected command " + key)
+
+            ordered = self._segments[segment]["ordered"]
+            cursor = self._cursors[segment]
+            previous = self.command_key(*ordered[cursor - 1][:2]) if cursor > 0 else None
+
+            # the recording polled more often, skip the extra polls
+            position = cursor
+            while position < len(ordered) and self.command_key(*ordered[position][:2]) != key \
+                    and self.command_key(*ordered[position][:2]) == previous:
+                position += 1
+
+            if position < len(ordered) and self.command_key(*ordered[position][:2]) == key:
+                self._cursors[segment] = position + 1
+                return ordered[position][2]
+            if key == previous:
+                # the replay polls more often, serve the last poll again
+                return ordered[cursor - 1][2]
+
+            expected = self.command_key(*ordered[cursor][:2]) if cursor < len(ordered) else "<end of recording>"
+            raise ReplayDivergenceError(segment + ": command #" + str(cursor) + " diverged from the recording\n"
+                                        + "expected: " + expected + "\nactual:   " + key)
+
+    def _report_unused(self, segment):
+        recorded = self._segments.pop(segment, None)
+        if recorded is None:
+            return
+        unused = len(recorded["ordered"]) - self._cursors.pop(segment, 0)
+        if unused > 0:
+            self.log.warning("%s: %s recorded command(s) were not replayed", segment, unused)
+
+    def connection(self, remote_server_addr):
+        """
+        This method returns the command executor for the current mode
+        :param remote_server_addr: it takes the appium server url
+        :return: it returns the recording/ replay connection or the pooled connection when not enabled
+        """
+        if self.recording:
+            return RecordingConnection(remote_server_addr, recorder=self)
+        if self.replaying:
+            return ReplayConnection(remote_server_addr, recorder=self)
+        return PooledConnection(remote_server_addr)
+
+
+class RecordingConnection(PooledConnection):
+    """
+    This class sends the commands to the appium server & records the raw responses.
+    """
+
+    def __init__(self, remote_server_addr, recorder, keep_alive=True):
+        super().__init__(remote_server_addr, keep_alive=keep_alive)
+        self.recorder = recorder
+
+    def execute(self, command, params):
+        response = super().execute(command, params)
+        # the driver replaces the element references of the response with WebElement objects in place,
+        # the recording keeps a copy of the raw response
+        self.recorder.record(command, params, json.loads(json.dumps(response)))
+        return response
+
+
+class ReplayConnection(PooledConnection):
+    """
+    This class serves the commands from the recording, nothing is sent to the server.
+    """
+
+    def __init__(self, remote_server_addr, recorder):
+        super().__init__(remote_server_addr, keep_alive=False)
+        self.recorder = recorder
+
+    def execute(self, command, params):
+        # the driver changes the response in place, a repeated poll gets its own copy of the recorded one
+        return json.loads(json.dumps(self.recorder.replay(command, params)))
+
+
+driver_recording = SessionRecorder()
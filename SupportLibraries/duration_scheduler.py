@@ -0,0 +1,131 @@
+""" This module contains the duration aware ordering & sharding of the collected tests. """
+
+import zlib
+
+from xdist.scheduler import LoadScopeScheduling
+
+from ResourceFiles.constants import ResetLevel
+
+
+def get_app_state(item):
+    """
+    This method returns the starting app state a test requires, from its app_state marker
+    :param item: it takes the pytest item
+    :return: it returns tuple of app state & the reset level restoring it, (None, None) when not marked
+    """
+    marker = item.get_closest_marker("app_state") if hasattr(item, "get_closest_marker") else None
+    if marker is None:
+        return None, None
+    restore = marker.kwargs.get("restore", marker.args[1] if len(marker.args) > 1 else None)
+    return marker.args[0], ResetLevel(restore) if restore is not None else None
+
+
+def node_id(item):
+    return getattr(item, "nodeid", item)
+
+
+def select_shard(items, history, shard_index, shard_count):
+    """
+    This method splits the tests into balanced shards by their historical durations (LPT), without any
+    history the tests are spread by a hash of their node id, either way every machine computes the same split
+    :param items: it takes the collected pytest items
+    :param history: it takes the timing history
+    :param shard_index: it takes the index of this shard, from 0
+    :param shard_count: it takes the number of shards
+    :return: it returns tuple of the selected items, the deselected items & the predicted duration of this shard
+    """
+    if history.has_history():
+        scheduler = DurationScheduler(history, shard_count)
+        selected_ids = {node_id(item) for item in scheduler.assign(items)[shard_index]}
+    else:
+        selected_ids = {node_id(item) for item in items
+                        if zlib.crc32(node_id(item).encode("utf-8")) % shard_count == shard_index}
+    selected = [item for item in items if node_id(item) in selected_ids]
+    deselected = [item for item in items if node_id(item) not in selected_ids]
+    return selected, deselected, sum(history.predict(node_id(item)) for item in selected)
+
+
+class DurationScheduler:
+    """
+    This class orders the tests longest first over the workers (LPT) & keeps the tests sharing a starting
+    app state next to each other on a worker, so the reset between them can be reduced.
+    """
+
+    def __init__(self, history, worker_count=1):
+        self.history = history
+        self.worker_count = max(1, worker_count)
+        self.slots = []
+        self.predicted_makespan = 0.0
+
+    def assign(self, items):
+        """
+        This method assigns the tests to worker slots, each test goes to the least loaded slot, longest first
+        :param items: it takes the collected pytest items or their node ids
+        :return: it returns list of slots, each a list of items
+        """
+        self.slots = [[] for _ in range(self.worker_count)]
+        loads = [0.0] * self.worker_count
+        for item in sorted(items, key=lambda test: (-self.history.predict(node_id(test)), node_id(test))):
+            slot = loads.index(min(loads))
+            self.slots[slot].append(item)
+            loads[slot] += self.history.predict(node_id(item))
+        self.predicted_makespan = max(loads) if items else 0.0
+        return self.slots
+
+    def order_slot(self, items):
+        """
+        This method groups the tests of a slot by app state, the costlier groups & tests first
+        :param items: it takes the items of one slot
+        :return: it returns the ordered items
+        """
+        groups = {}
+        for item in items:
+            groups.setdefault(get_app_state(item)[0] or "", []).append(item)
+        ordered = []
+        for group in sorted(groups.values(), key=lambda tests: -sum(self.history.predict(node_id(test))
+                                                                    for test in tests)):
+            ordered.extend(sorted(group, key=lambda test: -self.history.predict(node_id(test))))
+        return ordered
+
+    def slot_names(self, node_ids):
+        """
+        This method returns the slot of each test, the xdist controller runs each slot on one worker
+        :param node_ids: it takes the collected node ids
+        :return: it returns dictionary of node id & slot name ex- schedule_slot_0
+        """
+        return {test: "schedule_slot_" + str(index)
+                for index, slot in enumerate(self.assign(node_ids)) for test in slot}
+
+    def schedule(self, items, pin_to_workers=False):
+        """
+        This method reorders the items in place
+        :param items: it takes the collected pytest items
+        :param pin_to_workers: it takes boolean value to keep the tests slot by slot, SlotScheduling runs each slot
+                               on one xdist worker in this order
+        :return: it returns nothing
+        """
+        slots = self.assign(items)
+        if self.worker_count == 1 or pin_to_workers:
+            ordered = [item for slot in slots for item in self.order_slot(slot)]
+        else:
+            # xdist load scheduling hands the next test to the first free worker, longest first keeps it close to LPT
+            ordered = sorted(items, key=lambda test: -self.history.predict(node_id(test)))
+        items[:] = ordered
+
+
+class SlotScheduling(LoadScopeScheduling):
+    """
+    This class is the xdist scheduler of --duration-schedule with --dist loadgroup, each slot of the
+    DurationScheduler is one work unit, so every worker runs a precomputed balanced share in the slot order.
+    """
+
+    def __init__(self, config, log, scheduler):
+        super().__init__(config, log)
+        self.scheduler = scheduler
+        self.slots = None
+
+    def _split_scope(self, nodeid):
+        # the scope is asked once the collection of the workers is complete, every worker collected the same ids
+        if self.slots is None:
+            self.slots = self.scheduler.slot_names(self.collection)
+        return self.slots.get(nodeid, nodeid)
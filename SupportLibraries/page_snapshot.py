@@ -0,0 +1,97 @@
+"""
+This module evaluates element locators against a single page source snapshot.
+"""
+
+import xml.etree.ElementTree as ElementTree
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+class PageSourceSnapshot:
+    """
+    This class parses a page source once and resolves id, xpath & accessibility_id locators locally.
+    """
+
+    # attributes holding the element id / accessibility id for android & ios page sources
+    id_attributes = ("resource-id", "name")
+    accessibility_attributes = ("content-desc", "name", "label")
+    visibility_attributes = ("displayed", "visible")
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+        self.root = ElementTree.fromstring(page_source.encode("utf-8"))
+        self._lxml_root = None
+
+    @staticmethod
+    def _is_visible(node):
+        for attribute in PageSourceSnapshot.visibility_attributes:
+            value = node.get(attribute)
+            if value is not None:
+                return value.lower() == "true"
+        return True
+
+    def _find_by_attribute(self, attributes, value):
+        nodes = []
+        for node in self.root.iter():
+            for attribute in attributes:
+                attribute_value = node.get(attribute)
+                if attribute_value is None:
+                    continue
+                # android resource ids can be given with or without the package prefix
+                if attribute_value == value or attribute_value.endswith(":id/" + value):
+                    nodes.append(node)
+                    break
+        return nodes
+
+    def _find_by_xpath(self, xpath):
+        if lxml_etree is not None:
+            if self._lxml_root is None:
+                self._lxml_root = lxml_etree.fromstring(self.page_source.encode("utf-8"))
+            try:
+                result = self._lxml_root.xpath(xpath)
+            except lxml_etree.XPathError:
+                return None
+            return [node for node in result if hasattr(node, "get")]
+
+        # element tree supports a subset of xpath relative to a parent node only
+        wrapper = ElementTree.Element("snapshot")
+        wrapper.append(self.root)
+        relative_xpath = "." + xpath if xpath.startswith("/") else xpath
+        try:
+            return wrapper.findall(relative_xpath)
+        except (SyntaxError, KeyError):
+            return None
+
+    def find_nodes(self, locator_properties, locator_type="id"):
+        """
+        This method finds the page source nodes matching the locator
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :return: it returns list of matching nodes or None when the locator can not be evaluated locally
+        """
+        locator_type = locator_type.lower()
+        if locator_type == "id":
+            return self._find_by_attribute(self.id_attributes, locator_properties)
+        if locator_type == "accessibility_id":
+            return self._find_by_attribute(self.accessibility_attributes, locator_properties)
+        if locator_type == "xpath":
+            return self._find_by_xpath(locator_properties)
+        return None
+
+    def is_located(self, locator_properties, locator_type="id", state="present"):
+        """
+        This method checks the locator against the snapshot
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :param state: it takes the expected element state ex- present, visible
+        :return: it returns True/ False or None when the locator can not be evaluated locally
+        """
+        nodes = self.find_nodes(locator_properties, locator_type)
+        if nodes is None:
+            return None
+        if state == "visible":
+            return any(self._is_visible(node) for node in nodes)
+        return len(nodes) > 0
@@ -0,0 +1,90 @@
+"""
+This module contains the polling policies used by the UIHelpers waits.
+"""
+
+import abc
+import time
+
+
+class PollingPolicy(abc.ABC):
+    """
+    This class is the base for all polling policies.
+    """
+
+    @abc.abstractmethod
+    def intervals(self):
+        """
+        This method yields the sleep intervals between two polls of a wait
+        :return: it returns a generator of intervals in seconds
+        """
+
+    def now(self):
+        """
+        This method returns the clock the wait timeout is measured with
+        :return: it returns the current time in seconds
+        """
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class FixedInterval(PollingPolicy):
+    """
+    This class polls at a fixed interval, same as the WebDriverWait default.
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+
+    def intervals(self):
+        while True:
+            yield self.interval
+
+    def __repr__(self):
+        return "FixedInterval(" + str(self.interval) + ")"
+
+
+class ExponentialBackoff(PollingPolicy):
+    """
+    This class polls fast at first & backs off exponentially up to a cap, so elements which
+    are already there are picked up quickly & long waits do not hammer the server.
+    """
+
+    def __init__(self, initial=0.05, factor=2.0, cap=1.0):
+        self.initial = initial
+        self.factor = factor
+        self.cap = cap
+
+    def intervals(self):
+        interval = self.initial
+        while True:
+            yield interval
+            interval = min(interval * self.factor, self.cap)
+
+    def __repr__(self):
+        return "ExponentialBackoff(" + str(self.initial) + ", " + str(self.factor) + ", " + str(self.cap) + ")"
+
+
+class ReplayedPolling(PollingPolicy):
+    """
+    This class polls with the intervals of the wrapped policy without sleeping. A replayed wait is served
+    from the recorded responses, so the intervals only move a virtual clock & the timeout still ends the wait
+    after about as many polls as in the recording. It is created per wait, the clock is not shared.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.skipped = 0.0
+
+    def intervals(self):
+        return self.policy.intervals()
+
+    def now(self):
+        return time.time() + self.skipped
+
+    def sleep(self, seconds):
+        self.skipped += seconds
+
+    def __repr__(self):
+        return "ReplayedPolling(" + repr(self.policy) + ")"
@@ -0,0 +1,181 @@
+"""
+This module contains the tuned http connection used as the remote command executor.
+
+It overrides _get_connection_manager & _request of the selenium RemoteConnection, these are not public api,
+so selenium & Appium-Python-Client are pinned in requirements.txt to the versions they were written against.
+"""
+
+import logging
+import threading
+import time
+
+import urllib3
+from appium.webdriver.appium_connection import AppiumConnection
+
+from FrameworkUtilities.logger_utility import custom_logger
+
+# the test thread & the screenshot pipeline worker issue commands concurrently. The pool is per process,
+# so it is not derived from the xdist worker count, every worker has its own driver & its own pool.
+DEFAULT_POOL_SIZE = 2
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "DELETE")
+
+
+class CountingPool:
+    """
+    This class is mixed into the urllib3 connection pools of a watched pool manager, it counts the connections
+    they open. The pools are cleared when the driver quits, the count is kept in the metrics.
+    """
+
+    metrics = None
+
+    def _new_conn(self):
+        self.metrics.connection_opened()
+        return super()._new_conn()
+
+
+class ConnectionMetrics:
+    """
+    This class holds the connection level metrics of all pooled connections of the process.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.request_time = 0.0
+        # tcp/ tls connections opened by the pools, a low count means the keep-alive works
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, retries, failed):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            self.failures += 1 if failed else 0
+            self.request_time += seconds
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def watch(self, manager):
+        """
+        This method makes the pools of the manager count the connections they open
+        :param manager: it takes the urllib3 pool manager, before its first request
+        :return: it returns the same pool manager
+        """
+        manager.pool_classes_by_scheme = {
+            scheme: type("Counting" + pool_class.__name__, (CountingPool, pool_class), {"metrics": self})
+            for scheme, pool_class in manager.pool_classes_by_scheme.items()}
+        return manager
+
+    def export(self):
+        """
+        This method returns the metrics of the process, an xdist worker sends them to the controller
+        :return: it returns dictionary of the metrics
+        """
+        with self._lock:
+            return {"requests": self.requests, "retries": self.retries, "failures": self.failures,
+                    "request_time": self.request_time, "connections_opened": self.connections_opened}
+
+    def merge(self, metrics):
+        """
+        This method adds the metrics exported by an xdist worker
+        :param metrics: it takes dictionary of the exported metrics
+        :return: it returns nothing
+        """
+        with self._lock:
+            self.requests += metrics["requests"]
+            self.retries += metrics["retries"]
+            self.failures += metrics["failures"]
+            self.request_time += metrics["request_time"]
+            self.connections_opened += metrics["connections_opened"]
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "retries": self.retries,
+            "failures": self.failures,
+            "average_request_time": round(self.request_time / self.requests, 4) if self.requests else 0.0
+        }
+
+
+class PooledConnection(AppiumConnection):
+    """
+    This class is the remote command executor with a sized keep-alive connection pool, separate connect
+    & read timeouts, bounded retry of idempotent commands & optional gzip response compression.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    pool_size = DEFAULT_POOL_SIZE
+    connect_timeout = 10.0
+    read_timeout = 300.0
+    max_retries = 2
+    retry_backoff = 0.5
+    compression = False
+    metrics = ConnectionMetrics()
+
+    def __init__(self, remote_server_addr, keep_alive=True):
+        super().__init__(remote_server_addr, keep_alive=keep_alive)
+
+    @classmethod
+    def configure(cls, pool_size=None, connect_timeout=10.0, read_timeout=300.0, max_retries=2, compression=False):
+        """
+        This method sets the connection settings used by the connections created afterwards
+        :param pool_size: it takes the number of connections kept per host, DEFAULT_POOL_SIZE when not given
+        :param connect_timeout: it takes the connect timeout in seconds
+        :param read_timeout: it takes the read timeout in seconds, it must cover the slowest appium command
+        :param max_retries: it takes the number of retries of idempotent commands on connection errors
+        :param compression: it takes boolean value to ask for gzip compressed responses
+        :return: it returns nothing
+        """
+        cls.pool_size = pool_size or DEFAULT_POOL_SIZE
+        cls.connect_timeout = connect_timeout
+        cls.read_timeout = read_timeout
+        cls.max_retries = max_retries
+        cls.compression = compression
+
+    @classmethod
+    def get_remote_connection_headers(cls, parsed_url, keep_alive=True):
+        headers = super().get_remote_connection_headers(parsed_url, keep_alive=keep_alive)
+        if cls.compression:
+            headers["Accept-Encoding"] = "gzip"
+        return headers
+
+    def _get_connection_manager(self):
+        pool_manager_init_args = {
+            "num_pools": 4,
+            "maxsize": self.pool_size,
+            "block": True,
+            "timeout": urllib3.Timeout(connect=self.connect_timeout, read=self.read_timeout),
+            # retries are done per command below, only for the idempotent ones
+            "retries": False
+        }
+        proxy_url = getattr(self, "_proxy_url", None)
+        if proxy_url:
+            manager = urllib3.ProxyManager(proxy_url, **pool_manager_init_args)
+        else:
+            manager = urllib3.PoolManager(**pool_manager_init_args)
+        return self.metrics.watch(manager)
+
+    def _request(self, method, url, body=None):
+        retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        start_time = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                response = super()._request(method, url, body=body)
+            except (urllib3.exceptions.ProtocolError, urllib3.exceptions.NewConnectionError,
+                    urllib3.exceptions.ConnectTimeoutError) as ex:
+                if attempt >= retries:
+                    self.metrics.record(time.perf_counter() - start_time, attempt, True)
+                    raise
+                attempt += 1
+                self.log.warning("%s %s failed, retry %s of %s: %s", method, url, attempt, retries, ex)
+                time.sleep(self.retry_backoff * attempt)
+                continue
+            self.metrics.record(time.perf_counter() - start_time, attempt, False)
+            return response
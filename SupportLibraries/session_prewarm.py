@@ -0,0 +1,142 @@
+""" This module contains the background creation of driver sessions ahead of their use. """
+
+import logging
+import threading
+import time
+
+from FrameworkUtilities.logger_utility import custom_logger
+
+
+class PrewarmedSession:
+    """
+    This class holds a driver session being created on a background thread.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.driver = None
+        self.lease = None
+        self.error = None
+        self.created_in = None
+        self.done = threading.Event()
+        self.taken = threading.Event()
+        # held by the keep-alive command, so the session is not handed out in the middle of it
+        self.lock = threading.Lock()
+
+
+class SessionPrewarmer:
+    """
+    This class creates driver sessions on background threads, so the session creation (app install &
+    instrumentation startup) overlaps the collection & the running tests instead of delaying them.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    def __init__(self, quit_session, discard_timeout=180, keepalive_interval=30):
+        self.quit_session = quit_session
+        self.discard_timeout = discard_timeout
+        # below the default appium newCommandTimeout of 60s, an idle session would be ended by the server
+        self.keepalive_interval = keepalive_interval
+        self.sessions = []
+        self.retiring = []
+        self._lock = threading.Lock()
+
+    def start(self, name, create_session, keep_alive=False):
+        """
+        This method starts creating a session on a background thread
+        :param name: it takes the session name used in the logs ex- session, spare session
+        :param create_session: it takes the callable creating the session, returning tuple of driver & device lease
+        :param keep_alive: it takes boolean value to send a command every keepalive_interval until it is taken
+        :return: it returns the pre-warmed session
+        """
+        session = PrewarmedSession(name)
+        with self._lock:
+            self.sessions.append(session)
+        threading.Thread(target=self._create, args=(session, create_session, keep_alive), name="session-prewarm",
+                         daemon=True).start()
+        return session
+
+    def _create(self, session, create_session, keep_alive):
+        started_at = time.time()
+        try:
+            session.driver, session.lease = create_session()
+            session.created_in = time.time() - started_at
+            self.log.info("Pre-warmed %s created in %.1fs", session.name, session.created_in)
+        except Exception as ex:
+            session.error = ex
+            self.log.error("Unable to pre-warm %s after %.1fs: %s", session.name, time.time() - started_at, ex)
+        finally:
+            session.done.set()
+        if keep_alive and session.error is None:
+            self._keep_alive(session)
+
+    def _keep_alive(self, session):
+        while not session.taken.wait(self.keepalive_interval):
+            with session.lock:
+                if session.taken.is_set():
+                    return
+                try:
+                    session.driver.get_window_size()
+                except Exception as ex:
+                    # the session is checked again before it is used
+                    self.log.error("Keep-alive of pre-warmed %s failed: %s", session.name, ex)
+                    return
+
+    def pending(self):
+        with self._lock:
+            return len(self.sessions)
+
+    def take(self):
+        """
+        This method hands out the oldest pre-warmed session, it waits when the session is still being created
+        :return: it returns tuple of driver & device lease, None when no session could be pre-warmed
+        """
+        with self._lock:
+            if not self.sessions:
+                return None
+            session = self.sessions.pop(0)
+        started_at = time.time()
+        session.done.wait()
+        with session.lock:
+            session.taken.set()
+        if session.error is not None:
+            return None
+        self.log.info("Using pre-warmed %s, waited %.1fs of its %.1fs creation", session.name,
+                      time.time() - started_at, session.created_in)
+        return session.driver, session.lease
+
+    def retire(self, driver, lease):
+        """
+        This method quits a replaced session on a background thread
+        :param driver: it takes the driver instance
+        :param lease: it takes the device lease of the driver
+        :return: it returns nothing
+        """
+        thread = threading.Thread(target=self._quit, args=(driver, lease), name="session-retire", daemon=True)
+        with self._lock:
+            self.retiring.append(thread)
+        thread.start()
+
+    def _quit(self, driver, lease):
+        try:
+            self.quit_session(driver, lease)
+        except Exception as ex:
+            self.log.error("Unable to quit the driver session: %s", ex)
+
+    def discard(self):
+        """
+        This method quits the pre-warmed sessions which were not used & waits for the retired ones
+        :return: it returns nothing
+        """
+        with self._lock:
+            sessions, self.sessions = self.sessions, []
+            retiring, self.retiring = self.retiring, []
+        for session in sessions:
+            with session.lock:
+                session.taken.set()
+            if not session.done.wait(self.discard_timeout):
+                self.log.error("Pre-warmed %s is still being created, it is left to the server timeout", session.name)
+            elif session.driver is not None:
+                self._quit(session.driver, session.lease)
+        for thread in retiring:
+            thread.join(self.discard_timeout)
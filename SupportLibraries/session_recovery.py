@@ -0,0 +1,254 @@
+""" This module contains the driver session holder & the in-session recovery used to rerun failed tests. """
+
+import logging
+import time
+
+import pytest
+
+from FrameworkUtilities.caps_profile_utility import CapabilityProfileError
+from FrameworkUtilities.logger_utility import custom_logger
+from ResourceFiles.constants import ResetLevel
+from SupportLibraries.app_reset import AppResetter
+from SupportLibraries.driver_factory import DriverFactory
+from SupportLibraries.driver_recording import driver_recording
+from SupportLibraries.session_prewarm import SessionPrewarmer
+
+# recovery steps before a rerun, from the cheapest, a step failing escalates to the next one
+RECOVERY_STEPS = ("relaunch", "clear_data", "new_session")
+
+
+class DriverSession:
+    """
+    This class holds the driver of the test session, so it can be recreated when the in-session recovery fails,
+    the session can be pre-warmed on a background thread.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    def __init__(self, platform, device_pool=None, worker_count=1):
+        self.platform = platform
+        self.device_pool = device_pool
+        self.worker_count = worker_count
+        self.driver = None
+        self.lease = None
+        self.classes = []
+        self.prewarmer = None
+
+    def _create_pool_driver(self, wait_for_device=True):
+        """
+        This method leases a device from the pool & creates the driver on it,
+        devices failing to start a session are quarantined & the next one is tried
+        """
+        for _ in range(len(self.device_pool.devices(self.platform))):
+            lease = self.device_pool.acquire(self.platform, timeout=None if wait_for_device else 0)
+            try:
+                return DriverFactory(self.platform, server=lease.server,
+                                     capabilities=lease.capabilities).get_driver_instance(), lease
+            except CapabilityProfileError:
+                self.device_pool.release(lease)
+                raise
+            except Exception as ex:
+                self.device_pool.quarantine(lease, "session creation failed: " + str(ex))
+        raise RuntimeError("Unable to create driver session on any device of the pool for platform: " + self.platform)
+
+    def create(self, reset_level, wait_for_device=True):
+        """
+        This method creates a driver session & resets the app
+        :param reset_level: it takes the startup reset level
+        :param wait_for_device: it takes boolean value to wait for a free device of the pool
+        :return: it returns tuple of driver & device lease, the lease is None without a device pool
+        """
+        started_at = time.time()
+        lease = None
+        with driver_recording.session_scope():
+            if self.device_pool is not None:
+                driver, lease = self._create_pool_driver(wait_for_device)
+            else:
+                driver = DriverFactory(self.platform).get_driver_instance()
+            AppResetter(driver).reset(reset_level)
+        driver._platform = self.platform
+        self.log.info("Driver session created in %.1fs", time.time() - started_at)
+        return driver, lease
+
+    def prewarm(self, reset_level):
+        """
+        This method starts creating the session on a background thread, start picks it up
+        :param reset_level: it takes the startup reset level
+        :return: it returns nothing
+        """
+        self.prewarmer = SessionPrewarmer(self._quit)
+        self.prewarmer.start("session", lambda: self.create(reset_level))
+
+    def is_alive(self, driver):
+        """
+        This method checks that the session still answers, ex- a pre-warmed session ended by the server
+        :param driver: it takes the driver instance
+        :return: it returns boolean value
+        """
+        try:
+            driver.page_source
+            return True
+        except Exception as ex:
+            self.log.error("Driver session is not usable: %s", ex)
+            return False
+
+    def can_keep_spare(self):
+        """
+        This method checks if a spare session can be pre-warmed, its device must not be needed by the
+        other workers, every worker leases one device
+        :return: it returns boolean value
+        """
+        return self.device_pool is not None and self.device_pool.available(self.platform) > self.worker_count
+
+    def start(self, reset_level):
+        """
+        This method starts the driver session, a pre-warmed one is used when it still answers & with a device
+        pool having more devices than workers a spare session is pre-warmed for replacing a crashed one
+        :param reset_level: it takes the startup reset level
+        :return: it returns the driver
+        """
+        session = self.prewarmer.take() if self.prewarmer is not None else None
+        if session is not None and not self.is_alive(session[0]):
+            self.prewarmer.retire(*session)
+            session = None
+        self.driver, self.lease = session or self.create(reset_level)
+        if self.prewarmer is not None and not self.prewarmer.pending() and self.can_keep_spare():
+            self.prewarmer.start("spare session", lambda: self.create(reset_level, wait_for_device=False),
+                                 keep_alive=True)
+        for cls in self.classes:
+            setattr(cls, "driver", self.driver)
+        return self.driver
+
+    def bind(self, cls):
+        """
+        This method sets the driver on a running test class, it is set again when the session is recreated
+        :param cls: it takes the test class
+        :return: it returns nothing
+        """
+        if cls not in self.classes:
+            self.classes.append(cls)
+        setattr(cls, "driver", self.driver)
+
+    def _quit(self, driver, lease):
+        try:
+            with driver_recording.session_scope():
+                driver.quit()
+        finally:
+            if lease is not None:
+                self.device_pool.release(lease)
+
+    def quit(self):
+        """
+        This method quits the driver session, returns the device to the pool & discards the unused
+        pre-warmed sessions
+        :return: it returns nothing
+        """
+        lease, self.lease = self.lease, None
+        try:
+            self._quit(self.driver, lease)
+        finally:
+            if self.prewarmer is not None:
+                self.prewarmer.discard()
+
+    def recreate(self, reset_level):
+        """
+        This method replaces the driver session with a new one, a failing quit of the old session is ignored
+        :param reset_level: it takes the startup reset level of the new session
+        :return: it returns the new driver
+        """
+        driver, lease = self.driver, self.lease
+        if self.prewarmer is not None and self.prewarmer.pending():
+            # the spare session runs on another device, the old one is quit while the tests go on
+            self.start(reset_level)
+            self.prewarmer.retire(driver, lease)
+            return self.driver
+
+        self.lease = None
+        try:
+            self._quit(driver, lease)
+        except Exception as ex:
+            self.log.error("Unable to quit the driver session: %s", ex)
+        return self.start(reset_level)
+
+    def recover(self, first_step, reset_level):
+        """
+        This method brings the app back to a clean state, starting with the given recovery step & escalating
+        to the next one until a step succeeds
+        :param first_step: it takes the index of the first recovery step in RECOVERY_STEPS
+        :param reset_level: it takes the startup reset level used when the session is recreated
+        :return: it returns the name of the recovery step which worked
+        """
+        for step in RECOVERY_STEPS[min(first_step, len(RECOVERY_STEPS) - 1):]:
+            try:
+                if step == "new_session":
+                    self.recreate(reset_level)
+                else:
+                    AppResetter(self.driver).reset(ResetLevel(step))
+                # a dead session fails on the next command, check it before the rerun
+                self.driver.page_source
+                self.log.info("Recovered the session with: %s", step)
+                return step
+            except Exception as ex:
+                self.log.error("Recovery step %s failed: %s", step, ex)
+        raise RuntimeError("Unable to recover the driver session")
+
+
+class RerunPolicy:
+    """
+    This class picks the recovery before each rerun of a failed test & counts the reruns of the run, the reruns
+    themselves are done by pytest-rerunfailures (--reruns, --max-suite-reruns).
+    """
+
+    def __init__(self, max_reruns=0, budget=None):
+        self.max_reruns = max_reruns
+        self.budget = budget
+        self.attempts = {}
+
+    @property
+    def used(self):
+        return sum(self.attempts.values())
+
+    @staticmethod
+    def recovery_step(execution_count):
+        """
+        This method returns the first recovery step of an attempt, it escalates with every rerun of the test
+        :param execution_count: it takes the attempt number set by pytest-rerunfailures, from 1
+        :return: it returns the index of the step in RECOVERY_STEPS, None for the first attempt
+        """
+        return execution_count - 2 if execution_count > 1 else None
+
+    def record(self, report):
+        """
+        This method counts the reruns of the test from its reports, the xdist controller gets the reports of
+        every worker
+        :param report: it takes the test report
+        :return: it returns nothing
+        """
+        if report.outcome == "rerun":
+            # a failed setup & teardown of the same attempt are both reported as rerun
+            self.attempts[report.nodeid] = max(self.attempts.get(report.nodeid, 0), getattr(report, "rerun", 0) + 1)
+
+
+class RerunPlugin:
+    """
+    This class is the pytest plugin recovering the driver session before a rerun of pytest-rerunfailures,
+    the failed attempts stay in the report as RERUN so allure keeps each of them as a retry of the test.
+    """
+
+    log = custom_logger(logging.INFO)
+
+    def __init__(self, rerun_policy):
+        self.rerun_policy = rerun_policy
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        step = self.rerun_policy.recovery_step(getattr(item, "execution_count", 1))
+        if step is None:
+            return
+        self.log.info("Rerunning %s, rerun %s of %s", item.nodeid, step + 1, self.rerun_policy.max_reruns)
+        driver_session = getattr(item.config, "driver_session", None)
+        if driver_session is not None:
+            driver_session.recover(step, item.config.getoption("--reset-level"))
+
+    def pytest_runtest_logreport(self, report):
+        self.rerun_policy.record(report)
@@ -0,0 +1,90 @@
+""" This module contains the per test time budget respected by the UIHelpers waits. """
+
+import time
+
+import pytest
+
+
+class TimeBudgetExceeded(pytest.fail.Exception):
+    """
+    This class fails the test when its time budget is used up, it is a pytest outcome so the
+    broad exception handlers of the helpers & page objects do not swallow it.
+    """
+
+
+class TimeBudget:
+    """
+    This class holds the time budget of the running test & the time spent in each helper wait.
+    """
+
+    def __init__(self):
+        self.seconds = None
+        self.test_name = None
+        self.started_at = None
+        self.waits = {}
+
+    def start(self, test_name, seconds):
+        """
+        This method starts the budget of a test
+        :param test_name: it takes the test name
+        :param seconds: it takes the budget in seconds, None for no budget
+        :return: it returns nothing
+        """
+        self.test_name = test_name
+        self.seconds = seconds
+        self.started_at = time.time()
+        self.waits = {}
+
+    def stop(self):
+        self.seconds = None
+        self.started_at = None
+
+    @property
+    def active(self):
+        return self.seconds is not None and self.started_at is not None
+
+    def remaining(self):
+        """
+        This method returns the time left in the budget
+        :return: it returns the seconds left or None when no budget is active
+        """
+        if not self.active:
+            return None
+        return self.seconds - (time.time() - self.started_at)
+
+    def limit(self, max_time_out):
+        """
+        This method limits a wait timeout to the time left in the budget
+        :param max_time_out: it takes the timeout of the wait
+        :return: it returns the smaller of the timeout & the time left, raises TimeBudgetExceeded when none is left
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return max_time_out
+        if remaining <= 0:
+            self.fail()
+        return min(max_time_out, remaining)
+
+    def record_wait(self, helper_name, seconds):
+        if self.active:
+            self.waits[helper_name] = self.waits.get(helper_name, 0.0) + seconds
+
+    def breakdown(self):
+        """
+        This method describes where the budget went
+        :return: it returns the breakdown text
+        """
+        elapsed = time.time() - self.started_at
+        wait_time = sum(self.waits.values())
+        lines = ["Time budget of " + str(self.seconds) + "s exceeded by " + str(self.test_name)
+                 + " after " + str(round(elapsed, 1)) + "s:"]
+        for helper_name, seconds in sorted(self.waits.items(), key=lambda item: -item[1]):
+            lines.append("    " + str(round(seconds, 1)) + "s waiting in " + helper_name)
+        lines.append("    " + str(round(max(elapsed - wait_time, 0.0), 1)) + "s in driver commands & test code")
+        return "\n".join(lines)
+
+    def fail(self):
+        raise TimeBudgetExceeded(self.breakdown(), pytrace=False)
+
+
+time_budget = TimeBudget()
@@ -3,19 +3,25 @@ This module contains most of the reusable functions to support test cases.
 """
 
 import logging
-import os
 import time
 from builtins import staticmethod
-from random import randint
+from contextlib import contextmanager
+from xml.etree.ElementTree import ParseError
 
 from appium.webdriver.common.mobileby import MobileBy
-from faker import Faker
-from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, \
+    TimeoutException, WebDriverException
 from selenium.webdriver import ActionChains
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 import FrameworkUtilities.logger_utility as log_utils
+from FrameworkUtilities.appearance_history_utility import AppearanceTimes
+from FrameworkUtilities.data_pool_utility import DataPool
+from FrameworkUtilities.screenshot_utility import ScreenshotPipeline
+from SupportLibraries.driver_instrumentation import command_timings
+from SupportLibraries.driver_recording import driver_recording
+from SupportLibraries.page_snapshot import PageSourceSnapshot
+from SupportLibraries.polling_policy import ExponentialBackoff, ReplayedPolling
+from SupportLibraries.time_budget import time_budget
 
 
 class UIHelpers:
@@ -25,8 +31,22 @@ class UIHelpers:
 
     log = log_utils.custom_logger(logging.INFO)
 
+    # page objects switch this on to reuse element references within a screen
+    use_element_cache = False
+
+    # default polling policy for all the waits, can be overridden per instance or per call
+    polling_policy = ExponentialBackoff()
+
     def __init__(self, driver):
         self.driver = driver
+        self.command_stats = {}
+        self._active_helper = None
+        self._command_count = 0
+        self.element_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_epoch = self.get_cache_epoch(driver)
+        self.poll_stats = {}
 
     @staticmethod
     def get_locator_type(locator_type):
@@ -48,11 +68,34 @@ class UIHelpers:
 
     @staticmethod
     def wait_for_sync(seconds=5):
-        time.sleep(seconds)
+        """
+        This method sleeps for a fixed time, limited by the test time budget like the waits
+        :param seconds: it takes the seconds to sleep
+        :return: it returns nothing, raises TimeBudgetExceeded when the test time budget runs out
+        """
+        budget_seconds = time_budget.limit(seconds)
+        time.sleep(budget_seconds)
+        time_budget.record_wait("wait_for_sync", budget_seconds)
+        if budget_seconds < seconds:
+            time_budget.fail()
 
     @staticmethod
     def generate_random_phone_number():
-        return '987' + str(randint(1234567, 9999999))
+        return DataPool.get_instance().next_phone_number()
+
+    @staticmethod
+    def get_cache_epoch(driver):
+        return getattr(driver, "_element_cache_epoch", 0)
+
+    @staticmethod
+    def invalidate_driver_caches(driver):
+        """
+        This method invalidates the element caches of every helper bound to the driver,
+        it has to be called after navigation or app reset
+        :param driver: it takes the driver instance as parameter
+        :return: it returns nothing
+        """
+        driver._element_cache_epoch = getattr(driver, "_element_cache_epoch", 0) + 1
 
     @staticmethod
     def get_locator(locator_dict):
@@ -60,97 +103,383 @@ class UIHelpers:
 
     @staticmethod
     def get_valid_user():
-        fake = Faker()
-        name = fake.name().split()
-        dob = fake.date_of_birth(minimum_age=11, maximum_age=20).strftime("%d/%m/%Y")
-        user = {
-            "first_name": name[0],
-            "last_name": name[1],
-            "dob": dob
-        }
-        return user
+        return DataPool.get_instance().next_user()
 
-    def is_element_present(self, locator_properties, locator_type="id", max_time_out=10):
+    @contextmanager
+    def track_commands(self, helper_name):
+        """
+        This context manager counts the driver commands issued by a helper method
+        :param helper_name: it takes the name of the helper method being tracked
+        :return: it returns nothing, counts are stored in command_stats
+        """
+        if self._active_helper is not None:
+            # nested helper calls are accounted to the outermost helper
+            yield
+            return
 
+        self._active_helper = helper_name
+        self._command_count = 0
+        command_timings.push_helper(helper_name)
+        try:
+            yield
+        finally:
+            command_timings.pop_helper()
+            stats = self.command_stats.setdefault(helper_name, {"calls": 0, "commands": 0, "last": 0})
+            stats["calls"] += 1
+            stats["commands"] += self._command_count
+            stats["last"] = self._command_count
+            self.log.info("%s issued %s driver command(s)", helper_name, self._command_count)
+            self._active_helper = None
+
+    def count_commands(self, count=1):
+        """
+        This method increments the driver command counter of the active helper
+        :param count: it takes the number of driver commands issued
+        :return: it returns nothing
         """
-        This method checks for presence of element & return the bollean value
+        self._command_count += count
+
+    def element_condition(self, locator_properties, locator_type="id", state="present"):
+        """
+        This method builds a wait condition which resolves & returns the element itself
         :param locator_properties: it takes locator string as parameter
         :param locator_type: it takes locator type as parameter
-        :param max_time_out: this is the maximum time to wait for particular element
+        :param state: it takes the expected element state ex- present, visible, clickable
+        :return: it returns a callable returning the element or False
+        """
+        by = self.get_locator_type(locator_type)
+
+        def _condition(driver):
+            self.count_commands()
+            element = driver.find_element(by, locator_properties)
+            return element if self.has_state(element, state) else False
+
+        return _condition
+
+    def has_state(self, element, state="present"):
+        """
+        This method checks that the element is in the expected state
+        :param element: it takes the element reference
+        :param state: it takes the expected element state ex- present, visible, clickable
+        :return: it returns boolean value, raises StaleElementReferenceException for a stale reference
+        """
+        if state in ("visible", "clickable"):
+            self.count_commands()
+            if not element.is_displayed():
+                return False
+        if state == "clickable":
+            self.count_commands()
+            if not element.is_enabled():
+                return False
+        return True
+
+    def wait_until(self, condition, max_time_out=10, poll_policy=None):
+
+        """
+        This method polls the condition according to the polling policy until it returns a truthy value
+        :param condition: it takes a callable accepting the driver as parameter
+        :param max_time_out: this is the maximum time to wait for the condition, limited by the test time budget
+        :param poll_policy: it takes the polling policy overriding the default one for this call
+        :return: it returns the value returned by the condition, raises TimeoutException on timeout
+                 & TimeBudgetExceeded when the test time budget runs out
+        """
+        policy = poll_policy or self.polling_policy
+        if driver_recording.replaying:
+            # the responses come from the recording, there is nothing to wait for
+            policy = ReplayedPolling(policy)
+        intervals = policy.intervals()
+        budget_time_out = time_budget.limit(max_time_out)
+        start_time = policy.now()
+        end_time = start_time + budget_time_out
+        polls = 0
+
+        while True:
+            polls += 1
+            try:
+                value = condition(self.driver)
+                if value:
+                    self.record_polls(polls, True)
+                    self.record_wait(policy.now() - start_time)
+                    return value
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+
+            remaining = end_time - policy.now()
+            if remaining <= 0:
+                self.record_polls(polls, False)
+                self.record_wait(policy.now() - start_time)
+                if budget_time_out < max_time_out:
+                    time_budget.fail()
+                raise TimeoutException("Condition not met after " + str(polls) + " poll(s) in "
+                                       + str(max_time_out) + " second(s)")
+            policy.sleep(min(next(intervals), remaining))
+
+    def record_wait(self, seconds):
+        helper_name = self._active_helper or "wait_until"
+        command_timings.record_wait(helper_name, seconds)
+        time_budget.record_wait(helper_name, seconds)
+
+    def record_polls(self, polls, success):
+        """
+        This method records the number of polls a wait needed, per helper method
+        :param polls: it takes the number of polls issued by the wait
+        :param success: it takes the wait outcome
+        :return: it returns nothing
+        """
+        stats = self.poll_stats.setdefault(self._active_helper or "wait_until",
+                                           {"waits": 0, "timeouts": 0, "polls_to_success": {}})
+        stats["waits"] += 1
+        if success:
+            stats["polls_to_success"][polls] = stats["polls_to_success"].get(polls, 0) + 1
+        else:
+            stats["timeouts"] += 1
+
+    def get_poll_stats(self):
         """
+        This method returns the polling statistics per helper method
+        :return: it returns dictionary of helper name & waits, timeouts, polls to success histogram
+        """
+        return self.poll_stats
+
+    def wait_for_element(self, locator_properties, locator_type="id", max_time_out=10, state="present",
+                         poll_policy=None):
+
+        """
+        This method waits once for the element state & returns the resolved element reference
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :param max_time_out: this is the maximum time to wait for particular element, with adaptive timeouts
+                             enabled it is replaced by the one learned for the locator on this device
+        :param state: it takes the expected element state ex- present, visible, clickable
+        :param poll_policy: it takes the polling policy overriding the default one for this call
+        :return: it returns the element or None
+        """
+        appearance_times = AppearanceTimes.get_instance()
+        max_time_out = appearance_times.timeout_for(self.driver, [(locator_properties, locator_type)], max_time_out,
+                                                    state)
+        start_time = time.time()
         try:
-            WebDriverWait(self.driver, max_time_out, ignored_exceptions=[StaleElementReferenceException]).until(
-                EC.presence_of_element_located((self.get_locator_type(locator_type), locator_properties))
-            )
-            return True
+            element = self.wait_until(self.element_condition(locator_properties, locator_type, state),
+                                      max_time_out, poll_policy)
         except WebDriverException:
-            self.log.error(
-                "Element is not present with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
+            self.log.error("Element is not %s with locator_properties: %s and locator_type: %s",
+                           state, locator_properties, locator_type)
+            appearance_times.record(self.driver, locator_properties, locator_type, state, time.time() - start_time,
+                                    appeared=False)
+            return None
+        appearance_times.record(self.driver, locator_properties, locator_type, state, time.time() - start_time)
+
+        if self.use_element_cache:
+            self.sync_cache_epoch()
+            self.element_cache[(locator_properties, locator_type)] = element
+        return element
+
+    def sync_cache_epoch(self):
+        """
+        This method drops the cached element references when the driver has been invalidated
+        :return: it returns nothing
+        """
+        epoch = self.get_cache_epoch(self.driver)
+        if epoch != self._cache_epoch:
+            self.element_cache.clear()
+            self._cache_epoch = epoch
+
+    def invalidate_element_cache(self, locator_properties=None, locator_type="id"):
+        """
+        This method drops cached element references
+        :param locator_properties: it takes locator string as parameter, all entries are dropped when None
+        :param locator_type: it takes locator type as parameter
+        :return: it returns nothing
+        """
+        if locator_properties is None:
+            self.element_cache.clear()
+        else:
+            self.element_cache.pop((locator_properties, locator_type), None)
+
+    def get_cached_element(self, locator_properties, locator_type="id", max_time_out=10, state="present"):
+
+        """
+        This method returns the cached element reference for the locator when it is still in the expected state,
+        or waits for the element
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :param max_time_out: this is the maximum time to wait for particular element
+        :param state: it takes the expected element state ex- present, visible, clickable
+        :return: it returns the element or None
+        """
+        if not self.use_element_cache:
+            return self.wait_for_element(locator_properties, locator_type, max_time_out, state)
+
+        self.sync_cache_epoch()
+        element = self.element_cache.get((locator_properties, locator_type))
+        if element is not None:
+            try:
+                in_state = self.has_state(element, state)
+            except StaleElementReferenceException:
+                self.invalidate_element_cache(locator_properties, locator_type)
+                in_state = False
+            if in_state:
+                self.cache_hits += 1
+                return element
+
+        self.cache_misses += 1
+        return self.wait_for_element(locator_properties, locator_type, max_time_out, state)
+
+    def perform_element_action(self, action, locator_properties, locator_type="id", max_time_out=10,
+                               state="present"):
+
+        """
+        This method resolves the element once & performs the action on the same reference,
+        a stale cached reference is dropped and looked up again
+        :param action: it takes a callable accepting the element as parameter
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :param max_time_out: this is the maximum time to wait for particular element
+        :param state: it takes the expected element state ex- present, visible, clickable
+        :return: it returns a tuple of the element (None when not found) and the action result
+        """
+        element = self.get_cached_element(locator_properties, locator_type, max_time_out, state)
+        if element is None:
+            return None, None
+
+        try:
+            return element, action(element)
+        except StaleElementReferenceException:
+            self.log.info("Stale element reference, looking up again locator_properties: %s", locator_properties)
+            self.invalidate_element_cache(locator_properties, locator_type)
+            element = self.wait_for_element(locator_properties, locator_type, max_time_out, state)
+            if element is None:
+                return None, None
+            return element, action(element)
+
+    def get_cache_stats(self):
+        """
+        This method returns the element cache counters
+        :return: it returns dictionary with hits, misses & size of the cache
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self.element_cache)}
+
+    def wait_for_any(self, locator_dicts, max_time_out=10, state="visible", poll_policy=None):
+
+        """
+        This method watches several locators in one polling loop & returns the first one located
+        :param locator_dicts: it takes list of locator dictionaries ex- [success, error, interstitial]
+        :param max_time_out: this is the maximum time to wait for any of the elements
+        :param state: it takes the expected element state ex- present, visible
+        :param poll_policy: it takes the polling policy overriding the default one for this call
+        :return: it returns the winning (locator_properties, locator_type) tuple or None
+        """
+
+        candidates = []
+        for locator_dict in locator_dicts:
+            candidates.extend(locator_dict.items())
+
+        def _any_located(driver):
+            for locator_properties, locator_type in candidates:
+                self.count_commands()
+                elements = driver.find_elements(self.get_locator_type(locator_type), locator_properties)
+                for element in elements:
+                    if state == "visible":
+                        self.count_commands()
+                        if not element.is_displayed():
+                            continue
+                    return locator_properties, locator_type
             return False
 
-    def verify_element_not_present(self, locator_properties, locator_type="id", max_time_out=10):
+        appearance_times = AppearanceTimes.get_instance()
+        max_time_out = appearance_times.timeout_for(self.driver, candidates, max_time_out, state)
+        start_time = time.time()
+        with self.track_commands("wait_for_any"):
+            try:
+                winner = self.wait_until(_any_located, max_time_out, poll_policy)
+            except WebDriverException:
+                self.log.error("None of the elements is %s with locator_properties: %s",
+                               state, ", ".join(locator for locator, _ in candidates))
+                for locator_properties, locator_type in candidates:
+                    appearance_times.record(self.driver, locator_properties, locator_type, state,
+                                            time.time() - start_time, appeared=False)
+                return None
+        appearance_times.record(self.driver, winner[0], winner[1], state, time.time() - start_time)
+
+        self.log.info("Located the element with locator_properties: %s and locator_type: %s", winner[0], winner[1])
+        return winner
+
+    def is_element_present(self, locator_properties, locator_type="id", max_time_out=10, poll_policy=None):
+
+        """
+        This method checks for presence of element & return the bollean value
+        :param locator_properties: it takes locator string as parameter
+        :param locator_type: it takes locator type as parameter
+        :param max_time_out: this is the maximum time to wait for particular element
+        :param poll_policy: it takes the polling policy overriding the default one for this call
+        :return: it returns the boolean value according to the element present or not
+        """
+
+        with self.track_commands("is_element_present"):
+            return self.wait_for_element(locator_properties, locator_type, max_time_out, "present",
+                                         poll_policy) is not None
+
+    def verify_element_not_present(self, locator_properties, locator_type="id", max_time_out=10, poll_policy=None):
 
         """
         This method is used to return the boolean value for element present
         :param locator_properties: it takes locator string as parameter
         :param locator_type: it takes locator type as parameter
         :param max_time_out: this is the maximum time to wait for particular element
+        :param poll_policy: it takes the polling policy overriding the default one for this call
         :return: it returns the boolean value according to the element present or not
         """
 
+        def _invisible(driver):
+            self.count_commands()
+            elements = driver.find_elements(self.get_locator_type(locator_type), locator_properties)
+            for element in elements:
+                try:
+                    self.count_commands()
+                    if element.is_displayed():
+                        return False
+                except StaleElementReferenceException:
+                    continue
+            return True
+
         try:
-            WebDriverWait(self.driver, max_time_out, ignored_exceptions=[StaleElementReferenceException]).until(
-                EC.invisibility_of_element_located((self.get_locator_type(locator_type), locator_properties))
-            )
+            with self.track_commands("verify_element_not_present"):
+                self.wait_until(_invisible, max_time_out, poll_policy)
             return True
         except WebDriverException:
-            self.log.error(
-                "Element is present with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
+            self.log.error("Element is present with locator_properties: %s and locator_type: %s",
+                           locator_properties, locator_type)
             return False
 
-    def is_element_displayed(self, locator_properties, locator_type="id", max_time_out=10):
+    def is_element_displayed(self, locator_properties, locator_type="id", max_time_out=10, poll_policy=None):
 
         """
         This method is used to return the boolean value for element displayed
         :param locator_properties: it takes locator string as parameter
         :param locator_type: it takes locator type as parameter
         :param max_time_out: this is the maximum time to wait for particular element
+        :param poll_policy: it takes the polling policy overriding the default one for this call
         :return: it returns the boolean value according to the element displayed or not
         """
 
-        try:
-            WebDriverWait(self.driver, max_time_out, ignored_exceptions=[StaleElementReferenceException]).until(
-                EC.visibility_of_element_located((self.get_locator_type(locator_type), locator_properties))
-            )
-            return True
-        except WebDriverException:
-            self.log.error(
-                "Element is not visible with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
-            return False
+        with self.track_commands("is_element_displayed"):
+            return self.wait_for_element(locator_properties, locator_type, max_time_out, "visible",
+                                         poll_policy) is not None
 
-    def is_element_clickable(self, locator_properties, locator_type="id", max_time_out=10):
+    def is_element_clickable(self, locator_properties, locator_type="id", max_time_out=10, poll_policy=None):
 
         """
         This method is used to return the boolean value for element clickable
         :param locator_properties: it takes locator string as parameter
         :param locator_type: it takes locator type as parameter
         :param max_time_out: this is the maximum time to wait for particular element
+        :param poll_policy: it takes the polling policy overriding the default one for this call
         :return: it returns the boolean value according to the element clickable or not
         """
 
-        try:
-            WebDriverWait(self.driver, max_time_out, ignored_exceptions=[StaleElementReferenceException]).until(
-                EC.element_to_be_clickable((self.get_locator_type(locator_type), locator_properties))
-            )
-            return True
-        except WebDriverException:
-            self.log.error(
-                "Element is not clickable with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
-            return False
+        with self.track_commands("is_element_clickable"):
+            return self.wait_for_element(locator_properties, locator_type, max_time_out, "clickable",
+                                         poll_policy) is not None
 
     def is_element_checked(self, locator_properties, locator_type="id", max_time_out=10):
 
@@ -163,35 +492,93 @@ class UIHelpers:
         """
         flag = False
 
-        if self.is_element_present(locator_properties, locator_type, max_time_out):
-            element = self.get_element(locator_properties, locator_type, max_time_out)
-            if element.is_selected():
-                flag = True
-            else:
-                self.log.error(
-                    "Element is not selected/ checked with locator_properties: " +
-                    locator_properties + " and locator_type: " + locator_type)
+        def _is_selected(element):
+            self.count_commands()
+            return element.is_selected()
+
+        with self.track_commands("is_element_checked"):
+            element, selected = self.perform_element_action(_is_selected, locator_properties, locator_type,
+                                                            max_time_out)
+            if element is not None:
+                if selected:
+                    flag = True
+                else:
+                    self.log.error("Element is not selected/ checked with locator_properties: %s and locator_type: %s",
+                                   locator_properties, locator_type)
 
         return flag
 
-    def verify_elements_located(self, locator_dict, max_timeout=10):
+    def locate_elements_in_snapshot(self, locator_dict, max_timeout=10, state="present", poll_policy=None):
+
+        """
+        This method evaluates all the locators against one page source snapshot & re-polls only
+        the locators which are still unresolved until the timeout
+        :param locator_dict: this parameter takes the list of locator value and it's type
+        :param max_timeout: this is the maximum time to wait for all the elements
+        :param state: it takes the expected element state ex- present, visible
+        :param poll_policy: it takes the polling policy overriding the default one for this call
+        :return: it returns dictionary of locator value and boolean result
+        """
+
+        results = {locator_prop: False for locator_prop in locator_dict}
+        unresolved = list(locator_dict.keys())
+
+        def _all_located(driver):
+            self.count_commands()
+            try:
+                snapshot = PageSourceSnapshot(driver.page_source)
+            except ParseError:
+                # a page source cut off while the screen changes is not an answer yet, it is polled again
+                return False
+            for locator_prop in list(unresolved):
+                prop_type = locator_dict[locator_prop]
+                located = snapshot.is_located(locator_prop, prop_type, state)
+                if located is None:
+                    # locator can not be evaluated on the snapshot, check it on the device instead
+                    try:
+                        located = bool(self.element_condition(locator_prop, prop_type, state)(driver))
+                    except (NoSuchElementException, StaleElementReferenceException):
+                        located = False
+                if located:
+                    results[locator_prop] = True
+                    unresolved.remove(locator_prop)
+            return not unresolved
+
+        with self.track_commands("locate_elements_in_snapshot"):
+            try:
+                self.wait_until(_all_located, max_timeout, poll_policy)
+            except TimeoutException:
+                self.log.error("Elements not located in page source snapshot: %s", ", ".join(unresolved))
+
+        return results
+
+    def verify_elements_located(self, locator_dict, max_timeout=10, use_snapshot=False):
 
         """
         This method is used to return the boolean value according to element presents on page
         :param locator_dict: this parameter takes the list of locator value and it's type
         :param max_timeout: this is the maximum time to wait for particular element
+        :param use_snapshot: it verifies all the elements against page source snapshots instead of one wait each
         :return: it returns the boolean value according to element presents on page
         """
 
+        if use_snapshot:
+            snapshot_results = self.locate_elements_in_snapshot(locator_dict, max_timeout)
+        else:
+            snapshot_results = None
+
         result = []
         for locator_prop in locator_dict.keys():
             prop_type = locator_dict[locator_prop]
-            if self.is_element_present(locator_prop, prop_type, max_timeout):
+            if snapshot_results is not None:
+                located = snapshot_results[locator_prop]
+            else:
+                located = self.is_element_present(locator_prop, prop_type, max_timeout)
+            if located:
                 result.append(True)
             else:
-                self.log.error(
-                    "Element not found with locator_properties: " + locator_prop +
-                    " and locator_type: " + locator_dict[locator_prop])
+                self.log.error("Element not found with locator_properties: %s and locator_type: %s",
+                               locator_prop, locator_dict[locator_prop])
                 result.append(False)
 
         if False in result:
@@ -209,13 +596,12 @@ class UIHelpers:
         :return: it returns the element value
         """
 
-        if self.is_element_present(locator_properties, locator_type, max_time_out):
-            return self.driver.find_element(self.get_locator_type(locator_type), locator_properties)
-        else:
-            self.log.error(
-                "Element not found with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
-            return None
+        with self.track_commands("get_element"):
+            element = self.get_cached_element(locator_properties, locator_type, max_time_out)
+        if element is None:
+            self.log.error("Element not found with locator_properties: %s and locator_type: %s",
+                           locator_properties, locator_type)
+        return element
 
     def get_list_of_elements(self, locator_properties, locator_type="id", max_time_out=10):
 
@@ -230,9 +616,8 @@ class UIHelpers:
         if self.is_element_present(locator_properties, locator_type, max_time_out):
             return self.driver.find_elements(locator_type, locator_properties)
         else:
-            self.log.error(
-                "Elements not found with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
+            self.log.error("Elements not found with locator_properties: %s and locator_type: %s",
+                           locator_properties, locator_type)
             return None
 
     def get_text_from_element(self, locator_properties, locator_type="id", max_time_out=10):
@@ -245,13 +630,23 @@ class UIHelpers:
         :return: it returns the element inner text value
         """
 
-        element = self.get_element(locator_properties, locator_type, max_time_out)
-        result_text = element.text
-        if len(result_text) == 0:
-            result_text = element.get_attribute("innerText")
-        elif len(result_text) != 0:
-            self.log.info("The text is: '" + result_text + "'")
-            result_text = result_text.strip()
+        def _get_text(element):
+            self.count_commands()
+            text = element.text
+            if len(text) == 0:
+                self.count_commands()
+                text = element.get_attribute("innerText")
+            return text
+
+        with self.track_commands("get_text_from_element"):
+            element, result_text = self.perform_element_action(_get_text, locator_properties, locator_type,
+                                                               max_time_out)
+            if element is None:
+                return None
+
+            if result_text:
+                self.log.info("The text is: '%s'", result_text)
+                result_text = result_text.strip()
 
         return result_text
 
@@ -265,12 +660,20 @@ class UIHelpers:
         :return: it returns the element attribute value
         """
 
-        element = self.get_element(locator_properties, locator_type, max_time_out)
-        attribute_value = element.get_attribute(attribute_name)
-        if attribute_value is not None:
-            self.log.info(attribute_name.upper() + " value is: " + attribute_value)
-        else:
-            self.log.error(attribute_name.upper() + " value is empty.")
+        def _get_attribute(element):
+            self.count_commands()
+            return element.get_attribute(attribute_name)
+
+        with self.track_commands("get_attribute_value_from_element"):
+            element, attribute_value = self.perform_element_action(_get_attribute, locator_properties, locator_type,
+                                                                   max_time_out)
+            if element is None:
+                return None
+
+            if attribute_value is not None:
+                self.log.info("%s value is: %s", attribute_name.upper(), attribute_value)
+            else:
+                self.log.error("%s value is empty.", attribute_name.upper())
 
         return attribute_value
 
@@ -284,14 +687,19 @@ class UIHelpers:
         :return: it returns nothing
         """
 
-        if self.is_element_clickable(locator_properties, locator_type, max_time_out):
-            element = self.get_element(locator_properties, locator_type, max_time_out)
+        def _click(element):
+            self.count_commands()
             element.click()
-            self.log.info("Clicked on the element with locator_properties: "
-                          + locator_properties + " and locator_type: " + locator_type)
-        else:
-            self.log.error("Unable to click on the element with locator_properties: "
-                           + locator_properties + " and locator_type: " + locator_type)
+
+        with self.track_commands("mouse_click_action"):
+            element, _ = self.perform_element_action(_click, locator_properties, locator_type, max_time_out,
+                                                     "clickable")
+            if element is not None:
+                self.log.info("Clicked on the element with locator_properties: %s and locator_type: %s",
+                              locator_properties, locator_type)
+            else:
+                self.log.error("Unable to click on the element with locator_properties: %s and locator_type: %s",
+                               locator_properties, locator_type)
 
     def mouse_click_action_on_element_present(self, locator_properties, locator_type="id", max_time_out=10):
 
@@ -303,15 +711,19 @@ class UIHelpers:
         :return: it returns nothing
         """
 
-        if self.is_element_present(locator_properties, locator_type, max_time_out):
-            element = self.get_element(locator_properties, self.get_locator_type(locator_type), max_time_out)
+        def _click(element):
+            self.count_commands()
             element.click()
-            self.log.info(
-                "Clicked on the element with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
-        else:
-            self.log.error("Unable to click on the element with locator_properties: "
-                           + locator_properties + " and locator_type: " + locator_type)
+
+        with self.track_commands("mouse_click_action_on_element_present"):
+            element, _ = self.perform_element_action(_click, locator_properties, locator_type, max_time_out,
+                                                     "present")
+            if element is not None:
+                self.log.info("Clicked on the element with locator_properties: %s and locator_type: %s",
+                              locator_properties, locator_type)
+            else:
+                self.log.error("Unable to click on the element with locator_properties: %s and locator_type: %s",
+                               locator_properties, locator_type)
 
     def move_to_element_and_click(self, locator_properties, locator_type="id", max_time_out=10):
 
@@ -323,16 +735,20 @@ class UIHelpers:
         :return: it returns nothing
         """
 
-        if self.is_element_clickable(locator_properties, locator_type, max_time_out):
-            element = self.get_element(locator_properties, locator_type, max_time_out)
+        def _move_and_click(element):
+            self.count_commands()
             actions = ActionChains(self.driver)
             actions.move_to_element(element).click().perform()
-            self.log.info(
-                "Clicked on the element with locator_properties: " + locator_properties + " and locator_type: "
-                + locator_type)
-        else:
-            self.log.error("Unable to click on the element with locator_properties: "
-                           + locator_properties + " and locator_type: " + locator_type)
+
+        with self.track_commands("move_to_element_and_click"):
+            element, _ = self.perform_element_action(_move_and_click, locator_properties, locator_type,
+                                                     max_time_out, "clickable")
+            if element is not None:
+                self.log.info("Clicked on the element with locator_properties: %s and locator_type: %s",
+                              locator_properties, locator_type)
+            else:
+                self.log.error("Unable to click on the element with locator_properties: %s and locator_type: %s",
+                               locator_properties, locator_type)
 
     def enter_text_action(self, text_value, locator_properties, locator_type="id", max_time_out=10):
 
@@ -342,16 +758,23 @@ class UIHelpers:
         :param locator_properties: it takes locator string as parameter
         :param locator_type: it takes locator type as parameter
         :param max_time_out: this is the maximum time to wait for particular element
-        :return: it returns nothing
-        :return:
+        :return: it returns the element
         """
 
-        element = self.get_element(locator_properties, locator_type, max_time_out)
-        element.clear()
-        element.send_keys(text_value)
-        self.log.info(
-            "Sent '" + text_value + "' as test data to the element with locator_properties: " + locator_properties + " and locator_type: "
-            + locator_type)
+        def _enter_text(field):
+            self.count_commands(2)
+            field.clear()
+            field.send_keys(text_value)
+
+        with self.track_commands("enter_text_action"):
+            element, _ = self.perform_element_action(_enter_text, locator_properties, locator_type, max_time_out)
+            if element is None:
+                self.log.error("Unable to enter text in the element with locator_properties: %s and locator_type: %s",
+                               locator_properties, locator_type)
+                return None
+
+            self.log.info("Sent '%s' as test data to the element with locator_properties: %s and locator_type: %s",
+                          text_value, locator_properties, locator_type)
         return element
 
     def verify_text_contains(self, actual_text, expected_text):
@@ -368,8 +791,8 @@ class UIHelpers:
             return True
         else:
             self.log.info("### VERIFICATION TEXT DOES NOT CONTAINS !!!")
-            self.log.info("Actual Text From Application Web UI --> :: " + actual_text)
-            self.log.info("Expected Text From Application Web UI --> :: " + expected_text)
+            self.log.info("Actual Text From Application Web UI --> :: %s", actual_text)
+            self.log.info("Expected Text From Application Web UI --> :: %s", expected_text)
             return False
 
     def verify_text_match(self, actual_text, expected_text):
@@ -386,32 +809,24 @@ class UIHelpers:
             return True
         else:
             self.log.error("### VERIFICATION TEXT DOES NOT MATCHED !!!")
-            self.log.info("Actual Text From Application Web UI --> :: " + actual_text)
-            self.log.info("Expected Text From Application Web UI --> :: " + expected_text)
+            self.log.info("Actual Text From Application Web UI --> :: %s", actual_text)
+            self.log.info("Expected Text From Application Web UI --> :: %s", expected_text)
             return False
 
     def take_screenshots(self, file_name_initials):
 
         """
-        This method takes screen shot for reporting
+        This method takes screen shot for reporting, the screenshot is taken right away & written by the
+        background pipeline
         :param file_name_initials: it takes the initials for file name
-        :return: it returns the destination directory of screenshot
+        :return: it returns the screenshot job, its wait() returns the destination path, None when not taken
         """
 
-        file_name = file_name_initials + "_" + str(round(time.time() * 1000)) + ".png"
-        cur_path = os.path.abspath(os.path.dirname(__file__))
-        screenshot_directory = os.path.join(cur_path, r"../Logs/Screenshots/")
-        destination_directory = os.path.join(screenshot_directory, file_name)
-
         try:
-            if not os.path.exists(screenshot_directory):
-                os.makedirs(screenshot_directory)
-            self.driver.save_screenshot(destination_directory)
-            self.log.info("Screenshot saved to directory: " + destination_directory)
+            return ScreenshotPipeline.get_instance().submit(self.driver.get_screenshot_as_png(), file_name_initials)
         except Exception as ex:
-            self.log.error("### Exception occurred:: ", ex)
-
-        return destination_directory
+            self.log.error("### Exception occurred:: %s", ex)
+            return None
 
     def vertical_scroll(self, scroll_view, class_name, text):
         """
@@ -429,7 +844,7 @@ class UIHelpers:
             self.log.info("Vertically scrolling into the view.")
 
         except Exception as ex:
-            self.log.error("Exception occurred while vertically scrolling into the view: ", ex)
+            self.log.error("Exception occurred while vertically scrolling into the view: %s", ex)
 
     def horizontal_scroll(self, scroll_view, class_name, text):
         """
@@ -447,4 +862,4 @@ class UIHelpers:
             self.log.info("Horizontally scrolling into the view.")
 
         except Exception as ex:
-            self.log.error("Exception occurred while horizontally scrolling into the view: ", ex)
+            self.log.error("Exception occurred while horizontally scrolling into the view: %s", ex)
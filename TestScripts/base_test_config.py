@@ -7,18 +7,49 @@ from FrameworkUtilities.data_reader_utility import DataReader
 from FrameworkUtilities.execution_status_utility import ExecutionStatus
 from PageObjects.po_login import LoginPageObjects
 from PageObjects.po_registration import RegistrationPageObjects
+from ResourceFiles.constants import ResetLevel
+from SupportLibraries.app_reset import AppResetter
+from SupportLibraries.duration_scheduler import get_app_state
 
 
 @pytest.mark.usefixtures("driver")
 class BaseTestConfig:
     log = log_utils.custom_logger(logging.INFO)
+    data_reader = DataReader()
+    _phone_number = None
+
+    @property
+    def phone_number(self):
+        """
+        This property hands out a unique phone number for the test, on first use only
+        :return: it returns the phone number string
+        """
+        if self._phone_number is None:
+            self._phone_number = self.reg_page.generate_random_phone_number()
+        return self._phone_number
+
+    @staticmethod
+    def get_reset_level(request):
+        """
+        This method returns the reset level of the test, the highest of the cli default & reset_level marker,
+        when the next test starts from the same app_state the restore level of the state is used instead of the default
+        :param request: it takes the pytest request of the test
+        :return: it returns the reset level
+        """
+        marker = request.node.get_closest_marker("reset_level")
+        marker_level = marker.args[0] if marker else None
+        app_state, restore_level = get_app_state(request.node)
+        if app_state is not None and restore_level is not None \
+                and app_state == getattr(request.node, "next_app_state", None):
+            return ResetLevel.highest(restore_level, marker_level)
+        return ResetLevel.highest(request.config.getoption("--reset-level"), marker_level)
 
     @pytest.fixture(autouse=True)
-    def setup_teardown(self):
+    def setup_teardown(self, request):
         self.exe_status = ExecutionStatus(self.driver)
-        self.data_reader = DataReader()
         self.reg_page = RegistrationPageObjects.instance(self.driver)
         self.login_page = LoginPageObjects.instance(self.driver)
-        self.phone_number = self.reg_page.generate_random_phone_number()
+        self._phone_number = None
         yield "resource"
-        self.driver.reset()
+        self.exe_status.attach_screenshots()
+        AppResetter(self.driver).reset(self.get_reset_level(request))
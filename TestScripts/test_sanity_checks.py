@@ -15,6 +15,7 @@ class TestSanityChecks(BaseTestConfig):
 
     @pytest.mark.sanity
     @pytest.mark.registration
+    @pytest.mark.app_state("logged_out")
     @allure.testcase("Verify Registration Scenarios")
     def test_sanity_101(self, setup_teardown):
         """
@@ -24,7 +25,7 @@ class TestSanityChecks(BaseTestConfig):
         """
         test_name = sys._getframe().f_code.co_name
 
-        self.log.info("###### TEST EXECUTION STARTED :: " + test_name + " ######")
+        self.log.info("###### TEST EXECUTION STARTED :: %s ######", test_name)
 
         with allure.step("verify navigation to registration page"):
             self.exe_status.mark_final(test_step="verify navigation to registration page",
@@ -38,6 +39,7 @@ class TestSanityChecks(BaseTestConfig):
 
     @pytest.mark.sanity
     @pytest.mark.login
+    @pytest.mark.app_state("logged_out")
     @allure.testcase("Verify Login Scenarios")
     def test_sanity_102(self, setup_teardown):
         """
@@ -47,7 +49,7 @@ class TestSanityChecks(BaseTestConfig):
         """
         test_name = sys._getframe().f_code.co_name
 
-        self.log.info("###### TEST EXECUTION STARTED :: " + test_name + " ######")
+        self.log.info("###### TEST EXECUTION STARTED :: %s ######", test_name)
 
         registered_num = self.data_reader.get_data(test_name, "phone_number")
 
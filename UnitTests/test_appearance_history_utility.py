@@ -0,0 +1,81 @@
+""" This module contains the unit tests of the element appearance times & the adaptive timeouts. """
+
+import os
+
+import pytest
+
+from FrameworkUtilities.appearance_history_utility import AppearanceTimes
+
+
+class FakeDriver:
+    """ This class stands in for the driver, only its capabilities are read. """
+
+    _platform = "android"
+    capabilities = {"deviceName": "Pixel_5", "platformVersion": "13"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AppearanceTimes(str(tmp_path / "appearance_times.json"), enabled=True)
+
+
+def record_all(store, seconds, state="present", appeared=True):
+    for value in seconds:
+        store.record(FakeDriver(), "next_button", "id", state, value, appeared)
+
+
+class TestAppearanceTimes:
+    """ This class contains the tests of the p99, the censored samples & the timeout bounds. """
+
+    def test_default_timeout_below_min_samples(self, store):
+        record_all(store, [1.0] * (AppearanceTimes.min_samples - 1))
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 4) == 4
+
+        record_all(store, [1.0])
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 4) == 2.5
+
+    def test_p99_of_the_samples(self, store, monkeypatch):
+        monkeypatch.setattr(AppearanceTimes, "max_samples", 100)
+        record_all(store, [float(seconds) for seconds in range(1, 101)])
+        device = AppearanceTimes.device_key(FakeDriver())
+
+        assert store.p99(device, AppearanceTimes.locator_key("next_button", "id", "present")) == 99.0
+
+    def test_timed_out_p99_keeps_the_default(self, store):
+        record_all(store, [1.0] * 10)
+        record_all(store, [4.0], appeared=False)
+
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 10) == 10
+
+    def test_timeout_is_not_below_a_fraction_of_the_default(self, store):
+        record_all(store, [0.5] * 20)
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 30) == 30 * AppearanceTimes.min_timeout_fraction
+
+    def test_samples_are_kept_per_state(self, store):
+        record_all(store, [1.0] * 10, state="present")
+
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 4, "present") == 2.5
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 4, "clickable") == 4
+
+    def test_alternative_locator_without_samples_keeps_the_default(self, store):
+        record_all(store, [1.0] * 10)
+        assert store.timeout_for(FakeDriver(), [("next_button", "id"), ("error", "id")], 10) == 10
+
+    def test_nothing_is_recorded_or_saved_when_disabled(self, tmp_path):
+        store = AppearanceTimes(str(tmp_path / "appearance_times.json"))
+        record_all(store, [1.0] * 10)
+        store.save()
+
+        assert store.timeout_for(FakeDriver(), [("next_button", "id")], 10) == 10
+        assert not os.path.exists(store.store_file)
+
+    def test_save_merges_and_keeps_the_last_samples(self, store, monkeypatch):
+        monkeypatch.setattr(AppearanceTimes, "max_samples", 3)
+        record_all(store, [1.0, 2.0])
+        store.save()
+        record_all(store, [3.0, 4.0], appeared=False)
+        store.save()
+
+        device = AppearanceTimes.device_key(FakeDriver())
+        assert AppearanceTimes.load(store.store_file)[device]["id=next_button|present"] == [
+            [2.0, True], [3.0, False], [4.0, False]]
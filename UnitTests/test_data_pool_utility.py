@@ -0,0 +1,49 @@
+""" This module contains the unit tests of the seeded test data pool. """
+
+import math
+
+import pytest
+
+from FrameworkUtilities import data_pool_utility
+from FrameworkUtilities.data_pool_utility import DataPool
+
+
+@pytest.fixture
+def small_range(monkeypatch):
+    monkeypatch.setattr(data_pool_utility, "PHONE_RANGE", (1000, 1299))
+
+
+def phone_numbers(data_pool):
+    return [data_pool.next_phone_number() for _ in range(data_pool.block_size)]
+
+
+class TestDataPool:
+    """ This class contains the tests of the phone number blocks, the stride & the seed. """
+
+    def test_worker_blocks_are_disjoint(self, small_range):
+        issued = [phone_numbers(DataPool(seed=7, worker_index=index, worker_count=3)) for index in range(3)]
+
+        every_number = [number for numbers in issued for number in numbers]
+        assert len(set(every_number)) == len(every_number) == 300
+        assert all(number.startswith(data_pool_utility.PHONE_PREFIX) for number in every_number)
+
+    def test_exhausted_block_raises(self, small_range):
+        data_pool = DataPool(seed=7, worker_index=1, worker_count=3)
+        phone_numbers(data_pool)
+
+        with pytest.raises(RuntimeError):
+            data_pool.next_phone_number()
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_stride_is_co_prime_to_the_block_size(self, seed):
+        data_pool = DataPool(seed=seed, worker_index=seed % 4, worker_count=4)
+        assert math.gcd(data_pool._phone_stride, data_pool.block_size) == 1
+        assert data_pool._phone_stride > 1
+
+    def test_seed_from_the_environment_is_reproducible(self, monkeypatch):
+        monkeypatch.setenv("RAFT_DATA_SEED", "1234")
+        first, second = DataPool(worker_index=2, worker_count=4), DataPool(worker_index=2, worker_count=4)
+
+        assert first.seed == second.seed == 1234
+        assert [first.next_phone_number() for _ in range(5)] == [second.next_phone_number() for _ in range(5)]
+        assert DataPool(seed=1235, worker_index=2, worker_count=4).next_phone_number() != second.next_phone_number()
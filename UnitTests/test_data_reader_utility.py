@@ -0,0 +1,97 @@
+""" This module contains the unit tests of the test data reader. """
+
+import json
+import os
+
+import pytest
+
+from FrameworkUtilities.data_reader_utility import DataReader
+
+RECORDS = {
+    "test_sanity_101": {"tc_name": "registration", "run_mode": "Y", "test_data": {}},
+    "test_sanity_102": {"tc_name": "login", "run_mode": "N", "test_data": {"phone_number": "9877053648"}}
+}
+
+
+@pytest.fixture
+def reader(tmp_path):
+    data_file = tmp_path / "stage_data.json"
+    data_file.write_text(json.dumps(RECORDS))
+    data_reader = DataReader()
+    data_reader.stage_test_data = str(data_file)
+    yield data_reader
+    DataReader._pending_writes.pop(os.path.abspath(str(data_file)), None)
+    DataReader._cache.pop(os.path.abspath(str(data_file)), None)
+
+
+def read_file(data_reader):
+    with open(data_reader.stage_test_data, "r") as read_file:
+        return json.load(read_file)
+
+
+def touch(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestDataReader:
+    """ This class contains the tests of the cached reads & the batched writes. """
+
+    def test_get_data_and_run_mode(self, reader):
+        assert reader.get_data("test_sanity_102", "phone_number") == "9877053648"
+        assert reader.get_run_mode("test_sanity_102") == "N"
+        assert reader.get_run_mode("test_unknown") is None
+
+    def test_records_are_parsed_again_only_when_mtime_changes(self, reader):
+        touch(reader.stage_test_data, 1_000_000_000)
+        first = reader.get_records(reader.stage_test_data)
+        assert reader.get_records(reader.stage_test_data) is first
+
+        with open(reader.stage_test_data, "w") as write_file:
+            json.dump({"test_sanity_103": {"test_data": {}}}, write_file)
+        touch(reader.stage_test_data, 2_000_000_000)
+        assert list(reader.get_records(reader.stage_test_data)) == ["test_sanity_103"]
+
+    def test_set_data_is_visible_before_the_flush(self, reader):
+        reader.set_data("test_sanity_101", "phone_number", "9000000001")
+
+        assert reader.get_data("test_sanity_101", "phone_number") == "9000000001"
+        assert read_file(reader)["test_sanity_101"]["test_data"] == {}
+
+    def test_set_data_of_unknown_test_is_ignored(self, reader):
+        reader.set_data("test_unknown", "phone_number", "9000000001")
+        assert not DataReader._pending_writes.get(os.path.abspath(reader.stage_test_data))
+
+    def test_writes_are_flushed_in_batches(self, reader, monkeypatch):
+        monkeypatch.setattr(DataReader, "write_batch_size", 3)
+        reader.set_data("test_sanity_101", "first", 1)
+        reader.set_data("test_sanity_101", "second", 2)
+        assert read_file(reader)["test_sanity_101"]["test_data"] == {}
+
+        reader.set_data("test_sanity_101", "third", 3)
+        assert read_file(reader)["test_sanity_101"]["test_data"] == {"first": 1, "second": 2, "third": 3}
+        assert DataReader._pending_writes[os.path.abspath(reader.stage_test_data)] == []
+
+    def test_flush_keeps_the_changes_of_other_writers(self, reader):
+        reader.set_data("test_sanity_101", "phone_number", "9000000001")
+        records = read_file(reader)
+        records["test_sanity_102"]["test_data"]["otp"] = "1234"
+        with open(reader.stage_test_data, "w") as write_file:
+            json.dump(records, write_file)
+
+        DataReader.flush(reader.stage_test_data)
+
+        records = read_file(reader)
+        assert records["test_sanity_101"]["test_data"] == {"phone_number": "9000000001"}
+        assert records["test_sanity_102"]["test_data"]["otp"] == "1234"
+
+    def test_flush_does_not_overwrite_an_unreadable_file(self, reader):
+        reader.set_data("test_sanity_101", "phone_number", "9000000001")
+        with open(reader.stage_test_data, "w") as write_file:
+            write_file.write('{"test_sanity_101": ')
+
+        DataReader.flush(reader.stage_test_data)
+
+        with open(reader.stage_test_data, "r") as read_file_handle:
+            assert read_file_handle.read() == '{"test_sanity_101": '
+        assert DataReader._pending_writes[os.path.abspath(reader.stage_test_data)] == [
+            ("test_sanity_101", "phone_number", "9000000001")]
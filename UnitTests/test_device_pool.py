@@ -0,0 +1,151 @@
+""" This module contains the unit tests of the device pool & the lock file shared by the workers. """
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from FrameworkUtilities import file_lock_utility
+from FrameworkUtilities.file_lock_utility import FileLock, is_process_alive, process_start_time
+from SupportLibraries.device_pool import DevicePool
+
+DEVICES = {"devices": [{"name": "pixel_1", "server": "http://127.0.0.1:4723/wd/hub", "platform": "android"},
+                       {"name": "pixel_2", "server": "http://127.0.0.1:4724/wd/hub", "platform": "android"}]}
+
+
+def pool_of(tmp_path, quarantine_seconds=600):
+    config_file = tmp_path / "device_pool.json"
+    config_file.write_text(json.dumps(DEVICES))
+    return DevicePool(str(config_file), state_dir=str(tmp_path / "state"), quarantine_seconds=quarantine_seconds,
+                      lease_timeout=0, health_check=False)
+
+
+def edit_state(pool, change):
+    state = pool._load_state()
+    change(state)
+    pool._save_state(state)
+
+
+class TestDevicePool:
+    """ This class contains the tests of the leases, the dead workers & the quarantine. """
+
+    def test_every_lease_gets_its_own_device(self, tmp_path):
+        pool = pool_of(tmp_path)
+        first, second = pool.acquire("android"), pool.acquire("android")
+
+        assert {first.name, second.name} == {"pixel_1", "pixel_2"}
+        with pytest.raises(TimeoutError):
+            pool.acquire("android")
+        pool.release(first)
+        assert pool.acquire("android").name == first.name
+
+    def test_lease_of_a_dead_worker_is_reclaimed(self, tmp_path):
+        pool = pool_of(tmp_path)
+        pool.acquire("android")
+        pool.acquire("android")
+        edit_state(pool, lambda state: state["leases"]["pixel_1"].update(pid=2 ** 22 + 1))
+
+        assert pool.acquire("android").name == "pixel_1"
+
+    def test_lease_of_a_reused_pid_is_reclaimed(self, tmp_path):
+        if process_start_time(os.getpid()) is None:
+            pytest.skip("the process start time is not exposed on this platform")
+        pool = pool_of(tmp_path)
+        pool.acquire("android")
+        pool.acquire("android")
+        edit_state(pool, lambda state: state["leases"]["pixel_2"].update(started=-1))
+
+        assert pool.acquire("android").name == "pixel_2"
+
+    def test_quarantined_device_is_not_leased(self, tmp_path):
+        pool = pool_of(tmp_path)
+        pool.quarantine(pool.acquire("android"), "health check failed")
+
+        assert pool.available("android") == 1
+        assert pool.acquire("android").name == "pixel_2"
+
+    def test_quarantine_of_an_earlier_run_ends_with_the_current_period(self, tmp_path):
+        earlier_run = pool_of(tmp_path, quarantine_seconds=3600)
+        earlier_run.quarantine(earlier_run.acquire("android"), "crashed")
+        pool = pool_of(tmp_path, quarantine_seconds=60)
+        edit_state(pool, lambda state: state["quarantine"]["pixel_1"].update(since=time.time() - 61))
+
+        assert pool.available("android") == 2
+
+    def test_reset_quarantine(self, tmp_path):
+        pool = pool_of(tmp_path)
+        pool.quarantine(pool.acquire("android"), "crashed")
+
+        assert pool.reset_quarantine() == ["pixel_1"]
+        assert pool.available("android") == 2
+
+
+class TestFileLock:
+    """ This class contains the tests of the lock file & the breaking of the stale locks. """
+
+    def test_lock_is_exclusive(self, tmp_path):
+        lock_file = str(tmp_path / "state.lock")
+        with FileLock(lock_file):
+            with pytest.raises(TimeoutError):
+                FileLock(lock_file, timeout=0.1).acquire()
+        assert not os.path.exists(lock_file)
+
+    def test_threads_hold_the_lock_one_at_a_time(self, tmp_path):
+        lock_file = str(tmp_path / "state.lock")
+        holders, overlaps = [], []
+
+        def hold():
+            for _ in range(20):
+                with FileLock(lock_file, poll_interval=0.001):
+                    holders.append(1)
+                    overlaps.append(len(holders))
+                    holders.pop()
+
+        threads = [threading.Thread(target=hold) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        assert len(overlaps) == 80 and max(overlaps) == 1
+
+    def test_stale_lock_is_broken(self, tmp_path):
+        lock_file = str(tmp_path / "state.lock")
+        with open(lock_file, "w") as write_file:
+            write_file.write("12345")
+        os.utime(lock_file, (time.time() - 300, time.time() - 300))
+
+        with FileLock(lock_file, timeout=1, stale_after=120):
+            assert os.path.exists(lock_file)
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_fresh_lock_taken_while_breaking_is_kept(self, tmp_path, monkeypatch):
+        lock_file = str(tmp_path / "state.lock")
+        with open(lock_file, "w") as write_file:
+            write_file.write("12345")
+        os.utime(lock_file, (time.time() - 300, time.time() - 300))
+        rename = os.rename
+        fresh_lock = FileLock(lock_file)
+
+        def rename_after_another_waiter(source, target):
+            # another waiter breaks the stale lock & takes a fresh one between the check & the rename
+            os.remove(source)
+            fresh_lock.acquire()
+            monkeypatch.setattr(file_lock_utility.os, "rename", rename)
+            rename(source, target)
+
+        monkeypatch.setattr(file_lock_utility.os, "rename", rename_after_another_waiter)
+        FileLock(lock_file, stale_after=120)._break_if_stale()
+
+        assert os.path.exists(lock_file)
+        assert time.time() - os.path.getmtime(lock_file) < 120
+        assert os.listdir(str(tmp_path)) == ["state.lock"]
+        fresh_lock.release()
+        assert not os.path.exists(lock_file)
+
+    def test_process_start_time_tells_a_reused_pid_apart(self):
+        start_time = process_start_time(os.getpid())
+        assert is_process_alive(os.getpid(), start_time)
+        if start_time is not None:
+            assert not is_process_alive(os.getpid(), start_time + 1)
@@ -0,0 +1,132 @@
+""" This module contains the unit tests of the driver command instrumentation. """
+
+import json
+
+import pytest
+from selenium.webdriver.remote.webelement import WebElement
+
+from SupportLibraries.driver_instrumentation import CommandTimings
+
+
+class FakeDriver:
+    """ This class stands in for the driver, it answers every command with the configured response. """
+
+    def __init__(self, response=None, error=None):
+        self.response = response or {"value": None}
+        self.error = error
+
+    def execute(self, driver_command, params=None):
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def find_element_response(*element_ids):
+    # as returned by driver.execute, the element references are unwrapped into WebElement objects
+    elements = [WebElement(None, element_id) for element_id in element_ids]
+    return {"value": elements[0] if len(elements) == 1 else elements}
+
+
+class TestCommandTimings:
+    """ This class contains the tests of the per test command recording. """
+
+    def test_records_commands_of_the_current_test(self):
+        timings = CommandTimings()
+        driver = timings.instrument(FakeDriver())
+        timings.start_test("test_a")
+        driver.execute("getPageSource")
+        timings.end_test()
+        driver.execute("quit")
+
+        assert [command["command"] for command in timings.tests["test_a"]["commands"]] == ["getPageSource"]
+        assert [command["command"] for command in timings.tests["<session>"]["commands"]] == ["quit"]
+        assert "started_at" not in timings.tests["test_a"]
+
+    def test_element_commands_are_attributed_to_the_locator(self):
+        timings = CommandTimings()
+        driver = timings.instrument(FakeDriver(find_element_response("42")))
+        driver.execute("findElement", {"using": "id", "value": "next_button"})
+        driver.execute("clickElement", {"id": "42"})
+
+        commands = timings.tests["<session>"]["commands"]
+        assert [command["locator"] for command in commands] == ["id=next_button", "id=next_button"]
+
+    def test_elements_of_find_elements_are_attributed_to_the_locator(self):
+        timings = CommandTimings()
+        driver = timings.instrument(FakeDriver(find_element_response("42", "43")))
+        driver.execute("findElements", {"using": "id", "value": "first_name"})
+        driver.execute("clearElement", {"id": "43"})
+        driver.execute("sendKeysToElement", {"id": "43", "text": "Bench"})
+
+        commands = timings.tests["<session>"]["commands"]
+        assert [command["locator"] for command in commands] == ["id=first_name"] * 3
+
+    def test_failed_command_is_recorded_with_exception_name(self):
+        timings = CommandTimings()
+        driver = timings.instrument(FakeDriver(error=TimeoutError("slow")))
+        with pytest.raises(TimeoutError):
+            driver.execute("findElement", {"using": "id", "value": "otp"})
+
+        assert timings.tests["<session>"]["commands"][0]["outcome"] == "TimeoutError"
+
+    def test_helper_and_caller_are_attributed(self):
+        timings = CommandTimings()
+        timings.enabled = True
+        driver = timings.instrument(FakeDriver())
+
+        # the helper has to live in its own file, push_helper skips the frames of the helpers file
+        helpers = {}
+        exec(compile("def wait_for_element(timings, driver):\n"
+                     "    timings.push_helper('wait_for_element')\n"
+                     "    driver.execute('findElement', {'using': 'id', 'value': 'otp'})\n"
+                     "    timings.pop_helper()\n", "ui_helpers.py", "exec"), helpers)
+
+        def navigate_to_login_screen():
+            helpers["wait_for_element"](timings, driver)
+
+        navigate_to_login_screen()
+        command = timings.tests["<session>"]["commands"][0]
+        assert command["helper"] == "wait_for_element"
+        assert command["caller"] == "test_driver_instrumentation.navigate_to_login_screen"
+
+    def test_record_wait_is_ignored_when_disabled(self):
+        timings = CommandTimings()
+        timings.record_wait("wait_for_element", 1.0)
+        assert timings.tests == {}
+
+        timings.enabled = True
+        timings.record_wait("wait_for_element", 1.0)
+        timings.record_wait("wait_for_element", 0.5)
+        assert timings.tests["<session>"]["waits"] == {"wait_for_element": 1.5}
+
+    def test_merge_adds_the_worker_tests(self):
+        worker = CommandTimings()
+        worker.enabled = True
+        worker.instrument(FakeDriver()).execute("getPageSource")
+        worker.record_wait("wait_until", 2.0)
+        controller = CommandTimings()
+        controller.instrument(FakeDriver()).execute("quit")
+
+        controller.merge(json.loads(json.dumps(worker.export())))
+
+        entry = controller.tests["<session>"]
+        assert [command["command"] for command in entry["commands"]] == ["quit", "getPageSource"]
+        assert entry["wait_time"] == 2.0
+
+    def test_summarize_orders_slowest_commands(self):
+        timings = CommandTimings()
+        for duration in (0.1, 0.5, 0.3):
+            timings.record("getPageSource", {}, duration, "ok")
+
+        summary = timings.summarize(slowest=2)["<session>"]
+        assert summary["commands"] == 3
+        assert summary["command_time"] == 0.9
+        assert [command["duration"] for command in summary["slowest_commands"]] == [0.5, 0.3]
+
+    def test_write_report(self, tmp_path):
+        timings = CommandTimings()
+        timings.record("getPageSource", {}, 0.2, "ok")
+        report_file = timings.write_report(str(tmp_path / "Logs" / "command_timings.json"))
+
+        with open(report_file, "r") as read_file:
+            assert json.load(read_file)["<session>"]["commands"] == 1
@@ -0,0 +1,143 @@
+""" This module contains the unit tests of the record & replay of the driver command stream. """
+
+import json
+import os
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from SupportLibraries.driver_recording import SESSION_SEGMENT, ReplayDivergenceError, driver_recording
+from SupportLibraries.ui_helpers import UIHelpers
+
+SIGNUP_BUTTON = "com.fampay.in.debug:id/sign_up_button"
+
+
+@pytest.fixture
+def recorder():
+    yield driver_recording
+    driver_recording.mode = None
+    driver_recording.directory = None
+    driver_recording.current_test = None
+    driver_recording._segments = {}
+    driver_recording._cursors = {}
+
+
+def find(value):
+    return "findElement", {"using": "id", "value": value}
+
+
+class TestSessionRecorder:
+    """ This class contains the tests of the recorded segments & the replay matching. """
+
+    def test_recorded_test_is_replayed(self, recorder, tmp_path):
+        recorder.configure("record", str(tmp_path))
+        recorder.start_test("test_a")
+        recorder.record(*find("next_button"), {"value": "first"})
+        recorder.record("clickElement", {"id": "1"}, {"value": None})
+        recorder.end_test()
+
+        recorder.configure("replay", str(tmp_path))
+        recorder.start_test("test_a")
+        assert recorder.replay(*find("next_button")) == {"value": "first"}
+        assert recorder.replay("clickElement", {"id": "1", "sessionId": "replayed"}) == {"value": None}
+        recorder.end_test()
+
+    def test_polls_are_tolerated_other_changes_diverge(self, recorder, tmp_path):
+        recorder.configure("record", str(tmp_path))
+        recorder.start_test("test_a")
+        for response in ("missing", "missing", "found"):
+            recorder.record(*find("otp"), {"value": response})
+        recorder.record(*find("next_button"), {"value": "next"})
+        recorder.end_test()
+
+        recorder.configure("replay", str(tmp_path))
+        recorder.start_test("test_a")
+        assert recorder.replay(*find("otp")) == {"value": "missing"}
+        assert recorder.replay(*find("next_button")) == {"value": "next"}
+        assert recorder.replay(*find("next_button")) == {"value": "next"}
+        with pytest.raises(ReplayDivergenceError):
+            recorder.replay(*find("continue_button"))
+
+    def test_unserializable_segment_leaves_no_file(self, recorder, tmp_path):
+        recorder.configure("record", str(tmp_path))
+        recorder.start_test("test_a")
+        recorder.record(*find("next_button"), {"value": object()})
+
+        with pytest.raises(TypeError):
+            recorder.end_test()
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_session_scope_is_per_thread(self, recorder, tmp_path):
+        recorder.configure("record", str(tmp_path))
+        recorder.start_test("test_a")
+        in_scope, recorded = threading.Event(), threading.Event()
+
+        def create_session():
+            with recorder.session_scope():
+                in_scope.set()
+                recorded.wait(5)
+                recorder.record("newSession", {}, {"value": {"sessionId": "spare"}})
+
+        session_thread = threading.Thread(target=create_session)
+        session_thread.start()
+        in_scope.wait(5)
+        recorder.record(*find("next_button"), {"value": "next"})
+        recorded.set()
+        session_thread.join(5)
+
+        assert [entry[0] for entry in recorder._segments["test_a"]] == ["findElement"]
+        assert [entry[0] for entry in recorder._segments[SESSION_SEGMENT]] == ["newSession"]
+
+    def test_replayed_wait_does_not_sleep(self, recorder, tmp_path):
+        recorder.configure("replay", str(tmp_path))
+        start_time = time.time()
+
+        with pytest.raises(TimeoutException):
+            UIHelpers(None).wait_until(lambda driver: False, max_time_out=5)
+        assert time.time() - start_time < 1
+
+
+@pytest.fixture
+def fake_server():
+    fake_appium_server = pytest.importorskip("Benchmarks.fake_appium_server")
+    scenario_file = os.path.join(os.path.dirname(fake_appium_server.__file__), "scenario.json")
+    with open(scenario_file, "r") as read_file:
+        scenario = json.load(read_file)
+    server = fake_appium_server.FakeAppiumServer(("127.0.0.1", 0), scenario, appear_scale=0.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, "http://127.0.0.1:" + str(server.server_address[1]) + "/wd/hub"
+    server.shutdown()
+    server.server_close()
+
+
+def run_signup(recorder, url):
+    """ This function opens a session, clicks the signup button in test_signup & quits, as in a test run. """
+    webdriver = pytest.importorskip("appium.webdriver.webdriver")
+    with recorder.session_scope():
+        driver = webdriver.WebDriver(command_executor=recorder.connection(url),
+                                     desired_capabilities={"platformName": "Android"})
+    recorder.start_test("test_signup")
+    UIHelpers(driver).mouse_click_action(SIGNUP_BUTTON, "id")
+    recorder.end_test()
+    with recorder.session_scope():
+        driver.quit()
+    recorder.finish()
+
+
+class TestRoundTrip:
+    """ This class contains the tests of a recording against the fake appium server & its replay. """
+
+    def test_replay_sends_nothing_to_the_server(self, recorder, fake_server, tmp_path):
+        server, url = fake_server
+        recorder.configure("record", str(tmp_path))
+        run_signup(recorder, url)
+        assert sorted(os.listdir(str(tmp_path))) == [SESSION_SEGMENT + ".json.gz", "test_signup.json.gz"]
+
+        server.stats(reset=True)
+        recorder.configure("replay", str(tmp_path))
+        assert recorder._load_segment("test_signup")["ordered"][0][0] == "findElement"
+        run_signup(recorder, url)
+        assert server.stats()["commands"] == 0
+        assert recorder._segments == {}
@@ -0,0 +1,177 @@
+""" This module contains the unit tests of the timing history & the duration aware scheduling. """
+
+import zlib
+
+import pytest
+
+from FrameworkUtilities.timing_history_utility import TimingHistory
+from SupportLibraries.duration_scheduler import DurationScheduler, SlotScheduling, select_shard
+
+
+class FakeItem:
+    """ This class stands in for a collected pytest item with an optional app_state marker. """
+
+    def __init__(self, nodeid, app_state=None):
+        self.nodeid = nodeid
+        self.markers = [pytest.mark.app_state(app_state).mark] if app_state else []
+
+    def get_closest_marker(self, name):
+        return next((marker for marker in self.markers if marker.name == name), None)
+
+    def add_marker(self, marker):
+        self.markers.append(marker.mark)
+
+
+class FakeConfig:
+    """ This class stands in for the xdist controller config of -n 2. """
+
+    class option:
+        loadscopereorder = False
+
+    @staticmethod
+    def getvalue(name):
+        return ["2*popen"] if name == "tx" else None
+
+
+class FakeNode:
+    """ This class stands in for an xdist worker, it keeps the indexes of the tests sent to it. """
+
+    class gateway:
+        id = "gw"
+
+    def __init__(self):
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indexes):
+        self.sent.extend(indexes)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def history_of(tmp_path, durations):
+    history = TimingHistory(str(tmp_path / "timing_history.json"))
+    history.tests = {node_id: {"durations": samples} for node_id, samples in durations.items()}
+    return history
+
+
+class TestTimingHistory:
+    """ This class contains the tests of the duration prediction & the history merge. """
+
+    def test_predict_is_the_median_of_the_samples(self, tmp_path):
+        history = history_of(tmp_path, {"a": [10.0, 30.0, 20.0]})
+        assert history.predict("a") == 20.0
+
+    def test_unknown_test_gets_the_median_of_the_known_tests(self, tmp_path):
+        history = history_of(tmp_path, {"a": [10.0], "b": [20.0], "c": [60.0]})
+        assert history.predict("new") == 20.0
+
+    def test_without_history_the_default_duration_is_predicted(self, tmp_path):
+        history = history_of(tmp_path, {})
+        assert not history.has_history()
+        assert history.predict("new") == TimingHistory.default_duration
+
+    def test_xdist_group_suffix_is_not_part_of_the_test_id(self, tmp_path):
+        history = history_of(tmp_path, {"a.py::test_b": [5.0]})
+        assert history.predict("a.py::test_b@schedule_slot_1") == 5.0
+        assert TimingHistory.test_id("a.py::test_b[x@y]") == "a.py::test_b[x@y]"
+
+        history.record("a.py::test_c@schedule_slot_0", 7.0)
+        assert list(history.pending) == ["a.py::test_c"]
+
+    def test_merge_entries_keeps_the_last_samples(self):
+        tests = {"a": {"durations": [1.0, 2.0, 3.0, 4.0, 5.0]}}
+        TimingHistory.merge_entries(tests, {"a": {"duration": 6.0, "app_state": "logged_out"},
+                                            "b": {"duration": 2.0}})
+
+        assert tests["a"] == {"durations": [2.0, 3.0, 4.0, 5.0, 6.0], "app_state": "logged_out"}
+        assert tests["b"] == {"durations": [2.0], "app_state": None}
+
+    def test_save_merges_into_the_history_file(self, tmp_path):
+        history_file = str(tmp_path / "timing_history.json")
+        TimingHistory.write(history_file, {"a": {"durations": [1.0]}})
+        history = TimingHistory(history_file)
+        history.record("b", 2.0)
+        history.save()
+
+        assert TimingHistory.load(history_file) == {"a": {"durations": [1.0]},
+                                                    "b": {"durations": [2.0], "app_state": None}}
+        assert history.pending == {}
+
+
+class TestDurationScheduler:
+    """ This class contains the tests of the LPT assignment & the app state grouping. """
+
+    def test_assign_balances_longest_first(self, tmp_path):
+        history = history_of(tmp_path, {"a": [8.0], "b": [7.0], "c": [6.0], "d": [5.0], "e": [4.0]})
+        scheduler = DurationScheduler(history, worker_count=2)
+        slots = scheduler.assign(["a", "b", "c", "d", "e"])
+
+        assert slots == [["a", "d", "e"], ["b", "c"]]
+        assert scheduler.predicted_makespan == 17.0
+
+    def test_assign_is_deterministic_for_equal_durations(self, tmp_path):
+        history = history_of(tmp_path, {})
+        first = DurationScheduler(history, worker_count=2).assign(["d", "b", "c", "a"])
+        second = DurationScheduler(history, worker_count=2).assign(["a", "c", "b", "d"])
+        assert first == second == [["a", "c"], ["b", "d"]]
+
+    def test_order_slot_groups_by_app_state(self, tmp_path):
+        history = history_of(tmp_path, {"a": [1.0], "b": [9.0], "c": [2.0], "d": [3.0]})
+        items = [FakeItem("a", "logged_in"), FakeItem("b"), FakeItem("c", "logged_in"), FakeItem("d", "logged_in")]
+
+        ordered = DurationScheduler(history).order_slot(items)
+
+        assert [item.nodeid for item in ordered] == ["b", "d", "c", "a"]
+
+    def test_schedule_keeps_the_slots_in_order(self, tmp_path):
+        history = history_of(tmp_path, {"a": [3.0], "b": [2.0], "c": [1.0]})
+        items = [FakeItem("c"), FakeItem("b"), FakeItem("a")]
+
+        DurationScheduler(history, worker_count=2).schedule(items, pin_to_workers=True)
+
+        assert [item.nodeid for item in items] == ["a", "b", "c"]
+        assert all(item.get_closest_marker("xdist_group") is None for item in items)
+
+    def test_slot_scheduling_runs_each_slot_on_one_worker(self, tmp_path):
+        history = history_of(tmp_path, {"a": [3.0], "b": [2.0], "c": [1.0]})
+        scheduling = SlotScheduling(FakeConfig(), None, DurationScheduler(history, worker_count=2))
+        nodes = [FakeNode(), FakeNode()]
+        for node in nodes:
+            scheduling.add_node(node)
+            scheduling.add_node_collection(node, ["a", "b", "c"])
+
+        scheduling.schedule()
+
+        assert sorted(nodes[0].sent + nodes[1].sent) == [0, 1, 2]
+        assert sorted([sorted(node.sent) for node in nodes]) == [[0], [1, 2]]
+
+
+class TestSelectShard:
+    """ This class contains the tests of the split of the tests over the CI machines. """
+
+    node_ids = ["test_" + str(index) for index in range(20)]
+
+    def test_every_machine_computes_the_same_split(self, tmp_path):
+        history = history_of(tmp_path, {node_id: [float(index + 1)] for index, node_id in enumerate(self.node_ids)})
+        first = select_shard(self.node_ids, history, 1, 3)
+        second = select_shard(list(reversed(self.node_ids)), history, 1, 3)
+
+        assert sorted(first[0]) == sorted(second[0])
+        assert first[2] == second[2]
+
+    def test_shards_are_disjoint_and_cover_all_tests(self, tmp_path):
+        history = history_of(tmp_path, {node_id: [float(index + 1)] for index, node_id in enumerate(self.node_ids)})
+        shards = [select_shard(self.node_ids, history, index, 3)[0] for index in range(3)]
+
+        assert sorted(node_id for shard in shards for node_id in shard) == sorted(self.node_ids)
+        assert max(select_shard(self.node_ids, history, index, 3)[2] for index in range(3)) <= 71.0
+
+    def test_without_history_tests_are_split_by_crc32(self, tmp_path):
+        history = history_of(tmp_path, {})
+        for index in range(3):
+            selected, deselected, _ = select_shard(self.node_ids, history, index, 3)
+            assert selected == [node_id for node_id in self.node_ids
+                                if zlib.crc32(node_id.encode("utf-8")) % 3 == index]
+            assert sorted(selected + deselected) == sorted(self.node_ids)
@@ -0,0 +1,41 @@
+""" This module contains the unit tests of the polling policies of the waits. """
+
+from itertools import islice
+
+import pytest
+
+from SupportLibraries.polling_policy import ExponentialBackoff, FixedInterval, PollingPolicy, ReplayedPolling
+
+
+def first_intervals(policy, count=6):
+    return list(islice(policy.intervals(), count))
+
+
+class TestPollingPolicy:
+    """ This class contains the tests of the interval sequences. """
+
+    def test_base_policy_can_not_be_created(self):
+        with pytest.raises(TypeError):
+            PollingPolicy()
+
+    def test_fixed_interval_repeats_the_interval(self):
+        assert first_intervals(FixedInterval()) == [0.5] * 6
+        assert first_intervals(FixedInterval(0.2), 3) == [0.2] * 3
+
+    def test_exponential_backoff_grows_up_to_the_cap(self):
+        assert first_intervals(ExponentialBackoff()) == [0.05, 0.1, 0.2, 0.4, 0.8, 1.0]
+        assert first_intervals(ExponentialBackoff(initial=0.5, factor=3.0, cap=2.0), 4) == [0.5, 1.5, 2.0, 2.0]
+
+    def test_every_wait_starts_the_sequence_again(self):
+        policy = ExponentialBackoff()
+        first_intervals(policy)
+        assert first_intervals(policy, 2) == [0.05, 0.1]
+
+    def test_replayed_polling_moves_a_virtual_clock(self):
+        policy = ReplayedPolling(FixedInterval(2.0))
+        start_time = policy.now()
+        for interval in first_intervals(policy, 3):
+            policy.sleep(interval)
+
+        assert policy.now() - start_time >= 6.0
+        assert policy.skipped == 6.0
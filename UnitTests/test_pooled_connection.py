@@ -0,0 +1,93 @@
+""" This module contains the unit tests of the connection metrics of the pooled connection. """
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import urllib3
+
+from SupportLibraries.pooled_connection import ConnectionMetrics, PooledConnection
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """ This class answers every request with an empty json body & keeps the connection open. """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:" + str(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+class TestConnectionMetrics:
+    """ This class contains the tests of the metrics summary & the merge of the worker metrics. """
+
+    def test_opened_connections_are_counted(self, server_url):
+        metrics = ConnectionMetrics()
+        manager = metrics.watch(urllib3.PoolManager(maxsize=2))
+        for _ in range(3):
+            manager.request("GET", server_url + "/status")
+        second_manager = metrics.watch(urllib3.PoolManager(maxsize=2))
+        second_manager.request("GET", server_url + "/status")
+
+        assert metrics.connections_opened == 2
+
+    def test_count_is_kept_after_the_pools_are_closed(self, server_url):
+        metrics = ConnectionMetrics()
+        manager = metrics.watch(urllib3.PoolManager(maxsize=2))
+        manager.request("GET", server_url + "/status")
+        manager.clear()
+
+        assert metrics.summary()["connections_opened"] == 1
+
+    def test_summary_after_the_driver_quits(self, monkeypatch):
+        fake_appium_server = pytest.importorskip("Benchmarks.fake_appium_server")
+        webdriver = pytest.importorskip("appium.webdriver.webdriver")
+        with open(os.path.join(os.path.dirname(fake_appium_server.__file__), "scenario.json"), "r") as read_file:
+            server = fake_appium_server.FakeAppiumServer(("127.0.0.1", 0), json.load(read_file))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setattr(PooledConnection, "metrics", ConnectionMetrics())
+        try:
+            url = "http://127.0.0.1:" + str(server.server_address[1]) + "/wd/hub"
+            driver = webdriver.WebDriver(command_executor=PooledConnection(url),
+                                         desired_capabilities={"platformName": "Android"})
+            assert driver.page_source
+            driver.quit()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        summary = PooledConnection.metrics.summary()
+        assert summary["requests"] == 3
+        assert summary["connections_opened"] == 1
+
+    def test_merge_adds_the_worker_metrics(self):
+        worker = ConnectionMetrics()
+        worker.record(0.5, 2, False)
+        worker.connection_opened()
+        controller = ConnectionMetrics()
+        controller.record(0.1, 0, True)
+        controller.connection_opened()
+
+        controller.merge(json.loads(json.dumps(worker.export())))
+
+        assert controller.summary() == {"requests": 2, "connections_opened": 2, "retries": 2, "failures": 1,
+                                        "average_request_time": 0.3}
@@ -0,0 +1,75 @@
+""" This module contains the unit tests of the screenshot encoding & the background pipeline. """
+
+import os
+
+import pytest
+
+from FrameworkUtilities import screenshot_utility
+from FrameworkUtilities.screenshot_utility import ScreenshotEncoder, ScreenshotPipeline
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + b"frame"
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return ScreenshotPipeline(str(tmp_path / "Screenshots"), encoder=ScreenshotEncoder())
+
+
+class TestScreenshotEncoder:
+    """ This class contains the tests of the screenshot formats. """
+
+    def test_png_is_stored_as_taken(self):
+        encoder = ScreenshotEncoder()
+        assert encoder.encode(PNG_DATA) is PNG_DATA
+        assert encoder.extension == "png"
+
+    def test_unknown_format_is_rejected(self):
+        with pytest.raises(ValueError):
+            ScreenshotEncoder("gif")
+
+    def test_png_without_pillow(self, monkeypatch):
+        monkeypatch.setattr(screenshot_utility, "Image", None)
+        encoder = ScreenshotEncoder("jpeg", scale=0.5)
+
+        assert (encoder.image_format, encoder.scale, encoder.extension) == ("png", 1.0, "png")
+
+    def test_jpeg_is_downscaled(self):
+        image_module = pytest.importorskip("PIL.Image")
+        output = screenshot_utility.io.BytesIO()
+        image_module.new("RGBA", (100, 50)).save(output, format="PNG")
+
+        encoded = ScreenshotEncoder("jpeg", quality=50, scale=0.5).encode(output.getvalue())
+
+        assert image_module.open(screenshot_utility.io.BytesIO(encoded)).size == (50, 25)
+
+
+class TestScreenshotPipeline:
+    """ This class contains the tests of the background writes & the duplicate frames. """
+
+    def test_submitted_screenshot_is_written(self, pipeline):
+        job = pipeline.submit(PNG_DATA, "login_failed")
+
+        path = job.wait(5)
+        assert os.path.basename(path).startswith("login_failed_") and path.endswith(".png")
+        with open(path, "rb") as read_file:
+            assert read_file.read() == PNG_DATA
+        assert job.png_data is None
+
+    def test_identical_frames_are_stored_once(self, pipeline):
+        first = pipeline.submit(PNG_DATA, "first").wait(5)
+        second = pipeline.submit(PNG_DATA, "second").wait(5)
+        third = pipeline.submit(PNG_DATA + b"changed", "third").wait(5)
+
+        assert first == second != third
+        assert len(os.listdir(pipeline.screenshot_directory)) == 2
+
+    def test_failed_write_is_reported_on_the_job(self, pipeline, monkeypatch):
+        def fail(png_data):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(pipeline.encoder, "encode", fail)
+        job = pipeline.submit(PNG_DATA, "disk_full")
+
+        assert job.wait(5) is None
+        assert isinstance(job.error, OSError)
+        assert pipeline.flush(5)
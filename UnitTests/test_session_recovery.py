@@ -0,0 +1,212 @@
+""" This module contains the unit tests of the driver session holder, the session pre-warming & the rerun recovery. """
+
+import threading
+import time
+
+import pytest
+
+from SupportLibraries import session_recovery
+from SupportLibraries.session_prewarm import SessionPrewarmer
+from SupportLibraries.session_recovery import DriverSession, RerunPlugin, RerunPolicy
+
+
+class FakeDriver:
+    """ This class stands in for the driver, a dead driver fails every command. """
+
+    def __init__(self, name, alive=True):
+        self.name = name
+        self.alive = alive
+        self.commands = []
+        self.quit_called = False
+
+    def _command(self, command):
+        self.commands.append(command)
+        if not self.alive:
+            raise ConnectionError("session " + self.name + " is gone")
+
+    @property
+    def page_source(self):
+        self._command("getPageSource")
+        return "<hierarchy/>"
+
+    def get_window_size(self):
+        self._command("getWindowSize")
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakePool:
+    """ This class stands in for the device pool, it only answers the device count. """
+
+    def __init__(self, available):
+        self.count = available
+        self.released = []
+
+    def available(self, platform):
+        return self.count
+
+    def release(self, lease):
+        self.released.append(lease)
+
+
+class FakeResetter:
+    """ This class stands in for the app resetter, the reset levels in failing_levels fail. """
+
+    failing_levels = ()
+    resets = []
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def reset(self, level):
+        self.resets.append(level.value)
+        if level.value in self.failing_levels:
+            raise RuntimeError(level.value + " failed")
+
+
+class FakeReport:
+    """ This class stands in for a test report of pytest-rerunfailures. """
+
+    def __init__(self, nodeid, outcome, rerun=0):
+        self.nodeid = nodeid
+        self.outcome = outcome
+        self.rerun = rerun
+
+
+def session_of(drivers, device_pool=None, worker_count=1):
+    """ This function returns a driver session creating the given drivers in order. """
+    driver_session = DriverSession("android", device_pool, worker_count)
+    created = iter(drivers)
+    driver_session.create = lambda reset_level, wait_for_device=True: (next(created), None)
+    return driver_session
+
+
+def wait_for(condition, timeout=5):
+    end_time = time.time() + timeout
+    while not condition() and time.time() < end_time:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestDriverSession:
+    """ This class contains the tests of the pre-warmed & spare sessions. """
+
+    def test_spare_needs_more_devices_than_workers(self):
+        assert not session_of([], FakePool(available=2), worker_count=2).can_keep_spare()
+        assert session_of([], FakePool(available=3), worker_count=2).can_keep_spare()
+        assert not session_of([]).can_keep_spare()
+
+    def test_no_spare_when_every_device_is_needed(self):
+        driver_session = session_of([FakeDriver("first")], FakePool(available=2), worker_count=2)
+        driver_session.prewarmer = SessionPrewarmer(driver_session._quit)
+
+        assert driver_session.start("relaunch").name == "first"
+        assert driver_session.prewarmer.pending() == 0
+
+    def test_dead_prewarmed_session_is_replaced(self):
+        dead = FakeDriver("prewarmed", alive=False)
+        driver_session = session_of([dead, FakeDriver("new")])
+        driver_session.prewarm("relaunch")
+
+        assert driver_session.start("relaunch").name == "new"
+        driver_session.prewarmer.discard()
+        assert dead.quit_called
+
+    def test_recover_checks_the_new_session(self):
+        driver_session = session_of([FakeDriver("first"), FakeDriver("recreated", alive=False)])
+        driver_session.start("relaunch")
+
+        with pytest.raises(RuntimeError):
+            driver_session.recover(2, "relaunch")
+        assert driver_session.driver.commands == ["getPageSource"]
+
+
+@pytest.fixture
+def resetter(monkeypatch):
+    monkeypatch.setattr(session_recovery, "AppResetter", FakeResetter)
+    monkeypatch.setattr(FakeResetter, "resets", [])
+    return FakeResetter
+
+
+class TestRecovery:
+    """ This class contains the tests of the recovery escalation & the rerun counts. """
+
+    def test_recovery_escalates_with_every_rerun(self):
+        assert [RerunPolicy.recovery_step(execution_count) for execution_count in (1, 2, 3, 4)] == [None, 0, 1, 2]
+
+    def test_failing_step_escalates_to_the_next_one(self, resetter, monkeypatch):
+        monkeypatch.setattr(resetter, "failing_levels", ("relaunch",))
+        driver_session = session_of([FakeDriver("first")])
+        driver_session.start("relaunch")
+
+        assert driver_session.recover(0, "relaunch") == "clear_data"
+        assert resetter.resets == ["relaunch", "clear_data"]
+
+    def test_last_step_recreates_the_session(self, resetter):
+        driver_session = session_of([FakeDriver("first"), FakeDriver("recreated")])
+        driver_session.start("relaunch")
+
+        assert driver_session.recover(5, "relaunch") == "new_session"
+        assert driver_session.driver.name == "recreated"
+        assert resetter.resets == []
+
+    def test_plugin_recovers_before_the_rerun_only(self, resetter):
+        driver_session = session_of([FakeDriver("first")])
+        driver_session.start("relaunch")
+        plugin = RerunPlugin(RerunPolicy(max_reruns=2))
+
+        class FakeConfig:
+            @staticmethod
+            def getoption(name):
+                return "relaunch"
+
+        class FakeItem:
+            nodeid = "test_a"
+            config = FakeConfig()
+
+        FakeItem.config.driver_session = driver_session
+        for execution_count in (1, 2, 3):
+            FakeItem.execution_count = execution_count
+            plugin.pytest_runtest_setup(FakeItem())
+        assert resetter.resets == ["relaunch", "clear_data"]
+
+    def test_reruns_are_counted_once_per_attempt(self):
+        policy = RerunPolicy(max_reruns=2, budget=5)
+        for report in (FakeReport("test_a", "rerun"), FakeReport("test_a", "rerun"), FakeReport("test_a", "rerun", 1),
+                       FakeReport("test_a", "passed", 2), FakeReport("test_b", "failed")):
+            policy.record(report)
+
+        assert policy.attempts == {"test_a": 2}
+        assert policy.used == 2
+
+
+class TestSessionPrewarmer:
+    """ This class contains the tests of the background session creation. """
+
+    def test_spare_is_kept_alive_until_taken(self):
+        driver = FakeDriver("spare")
+        prewarmer = SessionPrewarmer(lambda driver, lease: driver.quit(), keepalive_interval=0.01)
+        prewarmer.start("spare session", lambda: (driver, None), keep_alive=True)
+
+        assert wait_for(lambda: len(driver.commands) >= 2)
+        assert prewarmer.take() == (driver, None)
+        sent = len(driver.commands)
+        time.sleep(0.05)
+        assert len(driver.commands) == sent
+
+    def test_discard_quits_the_unused_sessions(self):
+        driver = FakeDriver("unused")
+        created = threading.Event()
+
+        def create_session():
+            created.set()
+            return driver, "lease"
+
+        prewarmer = SessionPrewarmer(lambda driver, lease: driver.quit(), keepalive_interval=0.01)
+        prewarmer.start("spare session", create_session, keep_alive=True)
+        created.wait(5)
+        prewarmer.discard()
+
+        assert driver.quit_called
+        assert prewarmer.pending() == 0
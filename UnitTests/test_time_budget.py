@@ -0,0 +1,89 @@
+""" This module contains the unit tests of the per test time budget. """
+
+import pytest
+
+from SupportLibraries import time_budget as time_budget_module
+from SupportLibraries import ui_helpers
+from SupportLibraries.time_budget import TimeBudget, TimeBudgetExceeded
+from SupportLibraries.ui_helpers import UIHelpers
+
+
+class FakeClock:
+    """ This class stands in for the clock, the time only moves when the test says so. """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(time_budget_module, "time", fake_clock)
+    return fake_clock
+
+
+class TestTimeBudget:
+    """ This class contains the tests of the timeout limit & the breakdown of the budget. """
+
+    def test_without_budget_the_timeout_is_kept(self, clock):
+        budget = TimeBudget()
+        budget.start("test_a", None)
+        assert budget.limit(20) == 20
+
+    def test_timeout_is_limited_to_the_time_left(self, clock):
+        budget = TimeBudget()
+        budget.start("test_a", 30)
+        clock.now += 25
+
+        assert budget.limit(20) == 5
+        assert budget.limit(2) == 2
+
+    def test_used_up_budget_fails_the_test(self, clock):
+        budget = TimeBudget()
+        budget.start("test_a", 30)
+        clock.now += 31
+
+        with pytest.raises(TimeBudgetExceeded):
+            budget.limit(20)
+
+    def test_stopped_budget_does_not_limit(self, clock):
+        budget = TimeBudget()
+        budget.start("test_a", 30)
+        budget.stop()
+        clock.now += 31
+
+        assert budget.limit(20) == 20
+        budget.record_wait("wait_for_element", 1.0)
+        assert budget.waits == {}
+
+    def test_breakdown_orders_the_helpers_by_wait_time(self, clock):
+        budget = TimeBudget()
+        budget.start("test_a", 30)
+        budget.record_wait("wait_for_element", 4.0)
+        budget.record_wait("wait_for_any", 12.0)
+        budget.record_wait("wait_for_element", 6.0)
+        clock.now += 31
+
+        assert budget.breakdown().splitlines() == [
+            "Time budget of 30s exceeded by test_a after 31.0s:",
+            "    12.0s waiting in wait_for_any",
+            "    10.0s waiting in wait_for_element",
+            "    9.0s in driver commands & test code"]
+
+    def test_wait_for_sync_is_limited(self, clock, monkeypatch):
+        budget = TimeBudget()
+        monkeypatch.setattr(ui_helpers, "time", clock)
+        monkeypatch.setattr(ui_helpers, "time_budget", budget)
+        budget.start("test_a", 30)
+        clock.now += 27
+
+        with pytest.raises(TimeBudgetExceeded):
+            UIHelpers.wait_for_sync(5)
+        assert clock.now == 1030.0
+        assert budget.waits == {"wait_for_sync": 3.0}
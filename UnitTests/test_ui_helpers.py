@@ -0,0 +1,181 @@
+""" This module contains the unit tests of the element cache, the waits & the page source snapshot of the helpers. """
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from SupportLibraries.polling_policy import FixedInterval
+from SupportLibraries.ui_helpers import UIHelpers
+
+
+class FakeElement:
+    """ This class stands in for an element reference, a stale one fails every command. """
+
+    def __init__(self, displayed=True, enabled=True):
+        self.displayed = displayed
+        self.enabled = enabled
+        self.stale = False
+
+    def is_displayed(self):
+        if self.stale:
+            raise StaleElementReferenceException("stale")
+        return self.displayed
+
+    def is_enabled(self):
+        if self.stale:
+            raise StaleElementReferenceException("stale")
+        return self.enabled
+
+
+class FakeDriver:
+    """ This class stands in for the driver, find_element returns the element currently on the screen. """
+
+    def __init__(self):
+        self.screen = {}
+        self.lookups = 0
+
+    def find_element(self, by, locator_properties):
+        self.lookups += 1
+        if locator_properties not in self.screen:
+            raise NoSuchElementException(locator_properties)
+        return self.screen[locator_properties]
+
+    def find_elements(self, by, locator_properties):
+        self.lookups += 1
+        return [self.screen[locator_properties]] if locator_properties in self.screen else []
+
+
+class SnapshotDriver:
+    """ This class stands in for the driver, it answers the page sources in order & repeats the last one. """
+
+    def __init__(self, *page_sources):
+        self.page_sources = list(page_sources)
+
+    @property
+    def page_source(self):
+        return self.page_sources.pop(0) if len(self.page_sources) > 1 else self.page_sources[0]
+
+
+class PollingHelpers(UIHelpers):
+    """ This class is a helper polling every 10 ms, so the waits of the tests end quickly. """
+
+    polling_policy = FixedInterval(0.01)
+
+
+class CachedHelpers(UIHelpers):
+    """ This class is a helper with the element cache on, as in the page objects. """
+
+    use_element_cache = True
+    polling_policy = FixedInterval(0.01)
+
+
+class TestElementCache:
+    """ This class contains the tests of the cache hits, misses & epochs. """
+
+    def test_second_lookup_is_a_hit(self):
+        driver = FakeDriver()
+        element = driver.screen["next_button"] = FakeElement()
+        helpers = CachedHelpers(driver)
+
+        assert helpers.get_cached_element("next_button") is element
+        assert helpers.get_cached_element("next_button") is element
+        assert helpers.get_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+        assert driver.lookups == 1
+
+    def test_hit_is_checked_for_the_requested_state(self):
+        driver = FakeDriver()
+        cached = driver.screen["next_button"] = FakeElement(enabled=False)
+        helpers = CachedHelpers(driver)
+        assert helpers.get_cached_element("next_button", state="present") is cached
+
+        enabled = driver.screen["next_button"] = FakeElement()
+        assert helpers.get_cached_element("next_button", state="clickable") is enabled
+        assert helpers.get_cache_stats()["misses"] == 2
+
+    def test_stale_hit_is_looked_up_again(self):
+        driver = FakeDriver()
+        stale = driver.screen["next_button"] = FakeElement()
+        helpers = CachedHelpers(driver)
+        helpers.get_cached_element("next_button")
+
+        stale.stale = True
+        fresh = driver.screen["next_button"] = FakeElement()
+        assert helpers.get_cached_element("next_button", state="visible") is fresh
+        assert helpers.get_cache_stats() == {"hits": 0, "misses": 2, "size": 1}
+
+    def test_new_epoch_drops_the_cache_of_every_helper(self):
+        driver = FakeDriver()
+        driver.screen["next_button"] = FakeElement()
+        first, second = CachedHelpers(driver), CachedHelpers(driver)
+        first.get_cached_element("next_button")
+        second.get_cached_element("next_button")
+
+        UIHelpers.invalidate_driver_caches(driver)
+        next_screen = driver.screen["next_button"] = FakeElement()
+
+        assert first.get_cached_element("next_button") is next_screen
+        assert second.get_cached_element("next_button") is next_screen
+        assert driver.lookups == 4
+
+    def test_missing_element_is_not_cached(self):
+        helpers = CachedHelpers(FakeDriver())
+
+        assert helpers.get_cached_element("next_button", max_time_out=0.05) is None
+        assert helpers.get_cache_stats() == {"hits": 0, "misses": 1, "size": 0}
+
+
+class TestSnapshot:
+    """ This class contains the tests of the locators evaluated on the page source snapshot. """
+
+    def test_truncated_page_source_is_polled_again(self):
+        driver = SnapshotDriver('<hierarchy><node resource-id="app:id/next_but',
+                                '<hierarchy><node resource-id="app:id/next_button"/></hierarchy>')
+        helpers = CachedHelpers(driver)
+
+        assert helpers.locate_elements_in_snapshot({"next_button": "id"}, max_timeout=1) == {"next_button": True}
+
+    def test_page_source_which_never_parses_times_out(self):
+        helpers = CachedHelpers(SnapshotDriver("<hierarchy><node"))
+
+        assert helpers.locate_elements_in_snapshot({"next_button": "id"}, max_timeout=0.05) == {"next_button": False}
+
+
+SUCCESS = {"permission_button": "id"}
+ERROR = {"error_snackbar": "id"}
+
+
+class TestWaitForAny:
+    """ This class contains the tests of the wait for whichever of several elements appears first. """
+
+    def test_locator_on_the_screen_wins(self):
+        driver = FakeDriver()
+        driver.screen["error_snackbar"] = FakeElement()
+
+        assert PollingHelpers(driver).wait_for_any([SUCCESS, ERROR], max_time_out=1) == ("error_snackbar", "id")
+
+    def test_first_locator_wins_when_both_are_shown(self):
+        driver = FakeDriver()
+        driver.screen["permission_button"] = FakeElement()
+        driver.screen["error_snackbar"] = FakeElement()
+
+        assert PollingHelpers(driver).wait_for_any([SUCCESS, ERROR], max_time_out=1) == ("permission_button", "id")
+
+    def test_hidden_element_only_counts_as_present(self):
+        driver = FakeDriver()
+        driver.screen["permission_button"] = FakeElement(displayed=False)
+        driver.screen["error_snackbar"] = FakeElement()
+        helpers = PollingHelpers(driver)
+
+        assert helpers.wait_for_any([SUCCESS, ERROR], max_time_out=1) == ("error_snackbar", "id")
+        assert helpers.wait_for_any([SUCCESS, ERROR], max_time_out=1, state="present") == ("permission_button", "id")
+
+    def test_timeout_returns_none(self):
+        assert PollingHelpers(FakeDriver()).wait_for_any([SUCCESS, ERROR], max_time_out=0.05) is None
+
+    def test_stale_element_is_polled_again(self):
+        driver = FakeDriver()
+        stale, redrawn = FakeElement(), FakeElement()
+        stale.stale = True
+        lookups = iter([[stale], [redrawn]])
+        driver.find_elements = lambda by, locator_properties: next(lookups)
+
+        assert PollingHelpers(driver).wait_for_any([SUCCESS], max_time_out=1) == ("permission_button", "id")
+        assert next(lookups, None) is None
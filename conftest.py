@@ -1,31 +1,424 @@
+import os
+
 import pytest
 
-from SupportLibraries.driver_factory import DriverFactory
+from FrameworkUtilities.appearance_history_utility import AppearanceTimes
+from FrameworkUtilities.caps_profile_utility import CapabilityProfiles
+from FrameworkUtilities.data_reader_utility import DataReader
+from FrameworkUtilities.logger_utility import enable_json_output
+from FrameworkUtilities.screenshot_utility import ScreenshotPipeline
+from FrameworkUtilities.timing_history_utility import TimingHistory
+from ResourceFiles.constants import ResetLevel
+from SupportLibraries.app_artifacts import UPLOADERS, AppArtifacts
+from SupportLibraries.app_reset import AppResetter
+from SupportLibraries.device_pool import DevicePool
+from SupportLibraries.driver_instrumentation import command_timings
+from SupportLibraries.driver_recording import driver_recording
+from SupportLibraries.duration_scheduler import DurationScheduler, SlotScheduling, get_app_state, select_shard
+from SupportLibraries.pooled_connection import PooledConnection
+from SupportLibraries.session_recovery import DriverSession, RerunPlugin, RerunPolicy
+from SupportLibraries.time_budget import time_budget
+
+
+PLATFORMS = ['ios', 'android', 'bs_android', 'bs_ios']
+
+# total test durations per worker & per test of this run, reruns included
+worker_durations = {}
+test_durations = {}
+# durations of the last attempt of each test, the timing history records these
+attempt_durations = {}
+rerun_attempts = set()
+
+
+def get_device_pool(config):
+    pool_file = config.getoption("--device-pool")
+    if pool_file is None or driver_recording.replaying:
+        return None
+    if getattr(config, "device_pool", None) is None:
+        config.device_pool = DevicePool(pool_file, quarantine_seconds=config.getoption("--quarantine-seconds"))
+    return config.device_pool
 
 
 @pytest.fixture(scope="session")
-def driver(request, platform):
+def device_pool(request):
+    return get_device_pool(request.config)
+
+
+@pytest.fixture(scope="session")
+def driver_session(request, platform, device_pool):
+    # created on the setup of the first test needing the driver, a run without such tests opens no session
     print("session_level_setup: Running session level setup.")
-    df = DriverFactory(platform)
-    driver = df.get_driver_instance()
-    driver.reset()
-    session = request.node
-    for item in session.items:
-        cls = item.getparent(pytest.Class)
-        setattr(cls.obj, "driver", driver)
-    driver._platform = platform
-    yield
+    # the session pre-warmed from pytest_configure, if any
+    driver_session = getattr(request.config, "driver_session", None) or \
+        DriverSession(platform, device_pool, get_worker_count(request.config))
+    driver_session.start(request.config.getoption("--reset-level"))
+    request.config.driver_session = driver_session
+    yield driver_session
     print("session_level_setup: Running session level teardown.")
-    driver.quit()
+    driver_session.quit()
+
+
+@pytest.fixture(scope="class")
+def driver(request, driver_session):
+    if request.cls is not None:
+        driver_session.bind(request.cls)
+    return driver_session.driver
 
 
 @pytest.fixture(scope="session")
 def platform(request):
     plat = request.config.getoption("--platform").lower()
-    if plat not in ['ios', 'android', 'bs_android', 'bs_ios']:
-        raise ValueError("platform value must be in ['ios', 'android', 'bs_android', 'bs_ios']")
+    if plat not in PLATFORMS:
+        raise ValueError("platform value must be in " + str(PLATFORMS))
     return plat
 
 
 def pytest_addoption(parser):
     parser.addoption("--platform", action='store', default='browser_stack')
+    parser.addoption("--reset-level", action='store', default=ResetLevel.CLEAR_DATA.value,
+                     choices=[level.value for level in ResetLevel],
+                     help="minimum app reset level after each test, tests can raise it with @pytest.mark.reset_level")
+    parser.addoption("--screenshot-format", action='store', default="png", choices=["png", "jpeg", "webp"],
+                     help="encoding of the failure screenshots, jpeg/ webp need Pillow")
+    parser.addoption("--screenshot-quality", action='store', type=int, default=75,
+                     help="jpeg/ webp quality of the failure screenshots")
+    parser.addoption("--screenshot-scale", action='store', type=float, default=1.0,
+                     help="downscale factor of the failure screenshots ex- 0.5")
+    parser.addoption("--caps", action='append', default=[],
+                     help="desired capability override as key=value, can be repeated ex- --caps deviceName=Pixel_5")
+    parser.addoption("--log-json", action='store_true', default=False,
+                     help="also write the framework logs as json lines next to the text log")
+    parser.addoption("--command-timings", action='store_true', default=False,
+                     help="record every driver command & write the per test breakdown to Logs/command_timings.json")
+    parser.addoption("--device-pool", action='store', default=None,
+                     help="device pool json file, one device is leased per xdist worker "
+                          "ex- DesiredCaps/device_pool.json")
+    parser.addoption("--quarantine-seconds", action='store', type=float, default=600,
+                     help="seconds a device failing the health check or the session creation is kept out of the pool, "
+                          "it also shortens the quarantines left by the earlier runs")
+    parser.addoption("--reset-quarantine", action='store_true', default=False,
+                     help="take every device of --device-pool out of the quarantine before the run")
+    parser.addoption("--http-pool-size", action='store', type=int, default=None,
+                     help="connections kept alive per appium server, 2 by default (test thread & screenshot worker)")
+    parser.addoption("--http-connect-timeout", action='store', type=float, default=10.0,
+                     help="connect timeout of the driver commands in seconds")
+    parser.addoption("--http-read-timeout", action='store', type=float, default=300.0,
+                     help="read timeout of the driver commands in seconds")
+    parser.addoption("--http-retries", action='store', type=int, default=2,
+                     help="retries of idempotent driver commands (GET/ DELETE) on connection errors")
+    parser.addoption("--http-compression", action='store_true', default=False,
+                     help="ask the appium server for gzip compressed responses ex- page source & screenshots")
+    parser.addoption("--duration-schedule", action='store_true', default=False,
+                     help="run the tests longest first over the workers & grouped by app_state, with --dist loadgroup "
+                          "each xdist worker gets a precomputed balanced share")
+    parser.addoption("--shard-count", action='store', type=int, default=1,
+                     help="number of CI machines the tests are split over, balanced by the timing history")
+    parser.addoption("--shard-index", action='store', type=int, default=0,
+                     help="index of this machine's shard, from 0 to --shard-count - 1")
+    parser.addoption("--shard-timings", action='store', default=None,
+                     help="timing file of this shard, Logs/shard_timings_<index>.json by default, merge them with "
+                          "python -m FrameworkUtilities.timing_history_utility")
+    parser.addoption("--time-budget", action='store', type=float, default=None,
+                     help="time budget of each test in seconds, every wait is limited to the time left in it, "
+                          "a test can set its own with @pytest.mark.time_budget(seconds)")
+    parser.addoption("--adaptive-timeouts", action='store_true', default=False,
+                     help="wait for each locator the p99 of its appearance times on the device plus a margin, "
+                          "instead of the timeout in the code")
+    parser.addoption("--app-cache", action='store_true', default=False,
+                     help="install the app binary on a local device only when its hash changed since the last install")
+    parser.addoption("--app-uploader", action='store', default="browserstack", choices=sorted(UPLOADERS),
+                     help="uploader of the app binary for the cloud platforms, "
+                          "an unchanged binary is not uploaded again")
+    parser.addoption("--prewarm-session", action='store_true', default=False,
+                     help="create the driver session on a background thread from the start of the run, overlapping "
+                          "the collection, & with --device-pool keep a spare session for replacing a crashed one")
+    parser.addoption("--record-session", action='store', default=None, metavar="DIR",
+                     help="record the driver request/ response stream of each test to DIR")
+    parser.addoption("--replay-session", action='store', default=None, metavar="DIR",
+                     help="serve the driver commands from the recording in DIR instead of a device")
+
+
+def pytest_configure(config):
+    shard_count = config.getoption("--shard-count")
+    if shard_count < 1 or not 0 <= config.getoption("--shard-index") < shard_count:
+        raise pytest.UsageError("--shard-index must be from 0 to --shard-count - 1")
+    record_dir = config.getoption("--record-session")
+    replay_dir = config.getoption("--replay-session")
+    if record_dir and replay_dir:
+        raise pytest.UsageError("--record-session & --replay-session can not be used together")
+    if record_dir:
+        driver_recording.configure("record", record_dir)
+    elif replay_dir:
+        driver_recording.configure("replay", replay_dir)
+    if driver_recording.mode:
+        # a rerun would not match the recorded command stream
+        config.option.force_reruns = 0
+    if config.getoption("--reset-quarantine") and not is_xdist_worker(config) and get_device_pool(config):
+        # reset once by the controller, a worker resetting it would undo the quarantines of the other workers
+        get_device_pool(config).reset_quarantine()
+    config.rerun_policy = RerunPolicy(config.getoption("reruns") or 0, config.getoption("max_suite_reruns"))
+    config.pluginmanager.register(RerunPlugin(config.rerun_policy), "raft_rerun")
+    command_timings.enabled = config.getoption("--command-timings")
+    if config.getoption("--log-json"):
+        enable_json_output()
+    CapabilityProfiles.configure(config.getoption("--caps"))
+    AppearanceTimes.configure(config.getoption("--adaptive-timeouts"))
+    # the install commands of a cached app would not be in the recording
+    AppArtifacts.configure(config.getoption("--app-cache") and not driver_recording.mode,
+                           config.getoption("--app-uploader"))
+    PooledConnection.configure(config.getoption("--http-pool-size"),
+                               config.getoption("--http-connect-timeout"),
+                               config.getoption("--http-read-timeout"),
+                               config.getoption("--http-retries"),
+                               config.getoption("--http-compression"))
+    ScreenshotPipeline.configure(config.getoption("--screenshot-format"),
+                                 config.getoption("--screenshot-quality"),
+                                 config.getoption("--screenshot-scale"))
+    if config.getoption("--prewarm-session") and can_prewarm(config):
+        # started before the collection so the app install & startup overlap it, dropped if no test needs it
+        config.driver_session = DriverSession(config.getoption("--platform").lower(), get_device_pool(config),
+                                              get_worker_count(config))
+        config.driver_session.prewarm(config.getoption("--reset-level"))
+
+
+def can_prewarm(config):
+    """
+    This function checks if the session can be pre-warmed, it needs a valid platform & a process running the tests
+    :param config: it takes the pytest config
+    :return: it returns boolean value
+    """
+    if config.getoption("--platform").lower() not in PLATFORMS or config.getoption("collectonly"):
+        return False
+    # the xdist controller does not run tests & a recording needs the session commands in its session segment
+    return (is_xdist_worker(config) or get_worker_count(config) == 1) and not driver_recording.mode
+
+
+def is_xdist_worker(config):
+    return hasattr(config, "workerinput")
+
+
+def get_worker_count(config):
+    return int(getattr(config.option, "numprocesses", None) or 1)
+
+
+def is_run_mode_off(item, data_reader):
+    run_mode = data_reader.get_run_mode(getattr(item, "originalname", item.name))
+    return run_mode is False or str(run_mode).strip().upper() in ("N", "NO")
+
+
+def deselect_by_run_mode(config, items):
+    """
+    This function deselects the tests with run_mode N in the stage data, a test without run_mode runs
+    :param config: it takes the pytest config
+    :param items: it takes the collected pytest items, changed in place
+    :return: it returns nothing
+    """
+    data_reader = DataReader()
+    selected, deselected = [], []
+    for item in items:
+        (deselected if is_run_mode_off(item, data_reader) else selected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def needs_driver(item):
+    """
+    This function checks if the test will need the driver, tests skipped by their markers do not
+    :param item: it takes the pytest item
+    :return: it returns boolean value
+    """
+    if "driver" not in getattr(item, "fixturenames", ()) or item.get_closest_marker("skip") is not None:
+        return False
+    return not any(condition is True for marker in item.iter_markers("skipif") for condition in marker.args)
+
+
+# a wrapper so the shard split & the schedule run after all the other hooks ex- the -k/ -m selection of pytest,
+# they only see the tests left by it
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_modifyitems(session, config, items):
+    deselect_by_run_mode(config, items)
+
+    for item in items:
+        item.user_properties.append(("app_state", get_app_state(item)[0]))
+    yield
+
+    shard_count = config.getoption("--shard-count")
+    if shard_count > 1:
+        selected, deselected, config.predicted_shard_time = select_shard(
+            items, TimingHistory.get_instance(), config.getoption("--shard-index"), shard_count)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    if config.getoption("--duration-schedule"):
+        scheduler = DurationScheduler(TimingHistory.get_instance(), get_worker_count(config))
+        scheduler.schedule(items, pin_to_workers=config.getoption("dist", "no") == "loadgroup")
+        config.predicted_makespan = scheduler.predicted_makespan
+
+
+def pytest_collection_finish(session):
+    driver_session = getattr(session.config, "driver_session", None)
+    if driver_session is not None and not any(needs_driver(item) for item in session.items):
+        # the session pre-warmed before the collection is not needed, its device is given back right away
+        driver_session.log.info("No selected test needs the driver, discarding the pre-warmed session")
+        driver_session.prewarmer.discard()
+        session.config.driver_session = None
+
+
+# tryfirst so it is asked before the xdist schedulers, xdist has read the xdist_group markers before the shard
+# split & the schedule, the slots are given to the workers by the controller instead
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if config.getoption("--duration-schedule") and config.getoption("dist", "no") == "loadgroup":
+        return SlotScheduling(config, log, DurationScheduler(TimingHistory.get_instance(), get_worker_count(config)))
+    return None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_node_collection_finished(node, ids):
+    # the controller does not collect, the prediction is computed from the node ids the workers collected
+    config = node.config
+    if config.getoption("--duration-schedule") and not hasattr(config, "predicted_makespan"):
+        scheduler = DurationScheduler(TimingHistory.get_instance(), get_worker_count(config))
+        scheduler.assign(ids)
+        config.predicted_makespan = scheduler.predicted_makespan
+
+
+def pytest_runtest_logreport(report):
+    # durations are kept on the controller, xdist forwards the reports of the workers
+    node = getattr(report, "node", None)
+    worker = node.gateway.id if node is not None else "master"
+    worker_durations[worker] = worker_durations.get(worker, 0.0) + report.duration
+    test_durations[report.nodeid] = test_durations.get(report.nodeid, 0.0) + report.duration
+    if report.when == "setup":
+        attempt_durations[report.nodeid] = 0.0
+    attempt_durations[report.nodeid] = attempt_durations.get(report.nodeid, 0.0) + report.duration
+    if report.outcome == "rerun":
+        rerun_attempts.add(report.nodeid)
+    # a rerun attempt is followed by the next attempt, only the last one is recorded
+    if report.when == "teardown" and report.nodeid in rerun_attempts:
+        rerun_attempts.discard(report.nodeid)
+    elif report.when == "teardown" and not driver_recording.replaying:
+        TimingHistory.get_instance().record(report.nodeid, attempt_durations[report.nodeid],
+                                            dict(report.user_properties).get("app_state"))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # the budget starts before the fixtures, the driver fixture & its app reset are part of the test time
+    marker = item.get_closest_marker("time_budget")
+    seconds = marker.args[0] if marker else item.config.getoption("--time-budget")
+    time_budget.start(item.nodeid, seconds)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item, nextitem):
+    # the teardown is not limited, it has to leave the app in a known state
+    time_budget.stop()
+    # the teardown reset can be reduced when the next test starts from the same app state
+    item.next_app_state = get_app_state(nextitem)[0] if nextitem is not None else None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    if command_timings.enabled:
+        command_timings.start_test(item.nodeid)
+    driver_recording.start_test(item.nodeid)
+    yield
+    driver_recording.end_test()
+    if command_timings.enabled:
+        command_timings.end_test()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED and session.config.getoption("--shard-count") > 1:
+        # a shard left without tests by the selection is not a failure of the CI job
+        session.exitstatus = pytest.ExitCode.OK
+    driver_session = getattr(session.config, "driver_session", None)
+    if driver_session is not None and driver_session.prewarmer is not None:
+        # a pre-warmed session is unused when no test needed the driver
+        driver_session.prewarmer.discard()
+    ScreenshotPipeline.flush_instance()
+    driver_recording.finish()
+    if not driver_recording.replaying:
+        # every xdist worker merges its own samples, the waits run on the workers
+        AppearanceTimes.get_instance().save()
+    if not is_xdist_worker(session.config):
+        config = session.config
+        if config.getoption("--shard-count") > 1:
+            TimingHistory.get_instance().write_results(
+                config.getoption("--shard-timings")
+                or os.path.join(str(config.rootdir), "Logs", "shard_timings_"
+                                + str(config.getoption("--shard-index")) + ".json"))
+        elif config.getoption("--duration-schedule"):
+            # a shard's timings are merged into the history by the merge_timings CI job instead
+            TimingHistory.get_instance().save()
+    if is_xdist_worker(session.config):
+        session.config.workeroutput["connection_metrics"] = PooledConnection.metrics.export()
+        session.config.workeroutput["reset_timings"] = [list(timing) for timing in AppResetter.reset_timings]
+    if command_timings.enabled:
+        if is_xdist_worker(session.config):
+            session.config.workeroutput["command_timings"] = command_timings.export()
+        else:
+            command_timings.write_report()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # the summaries & reports are written by the controller, the workers send their data with workeroutput
+    worker_output = getattr(node, "workeroutput", None) or {}
+    if "command_timings" in worker_output:
+        command_timings.merge(worker_output["command_timings"])
+    if "connection_metrics" in worker_output:
+        PooledConnection.metrics.merge(worker_output["connection_metrics"])
+    for level, elapsed in worker_output.get("reset_timings", []):
+        AppResetter.reset_timings.append((level, elapsed))
+
+
+def pytest_terminal_summary(terminalreporter):
+    if command_timings.enabled:
+        terminalreporter.section("command timings")
+        for test_name, entry in command_timings.summarize(slowest=3).items():
+            terminalreporter.write_line(test_name + ": " + str(entry["commands"]) + " command(s), "
+                                        + str(entry["command_time"]) + "s in commands, "
+                                        + str(entry["wait_time"]) + "s in waits")
+            for command in entry["slowest_commands"]:
+                terminalreporter.write_line("    " + str(command["duration"]) + "s " + command["command"] + " "
+                                            + str(command["locator"]) + " <- " + str(command["caller"]))
+        terminalreporter.write_line("full breakdown: Logs/command_timings.json")
+
+    config = terminalreporter.config
+    if config.getoption("--shard-count") > 1:
+        terminalreporter.section("test shard")
+        terminalreporter.write_line("shard " + str(config.getoption("--shard-index")) + " of "
+                                    + str(config.getoption("--shard-count")) + ": predicted "
+                                    + str(round(getattr(config, "predicted_shard_time", 0.0), 1)) + "s, actual "
+                                    + str(round(sum(test_durations.values()), 1)) + "s of test time")
+    if config.getoption("--duration-schedule") and worker_durations:
+        terminalreporter.section("test schedule")
+        terminalreporter.write_line("predicted makespan: " + str(round(getattr(config, "predicted_makespan", 0.0), 1))
+                                    + "s, actual makespan: " + str(round(max(worker_durations.values()), 1))
+                                    + "s over " + str(len(worker_durations)) + " worker(s)")
+
+    rerun_policy = getattr(config, "rerun_policy", None)
+    if rerun_policy is not None and rerun_policy.used:
+        terminalreporter.section("reruns")
+        for node_id, reruns in rerun_policy.attempts.items():
+            terminalreporter.write_line(node_id + ": " + str(reruns) + " rerun(s)")
+        if rerun_policy.budget is not None:
+            terminalreporter.write_line("rerun budget used: " + str(rerun_policy.used) + " of "
+                                        + str(rerun_policy.budget))
+
+    connection_metrics = PooledConnection.metrics.summary()
+    if connection_metrics["requests"]:
+        terminalreporter.section("driver connection metrics")
+        terminalreporter.write_line(", ".join(key + ": " + str(value) for key, value in connection_metrics.items()))
+
+    summary = AppResetter.get_timing_summary()
+    if summary:
+        terminalreporter.section("app reset timings")
+        for level, entry in summary.items():
+            terminalreporter.write_line(level + ": " + str(entry["count"]) + " reset(s), "
+                                        + str(round(entry["total"], 2)) + "s total, "
+                                        + str(round(entry["total"] / entry["count"], 2)) + "s average")